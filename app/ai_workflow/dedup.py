@@ -0,0 +1,283 @@
+import hashlib
+import re
+import sqlite3
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.config.settings import settings
+
+QUOTES = "quotes"
+TITLE = "title"
+FIELDS = (QUOTES, TITLE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dedup_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dedup_entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_id INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    field TEXT NOT NULL,
+    text TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    UNIQUE (item_id, field)
+);
+CREATE TABLE IF NOT EXISTS dedup_buckets (
+    bucket INTEGER NOT NULL,
+    entry_id INTEGER NOT NULL,
+    PRIMARY KEY (bucket, entry_id)
+) WITHOUT ROWID;
+"""
+
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+class DuplicateContent(Exception):
+    """Generated content is a near-duplicate of an item already in the history."""
+
+    def __init__(self, duplicate: dict):
+        self.duplicate = duplicate
+        super().__init__(
+            f"{duplicate['field']} is a near-duplicate of item {duplicate['item_id']} "
+            f"(similarity {duplicate['similarity']:.2f})"
+        )
+
+
+def normalize(text: str) -> str:
+    return _SPACES.sub(" ", _PUNCTUATION.sub("", text.lower())).strip()
+
+
+class MinHasher:
+    """
+    MinHash signatures over byte shingles, vectorised with NumPy.
+
+    A shingle of up to 8 UTF-8 bytes is packed into a uint64, so shingling
+    is a sliding-window view instead of a Python loop. Each permutation is
+    a multiply-shift hash ``(a * h + b) >> 32``, which is universal and
+    needs no modulo.
+    """
+
+    def __init__(self, num_perm: int, shingle_size: int, seed: int):
+        if not 1 <= shingle_size <= 8:
+            raise ValueError("dedup.shingle_size must be between 1 and 8")
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.integers(1, 2 ** 64, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64)
+        self._weights = np.uint64(256) ** np.arange(shingle_size, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        data = np.frombuffer(normalize(text).encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+        if data.size == 0:
+            return data
+        if data.size < self.shingle_size:
+            data = np.pad(data, (0, self.shingle_size - data.size))
+        windows = np.lib.stride_tricks.sliding_window_view(data, self.shingle_size)
+        return np.unique(windows @ self._weights)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        shingles = self.shingles(text)
+        if shingles.size == 0:
+            return None
+        with np.errstate(over="ignore"):
+            permuted = (self.a[:, None] * shingles[None, :] + self.b[:, None]) >> np.uint64(32)
+        return (permuted.min(axis=1) & _MAX_HASH).astype(np.uint32)
+
+
+class DuplicateIndex:
+    """
+    Persistent MinHash/LSH index of generated quotes and titles.
+
+    Signatures are split into ``bands`` bands; each band is hashed into a
+    bucket key stored in an indexed SQLite table. A lookup is one batched
+    index seek over the candidate's bucket keys plus a signature comparison
+    of the (few) entries sharing a bucket, so its cost does not grow with
+    the number of indexed items.
+    """
+
+    def __init__(self, logger, config=None, channel: Optional[str] = None):
+        """
+        :param logger: Application logger instance
+        :param config: Dedup settings (defaults to ``settings.dedup``)
+        :param channel: Channel whose history is checked (defaults to ``settings.catalog.channel``)
+        """
+        self.config = config or settings.dedup
+        self.channel = channel or settings.catalog.channel
+        self.logger = logger
+        if self.config.num_perm % self.config.bands:
+            raise ValueError("dedup.num_perm must be a multiple of dedup.bands")
+        self.rows = self.config.num_perm // self.config.bands
+        self.hasher = MinHasher(self.config.num_perm, self.config.shingle_size, self.config.seed)
+
+        self.db_file = Path(self.config.db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+        self._check_parameters()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, timeout=self.config.busy_timeout, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _reader(self) -> sqlite3.Connection:
+        # Lookups sit on the generation path: reuse one connection per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=self.config.busy_timeout, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _parameters(self) -> str:
+        c = self.config
+        return f"num_perm={c.num_perm};bands={c.bands};shingle_size={c.shingle_size};seed={c.seed}"
+
+    def _check_parameters(self):
+        with self._transaction() as conn:
+            row = conn.execute("SELECT value FROM dedup_meta WHERE key = 'parameters'").fetchone()
+            if row is not None and row["value"] == self._parameters():
+                return
+            if row is not None:
+                self.logger.warning("Dedup index parameters changed, rebuilding signatures.")
+                self._rebuild(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO dedup_meta (key, value) VALUES ('parameters', ?)",
+                (self._parameters(),),
+            )
+
+    def _rebuild(self, conn):
+        conn.execute("DELETE FROM dedup_buckets")
+        entries = conn.execute("SELECT id, channel, field, text FROM dedup_entries").fetchall()
+        for entry in entries:
+            signature = self.hasher.signature(entry["text"])
+            conn.execute("UPDATE dedup_entries SET signature = ? WHERE id = ?", (signature.tobytes(), entry["id"]))
+            self._insert_buckets(conn, entry["id"], entry["channel"], entry["field"], signature)
+
+    # ---------------------------------------------------------------
+    # LSH
+    # ---------------------------------------------------------------
+    def _bucket_keys(self, channel: str, field: str, signature: np.ndarray) -> list[int]:
+        prefix = f"{channel}\0{field}\0".encode("utf-8")
+        keys = []
+        for band in range(self.config.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(prefix + struct.pack("<H", band) + rows, digest_size=8).digest()
+            keys.append(int.from_bytes(digest, "little", signed=True))
+        return keys
+
+    def _insert_buckets(self, conn, entry_id: int, channel: str, field: str, signature: np.ndarray):
+        conn.executemany(
+            "INSERT OR IGNORE INTO dedup_buckets (bucket, entry_id) VALUES (?, ?)",
+            [(key, entry_id) for key in self._bucket_keys(channel, field, signature)],
+        )
+
+    @staticmethod
+    def _texts(content: dict) -> dict[str, str]:
+        return {
+            QUOTES: " ".join(content.get("quotes") or []),
+            TITLE: content.get("video_title") or "",
+        }
+
+    # ---------------------------------------------------------------
+    # Public API
+    # ---------------------------------------------------------------
+    def find_duplicate(self, content: dict) -> Optional[dict]:
+        """
+        Check generated content against the channel's history.
+
+        :param content: Generated item with ``quotes`` and ``video_title``
+        :return: ``{"item_id", "field", "similarity", "text"}`` of the closest
+            indexed item at or above the threshold, or None
+        """
+        best = None
+        conn = self._reader()
+        for field, text in self._texts(content).items():
+            signature = self.hasher.signature(text)
+            if signature is None:
+                continue
+            keys = self._bucket_keys(self.channel, field, signature)
+            candidates = conn.execute(
+                f"""
+                SELECT e.item_id, e.text, e.signature FROM dedup_entries e
+                WHERE e.id IN (
+                    SELECT entry_id FROM dedup_buckets
+                    WHERE bucket IN ({", ".join("?" * len(keys))})
+                )
+                """,
+                keys,
+            ).fetchall()
+
+            for row in candidates:
+                similarity = float(np.mean(np.frombuffer(row["signature"], dtype=np.uint32) == signature))
+                if similarity >= self.config.threshold and (best is None or similarity > best["similarity"]):
+                    best = {"item_id": row["item_id"], "field": field, "similarity": similarity, "text": row["text"]}
+        return best
+
+    def add(self, item_id: int, content: dict, channel: Optional[str] = None):
+        """Index the quotes and title of a catalog item."""
+        channel = channel or self.channel
+        with self._transaction() as conn:
+            self._add(conn, item_id, content, channel)
+
+    def _add(self, conn, item_id: int, content: dict, channel: str):
+        for field, text in self._texts(content).items():
+            signature = self.hasher.signature(text)
+            if signature is None:
+                continue
+            cursor = conn.execute(
+                """
+                INSERT OR IGNORE INTO dedup_entries (item_id, channel, field, text, signature)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (item_id, channel, field, text, signature.tobytes()),
+            )
+            if cursor.rowcount:
+                self._insert_buckets(conn, cursor.lastrowid, channel, field, signature)
+
+    def sync_from_catalog(self, catalog) -> int:
+        """
+        Index catalog items newer than the last indexed one (the whole
+        history on first use).
+
+        :return: Number of items indexed
+        """
+        with self._connect() as conn:
+            last_id = conn.execute("SELECT COALESCE(MAX(item_id), 0) FROM dedup_entries").fetchone()[0]
+
+        items = catalog.items_after(last_id)
+        if not items:
+            return 0
+        with self._transaction() as conn:
+            for item in items:
+                self._add(conn, item["id"], item, item["channel"])
+        self.logger.info(f"Indexed {len(items)} catalog items for near-duplicate detection.")
+        return len(items)
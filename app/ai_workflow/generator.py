@@ -1,48 +1,219 @@
+import datetime
 import random
+import time
+from contextlib import contextmanager
+from langchain_core.exceptions import OutputParserException
 from langchain_openai import ChatOpenAI
-from .prompts import PROMPT_TEMPLATE, parser, THEMES
+from .prompts import PROMPT_TEMPLATE, PROMPT_VERSION, parser, THEMES
 from app.utils.save_json import save_json
 from app.config.settings import settings
+from app.storage.catalog import ContentCatalog
+from .dedup import DuplicateIndex, DuplicateContent
+from .instrumentation import LLMMetrics, UsageCallback, prompt_parts
+from .hedging import HedgedRequester
+from .streaming import QuoteStreamParser, QuoteEmitter
 
 class ContentGenerator:
-    def __init__(self , logger):
-        self.llm = ChatOpenAI(model=settings.ai.model,
-                            temperature=settings.ai.temperature)
+    def __init__(self , logger, app_settings=settings, llm=None):
+        self.settings = app_settings
+        # Retries and deadlines are handled by HedgedRequester
+        self.llm = llm or ChatOpenAI(model=app_settings.ai.model,
+                            temperature=app_settings.ai.temperature,
+                            timeout=app_settings.ai.request_timeout,
+                            max_retries=0,
+                            stream_usage=True)
         self.logger = logger
+        self.catalog = ContentCatalog(logger, app_settings.catalog)
+        self.dedup = None
+        if app_settings.dedup.enabled:
+            self.dedup = DuplicateIndex(logger, app_settings.dedup, app_settings.catalog.channel)
+            self.dedup.sync_from_catalog(self.catalog)
+        self.metrics = None
+        if app_settings.llm_metrics.enabled:
+            self.metrics = LLMMetrics(logger, app_settings.llm_metrics)
+            self.metrics.register_prompt(
+                PROMPT_VERSION,
+                prompt_parts(PROMPT_TEMPLATE.messages[0].prompt.template, parser.get_format_instructions()),
+            )
+        history = self.metrics.recent_latencies(app_settings.ai.model, app_settings.ai.hedge_window) if self.metrics else None
+        self.requester = HedgedRequester(logger, app_settings.ai, history)
 
-    def generate(self, theme: str):
-        try:
-            chain = PROMPT_TEMPLATE | self.llm | parser
-            result = chain.invoke({
+    def generate(self, theme: str, on_quotes=None):
+        """
+        :param on_quotes: Streaming mode: called with the quotes as soon as they are
+            complete, while the title, description and tags are still being generated.
+            The quotes handed out are kept even if a retry produces the rest.
+        """
+        with self._track(theme) as call:
+            chain = PROMPT_TEMPLATE | self.llm
+            inputs = {
                 "theme": theme,
                 "format_instructions": parser.get_format_instructions()
-            })
-            return result.model_dump()
-        except Exception as e:
-            self.logger.error(f"Failed to generate content for theme '{theme}': {e}")
-            return None
+            }
+            config = {"callbacks": [UsageCallback(call)]} if call else None
+            emitter = QuoteEmitter(on_quotes) if on_quotes else None
+            started = time.perf_counter()
+
+            def attempt():
+                if emitter:
+                    message = self._stream(chain, inputs, config, emitter, started, call)
+                else:
+                    message = chain.invoke(inputs, config=config)
+                try:
+                    return parser.invoke(message)
+                except OutputParserException:
+                    if call:
+                        call.parse_failed = True
+                    raise
+
+            try:
+                data = self.requester.request(attempt, call).model_dump()
+                if emitter and emitter.error:
+                    raise emitter.error
+            except DuplicateContent:
+                raise
+            except Exception as e:
+                self.logger.error(f"Failed to generate content for theme '{theme}': {e}")
+                if call:
+                    call.error = f"{type(e).__name__}: {e}"
+                return None
+            if emitter and emitter.quotes is not None:
+                data["quotes"] = emitter.quotes
+            return data
+
+    def _stream(self, chain, inputs, config, emitter: QuoteEmitter, started: float, call=None) -> str:
+        scanner = QuoteStreamParser()
+        text = []
+        for chunk in chain.stream(inputs, config=config):
+            if emitter.error:
+                # Another attempt's quotes were rejected; stop paying for this one
+                raise emitter.error
+            content = chunk.content if isinstance(chunk.content, str) else ""
+            text.append(content)
+            if emitter.quotes is None and scanner.feed(content) and all(scanner.result):
+                if emitter.emit(scanner.result) and call:
+                    call.quotes_seconds = time.perf_counter() - started
+        return "".join(text)
+
+    @contextmanager
+    def _track(self, theme: str):
+        if self.metrics is None:
+            yield None
+            return
+        with self.metrics.track(theme, self.settings.ai.model, PROMPT_VERSION) as call:
+            yield call
+
+    def generate_unique(self, on_quotes=None):
+        """
+        Generate content for a random theme, regenerating while it is a
+        near-duplicate of an item already in the channel's history.
+
+        :param on_quotes: Streaming mode: ``on_quotes(theme, quotes)`` as soon as the
+            quotes are complete and not a near-duplicate. Once they have been handed
+            out they are final, so the title is not checked afterwards.
+        :return: (theme, content) with content None if every attempt failed
+        """
+        attempts = 1 + (self.settings.dedup.max_regenerations if self.dedup else 0)
+        theme = None
+        for attempt in range(attempts):
+            theme = random.choice(THEMES)
+            streamed = []
 
-    def generate_batch(self, n: int = settings.ai.num_responses):
+            def quotes_ready(quotes, theme=theme):
+                duplicate = self.dedup.find_duplicate({"quotes": quotes}) if self.dedup else None
+                if duplicate is not None:
+                    raise DuplicateContent(duplicate)
+                on_quotes(theme, quotes)
+                streamed.append(quotes)
+
+            try:
+                data = self.generate(theme, quotes_ready if on_quotes else None)
+            except DuplicateContent as e:
+                self.logger.warning(f"Streamed {e}, attempt {attempt + 1}/{attempts}.")
+                continue
+            if not data or not self.dedup or streamed:
+                return theme, data
+
+            duplicate = self.dedup.find_duplicate(data)
+            if duplicate is None:
+                return theme, data
+            self.logger.warning(
+                f"Generated {duplicate['field']} is a near-duplicate of item {duplicate['item_id']} "
+                f"(similarity {duplicate['similarity']:.2f}), attempt {attempt + 1}/{attempts}."
+            )
+
+        self.logger.error(f"Dropping content: still a near-duplicate after {attempts} attempts.")
+        return theme, None
+
+    def generate_batch(self, n: int = settings.ai.num_responses, on_quotes=None, on_failed=None):
+        """
+        :param on_quotes: Streaming mode: ``on_quotes(item_id, quotes)`` as soon as an
+            item's quotes are complete (e.g. to queue its render); the item is recorded
+            in the catalog right then and completed when the rest has arrived
+        :param on_failed: Streaming mode: ``on_failed(item_id, reason)`` when an item
+            whose quotes were already handed to ``on_quotes`` could not be completed
+            (e.g. to cancel its render)
+        """
         if(n <= 0):
             self.logger.warning("Requested number of responses is non-positive. Returning empty list.")
             return []
-        if(settings.files.motivational_output.exists()):
-            self.logger.info(f"Output file {settings.files.motivational_output} already exists. Skipping generation.")
+        if(self.settings.files.motivational_output.exists()):
+            self.logger.info(f"Output file {self.settings.files.motivational_output} already exists. Skipping generation.")
             return []
         
+        started_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
         results = []
         for idx in range(n):
-            theme = random.choice(THEMES)
-            data = self.generate(theme)
+            started = time.perf_counter()
+            streamed = {}
+
+            def quotes_ready(theme, quotes):
+                streamed["id"] = self.catalog.add_generated({"quotes": quotes}, theme)
+                streamed["seconds"] = time.perf_counter() - started
+                on_quotes(streamed["id"], quotes)
+
+            theme, data = self.generate_unique(quotes_ready if on_quotes else None)
+            item_id = streamed.get("id")
             if data:
-                data["id"] = idx + 1
+                if item_id is None:
+                    data["id"] = self.catalog.add_generated(data, theme)
+                    if on_quotes:
+                        on_quotes(data["id"], data["quotes"])
+                else:
+                    data["id"] = item_id
+                    self.catalog.update_content(item_id, data)
+                if self.dedup:
+                    self.dedup.add(data["id"], data)
                 results.append(data)
-            self.logger.info(f"Generated content {idx + 1}/{n} for theme '{theme}'")
+            elif item_id is not None:
+                reason = "Content generation failed after its quotes were streamed"
+                self.catalog.mark_failed(item_id, reason)
+                if on_failed:
+                    on_failed(item_id, reason)
+            if item_id is not None:
+                self.logger.info(
+                    f"Generated content {idx + 1}/{n} for theme '{theme}': quotes after "
+                    f"{streamed['seconds']:.1f}s, complete after {time.perf_counter() - started:.1f}s"
+                )
+            else:
+                self.logger.info(f"Generated content {idx + 1}/{n} for theme '{theme}'")
 
         try:
-            save_json(results, settings.files.motivational_output)
+            save_json(results, self.settings.files.motivational_output)
             self.logger.info(f"Generated and saved {len(results)} motivational content pieces.")
         except RuntimeError as e:
             self.logger.error(f"Failed to save motivational content: {e}")
 
+        if self.metrics:
+            total = self.metrics.write_report()["total"]
+            batch = self.metrics.report(since=started_at)["total"]
+            if batch["calls"]:
+                quotes = f", quotes p50 {batch['quotes_seconds_p50']}s" if batch["quotes_seconds_p50"] is not None else ""
+                self.logger.info(
+                    f"LLM calls this batch: {batch['calls']}, p50 {batch['latency_p50']}s, "
+                    f"p95 {batch['latency_p95']}s{quotes}, {batch['parse_failures']} parse failures, "
+                    f"${batch['cost_usd']:.4f} (all time: {total['calls']} calls, "
+                    f"report in {self.settings.llm_metrics.report_file})"
+                )
+
         return results
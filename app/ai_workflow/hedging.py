@@ -0,0 +1,144 @@
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from typing import Callable, Iterable, Optional
+
+import openai
+from langchain_core.exceptions import OutputParserException
+
+from app.config.settings import settings
+
+# Errors worth another attempt; anything else (auth, bad request) fails fast
+TRANSIENT_ERRORS = (
+    TimeoutError,
+    ConnectionError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    OutputParserException,
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class HedgedRequester:
+    """
+    Runs an LLM request with a per-attempt deadline, jittered exponential
+    backoff on transient errors and optional hedging: once an attempt has
+    been running longer than the observed ``hedge_percentile`` latency, a
+    duplicate is issued and the first valid response wins.
+
+    Attempts run on daemon threads, so an abandoned slow attempt never
+    delays the caller (or interpreter exit); the client's own timeout
+    bounds how long it keeps running.
+    """
+
+    def __init__(self, logger, config=None, history: Optional[Iterable[float]] = None):
+        """
+        :param logger: Application logger instance
+        :param config: AI settings with the request/hedging fields (defaults to ``settings.ai``)
+        :param history: Recent successful latencies in seconds, to hedge from the first request
+        """
+        self.config = config or settings.ai
+        self.logger = logger
+        self.latencies = deque(history or (), maxlen=self.config.hedge_window)
+        self.lock = threading.Lock()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a duplicate attempt is issued (None = no hedging)."""
+        if not self.config.hedge:
+            return None
+        with self.lock:
+            latencies = sorted(self.latencies)
+        if len(latencies) < self.config.hedge_min_samples:
+            return self.config.hedge_after_seconds
+        return latencies[min(len(latencies) - 1, int(self.config.hedge_percentile * len(latencies)))]
+
+    @staticmethod
+    def _start(fn: Callable) -> Future:
+        future = Future()
+        future.started = time.monotonic()
+        context = contextvars.copy_context()
+
+        def run():
+            try:
+                future.set_result(context.run(fn))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="llm-attempt", daemon=True).start()
+        return future
+
+    def _hedged(self, fn: Callable, deadline: float, call=None):
+        started = time.monotonic()
+        attempt_deadline = min(deadline, started + self.config.request_timeout)
+        delay = self.hedge_delay()
+        pending = {self._start(fn)}
+        hedges = replacements = 0
+        error = None
+
+        while pending:
+            now = time.monotonic()
+            if now >= attempt_deadline:
+                raise DeadlineExceeded(f"no response within {attempt_deadline - started:.1f}s")
+            timeout = attempt_deadline - now
+            next_hedge = started + delay * (hedges + 1) if delay is not None else None
+            if next_hedge is not None and hedges < self.config.max_hedges:
+                timeout = min(timeout, max(0.0, next_hedge - now))
+
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    with self.lock:
+                        self.latencies.append(time.monotonic() - future.started)
+                    return future.result()
+                error = future.exception()
+                if pending and isinstance(error, TRANSIENT_ERRORS) and replacements < self.config.max_retries:
+                    # Still racing a slow attempt: replace the failed one right away
+                    replacements += 1
+                    if call is not None:
+                        call.retries += 1
+                    pending.add(self._start(fn))
+
+            if (not done and next_hedge is not None and hedges < self.config.max_hedges
+                    and time.monotonic() >= next_hedge):
+                hedges += 1
+                if call is not None:
+                    call.hedges += 1
+                self.logger.info(f"LLM request slower than {delay:.1f}s, issuing hedge {hedges}.")
+                pending.add(self._start(fn))
+
+        raise error
+
+    def request(self, fn: Callable, call=None):
+        """
+        Run ``fn`` (one complete attempt: model call and validation) until
+        it returns a valid result.
+
+        :param fn: Zero-argument callable; raising means the response is unusable
+        :param call: ``LLMCall`` whose ``retries``/``hedges`` are updated
+        :raises DeadlineExceeded: ``total_deadline`` passed without a valid response
+        """
+        deadline = time.monotonic() + self.config.total_deadline
+        for attempt in range(self.config.max_retries + 1):
+            try:
+                return self._hedged(fn, deadline, call)
+            except TRANSIENT_ERRORS as e:
+                remaining = deadline - time.monotonic()
+                if attempt == self.config.max_retries or remaining <= 0:
+                    raise
+                backoff = min(self.config.retry_backoff_max, self.config.retry_backoff * 2 ** attempt)
+                sleep = min(remaining, backoff * random.uniform(0.5, 1.5))
+                if call is not None:
+                    call.retries += 1
+                self.logger.warning(
+                    f"LLM request failed ({type(e).__name__}: {e}), "
+                    f"retry {attempt + 1}/{self.config.max_retries} in {sleep:.1f}s."
+                )
+                time.sleep(sleep)
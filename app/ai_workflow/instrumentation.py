@@ -0,0 +1,315 @@
+import argparse
+import datetime
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from app.config.settings import settings, LOGS_DIR
+from app.utils.logger import SingletonLogger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    theme TEXT,
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    latency_seconds REAL NOT NULL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    retries INTEGER NOT NULL DEFAULT 0,
+    hedges INTEGER NOT NULL DEFAULT 0,
+    quotes_seconds REAL,
+    parse_failed INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    cost_usd REAL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_calls_group ON llm_calls (theme, model, prompt_version);
+CREATE INDEX IF NOT EXISTS idx_llm_calls_started ON llm_calls (started_at);
+CREATE TABLE IF NOT EXISTS llm_prompts (
+    prompt_version TEXT PRIMARY KEY,
+    parts TEXT NOT NULL
+);
+"""
+
+# Columns added after the first release: (name, definition), applied on open
+MIGRATIONS = (("hedges", "INTEGER NOT NULL DEFAULT 0"), ("quotes_seconds", "REAL"))
+
+_SECTION = re.compile(r"^(\d+\.\s+[^:\n]+):?\s*$", re.MULTILINE)
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose with OpenAI tokenizers
+    return max(1, round(len(text) / 4)) if text else 0
+
+
+def prompt_parts(template: str, format_instructions: str) -> dict[str, int]:
+    """
+    Approximate prompt tokens per numbered section of the template, plus
+    the preamble and the parser's format instructions.
+    """
+    template = template.replace("{format_instructions}", "")
+    matches = list(_SECTION.finditer(template))
+    parts = {"preamble": estimate_tokens(template[:matches[0].start()] if matches else template)}
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(template)
+        parts[match.group(1).strip()] = estimate_tokens(template[match.start():end])
+    parts["format_instructions"] = estimate_tokens(format_instructions)
+    return parts
+
+
+@dataclass
+class LLMCall:
+    theme: Optional[str]
+    model: str
+    prompt_version: str
+    started_at: str = ""
+    latency_seconds: float = 0.0
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    retries: int = 0
+    hedges: int = 0
+    # Streaming mode: seconds until the quotes were complete
+    quotes_seconds: Optional[float] = None
+    parse_failed: bool = False
+    error: Optional[str] = None
+    cost_usd: Optional[float] = None
+
+
+class UsageCallback(BaseCallbackHandler):
+    """
+    Collects token usage and retries of the model runs inside one chain
+    invocation.
+    """
+
+    def __init__(self, call: LLMCall):
+        self.call = call
+        self.lock = threading.Lock()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        prompt_tokens = completion_tokens = None
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage:
+            prompt_tokens, completion_tokens = usage.get("prompt_tokens"), usage.get("completion_tokens")
+        else:
+            for generation in (response.generations[0] if response.generations else []):
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if metadata:
+                    prompt_tokens, completion_tokens = metadata.get("input_tokens"), metadata.get("output_tokens")
+                    break
+
+        with self.lock:
+            if prompt_tokens is not None:
+                self.call.prompt_tokens = (self.call.prompt_tokens or 0) + prompt_tokens
+            if completion_tokens is not None:
+                self.call.completion_tokens = (self.call.completion_tokens or 0) + completion_tokens
+
+    def on_retry(self, retry_state, *, run_id: UUID, **kwargs):
+        with self.lock:
+            self.call.retries += 1
+
+
+class LLMMetrics:
+    """
+    Persistent per-call LLM metrics (latency, tokens, retries, parse
+    failures, estimated cost) with a report aggregated per theme, model
+    and prompt version.
+    """
+
+    def __init__(self, logger, config=None):
+        """
+        :param logger: Application logger instance
+        :param config: Metrics settings (defaults to ``settings.llm_metrics``)
+        """
+        self.config = config or settings.llm_metrics
+        self.logger = logger
+        self.db_file = Path(self.config.db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+
+    @staticmethod
+    def _migrate(conn):
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(llm_calls)")}
+        for name, definition in MIGRATIONS:
+            if name not in columns:
+                conn.execute(f"ALTER TABLE llm_calls ADD COLUMN {name} {definition}")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, timeout=self.config.busy_timeout, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def cost(self, model: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> Optional[float]:
+        """Estimated cost in USD from ``prices`` (USD per million input/output tokens)."""
+        prices = self.config.prices.get(model)
+        if prices is None or prompt_tokens is None:
+            return None
+        return (prompt_tokens * prices[0] + (completion_tokens or 0) * prices[1]) / 1_000_000
+
+    def register_prompt(self, prompt_version: str, parts: dict[str, int]):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_prompts (prompt_version, parts) VALUES (?, ?)",
+                (prompt_version, json.dumps(parts)),
+            )
+
+    @contextmanager
+    def track(self, theme: Optional[str], model: str, prompt_version: str):
+        """
+        Measure one logical LLM request. Yields the ``LLMCall``; pass
+        ``UsageCallback(call)`` to the chain and set ``parse_failed`` on
+        parser errors. The call is recorded even if the block raises.
+        """
+        call = LLMCall(theme=theme, model=model, prompt_version=prompt_version, started_at=_now())
+        start = time.perf_counter()
+        try:
+            yield call
+        except Exception as e:
+            call.error = call.error or f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            call.latency_seconds = time.perf_counter() - start
+            call.cost_usd = self.cost(model, call.prompt_tokens, call.completion_tokens)
+            self.record(call)
+
+    def record(self, call: LLMCall):
+        fields = asdict(call)
+        fields["parse_failed"] = int(call.parse_failed)
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    f"INSERT INTO llm_calls ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})",
+                    tuple(fields.values()),
+                )
+        except sqlite3.Error as e:
+            # Metrics must never break content generation
+            self.logger.warning(f"Failed to record LLM call metrics: {e}")
+
+    def recent_latencies(self, model: str, limit: int) -> list[float]:
+        """Latencies of the latest successful calls to ``model``, oldest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT latency_seconds FROM llm_calls WHERE model = ? AND error IS NULL ORDER BY id DESC LIMIT ?",
+                (model, limit),
+            ).fetchall()
+        return [row["latency_seconds"] for row in reversed(rows)]
+
+    # ---------------------------------------------------------------
+    # Report
+    # ---------------------------------------------------------------
+    @staticmethod
+    def _percentile(values: list[float], q: float) -> Optional[float]:
+        if not values:
+            return None
+        values = sorted(values)
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def report(self, since: Optional[str] = None) -> dict:
+        """
+        Aggregate recorded calls per (theme, model, prompt version).
+
+        :param since: ISO timestamp; only calls started at or after it
+        """
+        query = "SELECT * FROM llm_calls"
+        params = []
+        if since:
+            query += " WHERE started_at >= ?"
+            params.append(since)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY id", params).fetchall()
+            prompts = {r["prompt_version"]: json.loads(r["parts"]) for r in conn.execute("SELECT * FROM llm_prompts")}
+
+        groups: dict[tuple, list] = {}
+        for row in rows:
+            groups.setdefault((row["theme"], row["model"], row["prompt_version"]), []).append(row)
+
+        def summarize(calls: list) -> dict:
+            latencies = [c["latency_seconds"] for c in calls]
+            prompt_tokens = [c["prompt_tokens"] for c in calls if c["prompt_tokens"] is not None]
+            completion_tokens = [c["completion_tokens"] for c in calls if c["completion_tokens"] is not None]
+            costs = [c["cost_usd"] for c in calls if c["cost_usd"] is not None]
+            quotes_seconds = [c["quotes_seconds"] for c in calls if c["quotes_seconds"] is not None]
+            return {
+                "calls": len(calls),
+                "errors": sum(1 for c in calls if c["error"]),
+                "parse_failures": sum(c["parse_failed"] for c in calls),
+                "retries": sum(c["retries"] for c in calls),
+                "hedges": sum(c["hedges"] for c in calls),
+                "latency_mean": round(sum(latencies) / len(latencies), 3),
+                "latency_p50": round(self._percentile(latencies, 0.5), 3),
+                "latency_p95": round(self._percentile(latencies, 0.95), 3),
+                "quotes_seconds_p50": round(self._percentile(quotes_seconds, 0.5), 3) if quotes_seconds else None,
+                "prompt_tokens_mean": round(sum(prompt_tokens) / len(prompt_tokens), 1) if prompt_tokens else None,
+                "completion_tokens_mean": round(sum(completion_tokens) / len(completion_tokens), 1) if completion_tokens else None,
+                "cost_usd": round(sum(costs), 6),
+            }
+
+        groups_report = [
+            {"theme": theme, "model": model, "prompt_version": version, **summarize(calls)}
+            for (theme, model, version), calls in groups.items()
+        ]
+        groups_report.sort(key=lambda g: (-g["cost_usd"], -g["latency_mean"]))
+        return {
+            "generated_at": _now(),
+            "since": since,
+            "total": summarize(rows) if rows else {"calls": 0},
+            "groups": groups_report,
+            "prompt_parts": prompts,
+        }
+
+    def write_report(self, since: Optional[str] = None) -> dict:
+        """Write the report to ``report_file`` as JSON and return it."""
+        report = self.report(since)
+        path = Path(self.config.report_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report LLM latency, token usage and cost per theme/model/prompt.")
+    parser.add_argument("--since", default=None, help="Only calls started at or after this ISO timestamp")
+    parser.add_argument("--top", type=int, default=20, help="Number of groups to print")
+    args = parser.parse_args()
+
+    logger = SingletonLogger(name="llm_metrics", log_level=settings.log_level, log_dir=LOGS_DIR).get_logger()
+    report = LLMMetrics(logger).write_report(args.since)
+
+    print(f"total: {report['total']}")
+    for group in report["groups"][:args.top]:
+        print(
+            f"{group['theme']} | {group['model']} | {group['prompt_version']}: {group['calls']} calls, "
+            f"p50 {group['latency_p50']}s, p95 {group['latency_p95']}s, "
+            f"{group['prompt_tokens_mean']}/{group['completion_tokens_mean']} tokens, "
+            f"{group['parse_failures']} parse failures, {group['retries']} retries, "
+            f"{group['hedges']} hedges, ${group['cost_usd']}"
+        )
+    for version, parts in report["prompt_parts"].items():
+        print(f"prompt {version}: {parts}")
+    print(f"report written to {settings.llm_metrics.report_file}")
+
+
+if __name__ == "__main__":
+    main()
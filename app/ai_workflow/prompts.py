@@ -1,3 +1,4 @@
+import hashlib
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from .schemas import MotivationalContent
@@ -43,3 +44,7 @@ Instructions:
 
 {format_instructions}
 """)
+
+# Bump when the prompt is reworked on purpose; the hash also tells edits apart
+PROMPT_LABEL = "v1"
+PROMPT_VERSION = f"{PROMPT_LABEL}-{hashlib.sha1(PROMPT_TEMPLATE.messages[0].prompt.template.encode('utf-8')).hexdigest()[:8]}"
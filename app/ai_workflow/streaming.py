@@ -0,0 +1,107 @@
+import json
+import threading
+from typing import Callable, Optional
+
+
+class QuoteStreamParser:
+    """
+    Incremental JSON scanner that picks one top-level string array (the
+    ``quotes``) out of a streamed ``MotivationalContent`` response as soon
+    as its closing bracket arrives, without waiting for the rest of the
+    object. Text before the first ``{`` (code fences, prose) is ignored.
+    """
+
+    def __init__(self, key: str = "quotes"):
+        self.key = key
+        self.result: Optional[list[str]] = None
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._token: list[str] = []
+        # Last string seen at the top level and the key it turned out to be
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        self._capturing = False
+        self._items: list[str] = []
+
+    def feed(self, text: str) -> Optional[list[str]]:
+        """
+        Consume the next chunk of the response.
+
+        :return: The complete array once it has been closed, else None
+        """
+        for char in text:
+            if self.result is not None:
+                break
+            self._step(char)
+        return self.result
+
+    def _step(self, char: str):
+        if not self._started:
+            if char == "{":
+                self._started = True
+                self._depth = 1
+            return
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                self._string_done(json.loads('"' + "".join(self._token) + '"'))
+                return
+            self._token.append(char)
+            return
+
+        if char == '"':
+            self._in_string = True
+            self._token = []
+        elif char in "{[":
+            if char == "[" and self._depth == 1 and self._key == self.key:
+                self._capturing = True
+                self._items = []
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._capturing and self._depth == 1:
+                self._capturing = False
+                self.result = self._items
+        elif char == ":" and self._depth == 1:
+            self._key = self._last_string
+        elif char == "," and self._depth == 1:
+            self._key = self._last_string = None
+
+    def _string_done(self, value: str):
+        if self._capturing and self._depth == 2:
+            self._items.append(value)
+        elif self._depth == 1:
+            self._last_string = value
+
+
+class QuoteEmitter:
+    """
+    Hands the quotes of one logical request to ``on_quotes`` exactly once,
+    whichever attempt (retry or hedge) completes them first.
+    """
+
+    def __init__(self, on_quotes: Callable[[list[str]], None]):
+        self.on_quotes = on_quotes
+        self.quotes: Optional[list[str]] = None
+        # Raised by on_quotes (e.g. the quotes were rejected); fails the whole request
+        self.error: Optional[BaseException] = None
+        self.lock = threading.Lock()
+
+    def emit(self, quotes: list[str]) -> bool:
+        with self.lock:
+            if self.quotes is not None:
+                return False
+            self.quotes = quotes
+        try:
+            self.on_quotes(quotes)
+        except Exception as e:
+            self.error = e
+            raise
+        return True
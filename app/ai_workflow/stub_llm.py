@@ -0,0 +1,165 @@
+import argparse
+import copy
+import json
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from app.config.settings import settings, LOGS_DIR
+from app.utils.logger import SingletonLogger
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Offline stand-in for the chat model with a configurable latency
+    distribution (including a slow tail), transient failures and invalid
+    responses. Answers are valid ``MotivationalContent`` JSON.
+    """
+
+    latency: float = 1.0
+    jitter: float = 0.3
+    # Probability and duration of a tail (hanging) response
+    tail_rate: float = 0.05
+    tail_latency: float = 60.0
+    # Probability of a transient failure / an unparseable answer
+    error_rate: float = 0.0
+    invalid_rate: float = 0.0
+    # Streaming: share of the latency before the first token, characters per chunk
+    first_token_share: float = 0.1
+    chunk_chars: int = 16
+    seed: Optional[int] = None
+
+    _random: random.Random = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _count: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any):
+        self._random = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _draw(self) -> tuple[int, float, float]:
+        with self._lock:
+            self._count += 1
+            number = self._count
+            roll = self._random.random()
+            tail = self._random.random() < self.tail_rate
+            delay = self.tail_latency if tail else max(0.0, self._random.gauss(self.latency, self.jitter))
+        return number, roll, delay
+
+    def _content(self, number: int, roll: float) -> str:
+        if roll < self.error_rate:
+            raise ConnectionError("stub transient failure")
+        if roll < self.error_rate + self.invalid_rate:
+            return "Sorry, here is some motivation: {"
+        return json.dumps({
+            "quotes": [f"Wake up and begin {number}", "Commit to the daily work",
+                       "Act before you feel ready", "Become who you promised"],
+            "video_title": f"Motivation that changes everything #{number}",
+            "youtube_description": "Motivation and growth mindset. " * 40,
+            "video_tags": ["motivation", "growth mindset", "inspiration"],
+        })
+
+    @staticmethod
+    def _usage(messages: list[BaseMessage], content: str) -> dict:
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        return {
+            "input_tokens": prompt_tokens,
+            "output_tokens": len(content) // 4,
+            "total_tokens": prompt_tokens + len(content) // 4,
+        }
+
+    def _generate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        number, roll, delay = self._draw()
+        time.sleep(delay)
+        content = self._content(number, roll)
+        message = AIMessage(content=content, usage_metadata=self._usage(messages, content))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        number, roll, delay = self._draw()
+        # Time to first token, then the rest of the latency spread evenly over the answer
+        time.sleep(delay * self.first_token_share)
+        content = self._content(number, roll)
+        pieces = [content[i:i + self.chunk_chars] for i in range(0, len(content), self.chunk_chars)]
+        for piece in pieces:
+            time.sleep(delay * (1 - self.first_token_share) / len(pieces))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(messages, content)))
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare plain, hedged and streamed LLM requests against a stub model.")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--tail-rate", type=float, default=0.1)
+    parser.add_argument("--tail-latency", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--invalid-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--stream", action="store_true", help="Also measure time to quotes in streaming mode")
+    args = parser.parse_args()
+
+    # Imported here so the stub model itself carries no generator dependencies
+    from .generator import ContentGenerator
+
+    logger = SingletonLogger(name="llm_stub_benchmark", log_level=settings.log_level, log_dir=LOGS_DIR).get_logger()
+    modes = [(False, False), (True, False)] + ([(True, True)] if args.stream else [])
+    for hedge, stream in modes:
+        with tempfile.TemporaryDirectory(prefix="llm_stub_") as tmp:
+            bench = copy.deepcopy(settings)
+            bench.catalog.db_file = Path(tmp) / "catalog.sqlite3"
+            bench.llm_metrics.db_file = Path(tmp) / "llm_metrics.sqlite3"
+            bench.dedup.enabled = False
+            bench.ai.hedge = hedge
+            bench.ai.hedge_after_seconds = args.latency * 2
+            llm = StubChatModel(
+                latency=args.latency,
+                jitter=args.latency * 0.3,
+                tail_rate=args.tail_rate,
+                tail_latency=args.tail_latency,
+                error_rate=args.error_rate,
+                invalid_rate=args.invalid_rate,
+                seed=args.seed,
+            )
+            generator = ContentGenerator(logger, bench, llm=llm)
+
+            latencies, quote_latencies, failed = [], [], 0
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                on_quotes = (lambda quotes: quote_latencies.append(time.perf_counter() - started)) if stream else None
+                if generator.generate("discipline", on_quotes) is None:
+                    failed += 1
+                latencies.append(time.perf_counter() - started)
+            total = generator.metrics.report()["total"]
+            quotes = (
+                f", quotes p50 {_percentile(quote_latencies, 0.5):.2f}s p95 {_percentile(quote_latencies, 0.95):.2f}s"
+                if quote_latencies else ""
+            )
+            print(
+                f"hedging {'on ' if hedge else 'off'}{', streaming' if stream else ''}: "
+                f"p50 {_percentile(latencies, 0.5):.2f}s, "
+                f"p95 {_percentile(latencies, 0.95):.2f}s, max {max(latencies):.2f}s{quotes}, "
+                f"{failed} failed, {total['retries']} retries, {total['hedges']} hedges"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import copy
+import datetime
+import json
+from dataclasses import is_dataclass
+from pathlib import Path
+from typing import Optional
+
+from .settings import settings, Settings, VariantProfile, BASE_DIR, DATA_DIR, YOUTUBE_SECRET_DIR, logger
+
+CHANNELS_DIR: Path = BASE_DIR / "channels"
+CHANNELS_DATA_DIR: Path = DATA_DIR / "channels"
+
+
+def _convert(current, value):
+    if isinstance(current, Path):
+        path = Path(value)
+        return path if path.is_absolute() else BASE_DIR / path
+    if isinstance(current, datetime.time):
+        return datetime.time.fromisoformat(value)
+    if isinstance(current, list) and current and isinstance(current[0], datetime.time):
+        return [datetime.time.fromisoformat(v) for v in value]
+    if isinstance(current, list) and current and isinstance(current[0], VariantProfile):
+        return [VariantProfile(**v) for v in value]
+    return value
+
+
+def _apply_overrides(target, overrides: dict, prefix: str = ""):
+    for key, value in overrides.items():
+        if not hasattr(target, key):
+            raise ValueError(f"Unknown channel setting '{prefix}{key}'")
+        current = getattr(target, key)
+        if is_dataclass(current) and isinstance(value, dict):
+            _apply_overrides(current, value, prefix=f"{prefix}{key}.")
+        else:
+            setattr(target, key, _convert(current, value))
+
+
+def channel_settings(name: str, overrides: Optional[dict] = None) -> Settings:
+    """
+    Build an isolated ``Settings`` for one channel.
+
+    Output folders, token file and catalog/ledger channel name are derived
+    from the channel name; ``assets_dir`` points the asset paths at the
+    channel's own videos/musics/logo/fonts; everything else in
+    ``overrides`` maps onto the nested settings dataclasses, e.g.
+    ``{"youtube": {"default_tags": [...], "publish_times": ["06:00"]}}``.
+    """
+    overrides = dict(overrides or {})
+    channel = copy.deepcopy(settings)
+
+    data_dir = CHANNELS_DATA_DIR / name
+    reels_dir = data_dir / "generated" / "reels"
+    channel.files.motivational_output = data_dir / "generated" / "motivational_content.json"
+    channel.files.generated_reel_file = reels_dir
+    channel.youtube.video_folder = reels_dir
+    channel.variants.output_dir = data_dir / "generated" / "variants"
+    channel.hooks.library_dir = data_dir / "cache" / "hooks"
+    channel.youtube.uploaded_reels_path = data_dir / "uploaded_reels"
+    channel.youtube.last_upload_file = data_dir / "last_upload_time.txt"
+    channel.youtube.token_file = YOUTUBE_SECRET_DIR / f"token_{name}.pickle"
+    channel.youtube.channel = name
+    channel.catalog.channel = name
+
+    assets_dir = overrides.pop("assets_dir", None)
+    if assets_dir:
+        assets = _convert(BASE_DIR, assets_dir)
+        channel.assets_dir = assets
+        channel.files.video_file = assets / "videos"
+        channel.files.music_file = assets / "musics"
+        channel.files.logo_file = assets / "logo" / "logo.png"
+
+    overrides.pop("name", None)
+    _apply_overrides(channel, overrides)
+
+    for directory in (reels_dir, channel.youtube.uploaded_reels_path):
+        directory.mkdir(parents=True, exist_ok=True)
+    return channel
+
+
+def load_channel_profiles(names: Optional[list[str]] = None, channels_dir: Path = CHANNELS_DIR) -> dict[str, Settings]:
+    """
+    Load ``channels/<name>.json`` profiles (all of them if ``names`` is None).
+    """
+    profiles = {}
+    files = sorted(Path(channels_dir).glob("*.json")) if names is None else [
+        Path(channels_dir) / f"{name}.json" for name in names
+    ]
+
+    for file in files:
+        if not file.exists():
+            raise FileNotFoundError(f"Channel profile not found: {file}")
+        with open(file, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+        name = overrides.get("name", file.stem)
+        profiles[name] = channel_settings(name, overrides)
+        logger.info(f"Loaded channel profile: {name}")
+
+    return profiles
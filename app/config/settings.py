@@ -2,9 +2,10 @@ from pathlib import Path
 import logging
 import os
 from dataclasses import dataclass, field
+from typing import Optional
 from dotenv import load_dotenv
 import datetime
-from app.utils.logger import SingletonLogger
+from app.utils.logger import SingletonLogger, configure_logging
 
 load_dotenv()
 
@@ -21,6 +22,7 @@ DATA_DIR: Path = BASE_DIR / "data"
 DATA_GENERATED_DIR: Path = DATA_DIR / "generated"
 REELS_DIR: Path = DATA_GENERATED_DIR / "reels"
 UPLOADED_REELS_DIR: Path = DATA_DIR / "uploaded_reels"
+CACHE_DIR: Path = DATA_DIR / "cache"
 
 directories = [
     LOGS_DIR,
@@ -32,13 +34,18 @@ directories = [
     DATA_DIR,
     DATA_GENERATED_DIR,
     REELS_DIR,
-    UPLOADED_REELS_DIR
+    UPLOADED_REELS_DIR,
+    CACHE_DIR
 ]
 
 # Logging Configuration
 LOG_LEVEL = logging.DEBUG if os.getenv("ENV") == "development" else logging.INFO
-log_dir = Path("logs")
-logger = SingletonLogger(name=__name__, log_level=LOG_LEVEL, log_dir=log_dir).get_logger()
+# "queue": records are written by a background thread; "sync": written inline
+LOG_MODE = os.getenv("LOG_MODE", "queue")
+# "text" or "json" (JSON-lines log file with run/reel/stage ids)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+configure_logging(queue_mode=LOG_MODE == "queue", json_lines=LOG_FORMAT == "json")
+logger = SingletonLogger(name=__name__, log_level=LOG_LEVEL, log_dir=LOGS_DIR).get_logger()
 
 def create_project_structure(dir_list: list[Path]):
     for directory in dir_list:
@@ -61,8 +68,8 @@ class YouTubeConfig:
     uploaded_reels_path: Path = UPLOADED_REELS_DIR
     last_upload_file: Path = DATA_DIR / "last_upload_time.txt"
 
-    # Scheduling times
-    publish_times_sri_lanka: list = field(
+    # Scheduling times (local wall-clock times in `timezone`)
+    publish_times: list = field(
         default_factory=lambda: [
             datetime.time(6, 0),
             datetime.time(13, 0),
@@ -70,7 +77,38 @@ class YouTubeConfig:
             datetime.time(21, 0)
         ]
     )
-    timezone_offset: float = 5.5  # Sri Lanka UTC+5:30
+    timezone: str = "Asia/Colombo"  # IANA zone, DST-aware
+
+    # Publish slot ledger
+    channel: str = "default"
+    slot_ledger_file: Path = DATA_DIR / "publish_slots.sqlite3"
+    slot_horizon_days: int = 366
+    min_lead_minutes: int = 30
+    reservation_ttl_hours: float = 6.0
+
+    # Upload tuning (chunk size in bytes, -1 = single request)
+    upload_chunk_size: int = -1
+    upload_num_retries: int = 5
+    # Base delay in seconds for exponential backoff between upload retries
+    upload_retry_backoff: float = 1.0
+
+    # Streaming upload while encoding: fragment length of the MP4, bytes per
+    # request (multiple of 256 KiB), polling interval and stall timeout in seconds
+    stream_fragment_seconds: float = 1.0
+    stream_chunk_size: int = 1024 * 1024
+    stream_poll_interval: float = 0.2
+    stream_stall_timeout: float = 300.0
+
+    # YouTube Data API quota: daily units per Google Cloud project, shared by
+    # every uploader process through the ledger; resets at midnight Pacific time
+    quota_project: str = "default"
+    quota_ledger_file: Path = DATA_DIR / "quota_ledger.sqlite3"
+    quota_daily_units: int = 10000
+    quota_upload_cost: int = 1600
+    quota_timezone: str = "America/Los_Angeles"
+    quota_reset_time: datetime.time = datetime.time(0, 0)
+    # Reservations of crashed uploaders are counted as spent after this long
+    quota_reservation_ttl_hours: float = 6.0
 
     # Default tags
     default_tags: list[str] = field(
@@ -99,6 +137,210 @@ class VideoConfig:
     music_volume: float = 1
     fade_duration_clip: float = 0.3
 
+# Batch Audio Stage Settings
+@dataclass
+class AudioConfig:
+    # Render batches video-only and add all soundtracks in one audio stage
+    batch_mix: bool = True
+    # Fades at the reel edges, in seconds
+    fade_in: float = 0.2
+    fade_out: float = 0.5
+    # Used when the encoder profile does not fix the AAC parameters
+    sample_rate: int = 44100
+    bitrate_kbps: int = 128
+    # Soundtracks AAC-encoded per ffmpeg process
+    encode_batch_size: int = 16
+    # Decoded music tracks kept in memory (~21 MB of PCM per minute of music)
+    track_cache_size: int = 8
+    ffmpeg_timeout: float = 300.0
+
+# Pre-encoded Hook Intro Library Settings
+@dataclass
+class HookLibraryConfig:
+    enabled: bool = True
+    # One video-only segment per hook phrase x color set, named by its fingerprint
+    library_dir: Path = CACHE_DIR / "hooks"
+    # Segments no library has used for this long are pruned (channels may share library_dir)
+    prune_after_days: float = 30.0
+    ffmpeg_timeout: float = 120.0
+
+# Multi-platform Output Variant Settings
+@dataclass
+class VariantProfile:
+    name: str
+    target_width: int = 1080
+    target_height: int = 1920
+    # Longest reel the platform takes (None = full length)
+    max_duration: Optional[float] = None
+    crf: int = 23
+    maxrate_kbps: int = 6000
+    bufsize_kbps: int = 12000
+    audio_bitrate_kbps: int = 128
+    # Logo height relative to the frame height, its placement ("bottom", "top",
+    # "top-right", "bottom-right" or "none") and margin in output pixels
+    logo_scale: float = 0.1
+    logo_position: str = "bottom"
+    logo_margin: int = 250
+
+@dataclass
+class VariantsConfig:
+    # Encode these profiles next to the main reel from the same composition pass
+    enabled: bool = False
+    output_dir: Path = DATA_GENERATED_DIR / "variants"
+    profiles: list[VariantProfile] = field(
+        default_factory=lambda: [
+            VariantProfile("tiktok", maxrate_kbps=5000, bufsize_kbps=10000,
+                           logo_scale=0.06, logo_position="top-right", logo_margin=60),
+            VariantProfile("instagram", max_duration=90.0, logo_margin=320),
+            VariantProfile("facebook", target_width=720, target_height=1280, crf=25,
+                           maxrate_kbps=3000, bufsize_kbps=6000, audio_bitrate_kbps=96, logo_margin=170),
+        ]
+    )
+    ffmpeg_timeout: float = 900.0
+
+# Pre-upload Reel Verification Settings
+@dataclass
+class VerifyConfig:
+    enabled: bool = True
+    # Results per file hash and check parameters
+    cache_file: Path = CACHE_DIR / "reel_checks.sqlite3"
+    busy_timeout: float = 30.0
+    min_duration: float = 1.0
+    max_duration: float = 60.0
+    fps_tolerance: float = 0.5
+    require_audio: bool = True
+    # Evenly spaced frames decoded as grey thumbnails of this size
+    sampled_frames: int = 6
+    sample_width: int = 54
+    sample_height: int = 96
+    # Frames whose 99th-percentile luma (0-255) is at or below this count as black
+    black_luma: float = 24.0
+    max_black_ratio: float = 0.5
+    # Mean absolute luma change below which consecutive sampled frames count as identical
+    frozen_difference: float = 1.0
+    ffmpeg_timeout: float = 60.0
+
+# Draft (QA preview) Render Settings
+@dataclass
+class DraftConfig:
+    output_dir: Path = DATA_GENERATED_DIR / "drafts"
+    # "video" (low-resolution reel) or "sheet" (contact sheet of key frames)
+    mode: str = "video"
+    # Resolution relative to the full render
+    scale: float = 0.25
+    fps: int = 12
+    preset: str = "ultrafast"
+    crf: int = 32
+    sheet_columns: int = 6
+
+# Resident Render Service Settings
+@dataclass
+class ServiceConfig:
+    host: str = "127.0.0.1"
+    port: int = 8765
+    # Renders running at once inside the service (others wait their turn)
+    max_concurrent_renders: int = 1
+    # Client-side timeout for one render request
+    request_timeout: float = 900.0
+    # Warm cache bounds
+    text_cache_size: int = 256
+    music_cache_seconds: float = 120.0
+
+# Encoder Selection & Calibration Settings
+@dataclass
+class EncoderConfig:
+    # Probe/calibration results are cached per host + ffmpeg version
+    cache_file: Path = CACHE_DIR / "encoder_profiles.json"
+    probe_timeout: float = 10.0
+
+    # Candidate profiles benchmarked on a synthetic clip
+    cpu_codecs: list[str] = field(default_factory=lambda: ["libx264"])
+    cpu_presets: list[str] = field(
+        default_factory=lambda: ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium"]
+    )
+    thread_counts: list[int] = field(
+        default_factory=lambda: sorted({max(1, (os.cpu_count() or 2) // 2), os.cpu_count() or 2})
+    )
+    calibration_duration: float = 2.0
+    calibration_source: str = "testsrc2"
+    calibration_timeout: float = 120.0
+
+    # Quality / bitrate target the chosen profile must meet
+    min_psnr: float = 38.0
+    max_bitrate_kbps: int = 12000
+
+    # Upload-optimised output: capped CRF, fixed GOP, faststart, fixed-rate AAC
+    upload_optimized: bool = True
+    maxrate_kbps: int = 6000
+    bufsize_kbps: int = 12000
+    keyint_seconds: float = 2.0
+    b_frames: int = 2
+    audio_codec: str = "aac"
+    audio_bitrate_kbps: int = 128
+    audio_sample_rate: int = 48000
+
+# Parallel Render Settings
+@dataclass
+class ConcurrencyConfig:
+    # Concurrent renders are adjusted between these bounds at runtime
+    min_workers: int = 1
+    max_workers: int = max(1, (os.cpu_count() or 2) // 4)
+    initial_workers: int = 1
+
+    # Resource targets for the whole render process tree
+    memory_budget_mb: int = 6144
+    target_cpu_percent: float = 85.0
+    cpu_tolerance_percent: float = 10.0
+
+    # Watchdog timing
+    sample_interval: float = 1.0
+    adjust_interval: float = 5.0
+    worker_sample_interval: float = 0.25
+
+# Batch Render Planning Settings
+@dataclass
+class BatchPlanConfig:
+    # Plan every reel of a batch up front and render reels sharing sources close together
+    enabled: bool = True
+    # Reels whose source files count as still cached when the next one starts
+    # (never fewer than concurrency.max_workers, which render side by side)
+    cache_window: int = 4
+
+# Distributed Render Queue Settings
+@dataclass
+class QueueConfig:
+    # Must live on the filesystem shared by all render nodes
+    db_file: Path = DATA_DIR / "render_queue.sqlite3"
+    lease_seconds: float = 300.0
+    heartbeat_interval: float = 30.0
+    max_attempts: int = 3
+    poll_interval: float = 5.0
+    busy_timeout: float = 30.0
+
+# Content Lifecycle Catalog Settings
+@dataclass
+class CatalogConfig:
+    db_file: Path = DATA_DIR / "catalog.sqlite3"
+    busy_timeout: float = 30.0
+    channel: str = "default"
+
+# Near-duplicate content detection (MinHash/LSH over quotes and titles)
+@dataclass
+class DedupConfig:
+    enabled: bool = True
+    db_file: Path = DATA_DIR / "dedup_index.sqlite3"
+    busy_timeout: float = 30.0
+    # Estimated Jaccard similarity at or above which content is a near-duplicate
+    threshold: float = 0.7
+    # Signature length and LSH banding (num_perm must be a multiple of bands)
+    num_perm: int = 64
+    bands: int = 16
+    # Character shingle length
+    shingle_size: int = 4
+    seed: int = 1
+    # Regeneration attempts before a near-duplicate item is dropped
+    max_regenerations: int = 3
+
 # AI / OpenAI Settings
 @dataclass
 class AISettings:
@@ -107,6 +349,37 @@ class AISettings:
     num_responses: int = 1
     api_key: str = os.getenv("OPENAI_API_KEY")
 
+    # Deadlines: per attempt and for the whole request including retries
+    request_timeout: float = 45.0
+    total_deadline: float = 120.0
+    # Retries on transient errors (timeouts, 429/5xx, unparseable answers)
+    max_retries: int = 3
+    retry_backoff: float = 1.0
+    retry_backoff_max: float = 10.0
+    # Hedging: duplicate a request still running after the hedge_percentile latency
+    hedge: bool = True
+    hedge_percentile: float = 0.9
+    max_hedges: int = 1
+    # Hedge delay until hedge_min_samples latencies have been observed
+    hedge_after_seconds: float = 20.0
+    hedge_min_samples: int = 20
+    hedge_window: int = 200
+
+# LLM Instrumentation Settings
+@dataclass
+class LLMMetricsConfig:
+    enabled: bool = True
+    db_file: Path = DATA_DIR / "llm_metrics.sqlite3"
+    report_file: Path = DATA_DIR / "llm_report.json"
+    busy_timeout: float = 30.0
+    # Model -> (USD per million prompt tokens, USD per million completion tokens)
+    prices: dict = field(default_factory=lambda: {
+        "gpt-4o": (2.50, 10.00),
+        "gpt-4o-mini": (0.15, 0.60),
+        "gpt-4.1": (2.00, 8.00),
+        "gpt-4.1-mini": (0.40, 1.60),
+    })
+
 # File Output Settings
 @dataclass
 class FileSettings:
@@ -125,8 +398,21 @@ class Settings:
     data_dir: Path = DATA_DIR
     log_level: int = LOG_LEVEL
     ai: AISettings = field(default_factory=AISettings)         
+    llm_metrics: LLMMetricsConfig = field(default_factory=LLMMetricsConfig)
     files: FileSettings = field(default_factory=FileSettings)
     video: VideoConfig = field(default_factory=VideoConfig) 
+    draft: DraftConfig = field(default_factory=DraftConfig)
+    audio: AudioConfig = field(default_factory=AudioConfig)
+    hooks: HookLibraryConfig = field(default_factory=HookLibraryConfig)
+    variants: VariantsConfig = field(default_factory=VariantsConfig)
+    verify: VerifyConfig = field(default_factory=VerifyConfig)
+    encoder: EncoderConfig = field(default_factory=EncoderConfig)
+    concurrency: ConcurrencyConfig = field(default_factory=ConcurrencyConfig)
+    batch_plan: BatchPlanConfig = field(default_factory=BatchPlanConfig)
+    queue: QueueConfig = field(default_factory=QueueConfig)
+    service: ServiceConfig = field(default_factory=ServiceConfig)
+    catalog: CatalogConfig = field(default_factory=CatalogConfig)
+    dedup: DedupConfig = field(default_factory=DedupConfig)
     youtube: YouTubeConfig = field(default_factory=YouTubeConfig)
 
 # Singleton instance for use across the project
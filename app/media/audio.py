@@ -0,0 +1,211 @@
+import subprocess
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from moviepy.config import FFMPEG_BINARY
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from app.config.settings import settings
+
+CHANNELS = 2
+
+
+@dataclass
+class SoundtrackJob:
+    item_id: int
+    # Video-only render to mux the soundtrack into
+    video_path: Path
+    output_path: Path
+    music_path: Optional[str]
+    # Start position in the music track, in seconds
+    offset: float = 0.0
+
+
+class AudioMixer:
+    """
+    Batch audio stage for rendered reels.
+
+    Each music track is decoded to PCM once per batch, every reel's
+    soundtrack is cut from it with NumPy (loop, offset, volume, edge fades),
+    all soundtracks of a batch are AAC-encoded by a single ffmpeg process,
+    and each track is muxed next to the untouched video stream.
+    """
+
+    def __init__(self, logger, config=None, video_config=None, encoder=None):
+        """
+        :param logger: Application logger instance
+        :param config: Audio settings (defaults to ``settings.audio``)
+        :param video_config: Video settings providing ``music_volume`` (defaults to ``settings.video``)
+        :param encoder: Selected ``EncoderProfile``, for the AAC bitrate/sample rate and faststart
+        """
+        self.config = config or settings.audio
+        self.video_config = video_config or settings.video
+        self.logger = logger
+        self.sample_rate = (encoder and encoder.audio_sample_rate) or self.config.sample_rate
+        self.bitrate_kbps = (encoder and encoder.audio_bitrate_kbps) or self.config.bitrate_kbps
+        self.faststart = bool(encoder and encoder.faststart)
+        # (path, mtime, size) -> PCM, least recently used first
+        self._tracks: OrderedDict = OrderedDict()
+
+    def _run(self, cmd: list[str], **kwargs) -> subprocess.CompletedProcess:
+        result = subprocess.run(cmd, capture_output=True, timeout=self.config.ffmpeg_timeout, **kwargs)
+        if result.returncode != 0:
+            stderr = result.stderr.decode("utf-8", "replace").strip()
+            raise RuntimeError(stderr.splitlines()[-1] if stderr else f"ffmpeg exited with {result.returncode}")
+        return result
+
+    # ---------------------------------------------------------------
+    # PCM
+    # ---------------------------------------------------------------
+    def decode(self, path: str) -> Optional[np.ndarray]:
+        """
+        Decode a music track to float32 ``(samples, 2)`` PCM. Tracks stay
+        cached until the file changes or ``track_cache_size`` newer tracks
+        were decoded.
+        """
+        try:
+            stat = Path(path).stat()
+        except OSError as e:
+            self.logger.warning(f"Failed to decode audio {Path(path).name}: {e}")
+            return None
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        if key in self._tracks:
+            self._tracks.move_to_end(key)
+            return self._tracks[key]
+
+        try:
+            result = self._run([
+                FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-i", str(path),
+                "-vn", "-f", "f32le", "-acodec", "pcm_f32le",
+                "-ac", str(CHANNELS), "-ar", str(self.sample_rate), "-",
+            ])
+        except Exception as e:
+            self.logger.warning(f"Failed to decode audio {Path(path).name}: {e}")
+            return None
+        track = np.frombuffer(result.stdout, dtype=np.float32).reshape(-1, CHANNELS)
+
+        # Drop the samples of a file that was replaced in place
+        for stale in [k for k in self._tracks if k[0] == key[0]]:
+            del self._tracks[stale]
+        self._tracks[key] = track if len(track) else None
+        while len(self._tracks) > max(1, self.config.track_cache_size):
+            self._tracks.popitem(last=False)
+        return self._tracks[key]
+
+    def mix(self, track: np.ndarray, duration: float, offset: float = 0.0) -> np.ndarray:
+        """
+        Soundtrack of ``duration`` seconds: the track looped from ``offset``,
+        volume-scaled, with fades at the reel edges.
+        """
+        count = int(round(duration * self.sample_rate))
+        start = int(round(offset * self.sample_rate))
+        soundtrack = track[(np.arange(count) + start) % len(track)] * np.float32(self.video_config.music_volume)
+
+        fade_in = min(count, int(self.config.fade_in * self.sample_rate))
+        fade_out = min(count, int(self.config.fade_out * self.sample_rate))
+        if fade_in:
+            soundtrack[:fade_in] *= np.linspace(0.0, 1.0, fade_in, dtype=np.float32)[:, None]
+        if fade_out:
+            soundtrack[count - fade_out:] *= np.linspace(1.0, 0.0, fade_out, dtype=np.float32)[:, None]
+        return soundtrack
+
+    # ---------------------------------------------------------------
+    # Encode / mux
+    # ---------------------------------------------------------------
+    def encode_batch(self, soundtracks: list[np.ndarray], outputs: list[Path]):
+        """
+        AAC-encode several soundtracks with one ffmpeg process: the tracks
+        are streamed back to back and split with sample-exact ``atrim``.
+        """
+        bounds = np.cumsum([0] + [len(s) for s in soundtracks])
+        splits = "".join(f"[s{i}]" for i in range(len(soundtracks)))
+        graph = [f"[0:a]asplit={len(soundtracks)}{splits}"] if len(soundtracks) > 1 else ["[0:a]anull[s0]"]
+        output_args = []
+        for i, output in enumerate(outputs):
+            graph.append(
+                f"[s{i}]atrim=start_sample={bounds[i]}:end_sample={bounds[i + 1]},asetpts=PTS-STARTPTS[a{i}]"
+            )
+            output_args += ["-map", f"[a{i}]", "-c:a", "aac", "-b:a", f"{self.bitrate_kbps}k", str(output)]
+
+        self._run(
+            [
+                FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y",
+                "-f", "f32le", "-ar", str(self.sample_rate), "-ac", str(CHANNELS), "-i", "-",
+                "-filter_complex", ";".join(graph),
+                *output_args,
+            ],
+            input=np.concatenate(soundtracks).tobytes(),
+        )
+
+    def mux(self, video_path: Path, audio_path: Optional[Path], output_path: Path):
+        """Combine a video-only file with its soundtrack by stream copy."""
+        cmd = [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y", "-i", str(video_path)]
+        if audio_path is not None:
+            cmd += ["-i", str(audio_path), "-map", "0:v:0", "-map", "1:a:0"]
+        cmd += ["-c", "copy"]
+        if self.faststart:
+            cmd += ["-movflags", "+faststart"]
+        self._run(cmd + [str(output_path)])
+
+    def process(self, jobs: list[SoundtrackJob], publish) -> dict[int, bool]:
+        """
+        Add soundtracks to a batch of video-only renders.
+
+        :param jobs: Rendered reels awaiting audio
+        :param publish: ``publish(partial_path, output_path)`` moving a finished file into place
+        :return: Item id -> whether the reel was finished
+        """
+        start = time.perf_counter()
+        finished = {}
+        with tempfile.TemporaryDirectory(prefix="soundtracks_") as tmp:
+            mixed = []
+            for job in jobs:
+                track = self.decode(job.music_path) if job.music_path else None
+                if track is None:
+                    mixed.append((job, None))
+                    continue
+                try:
+                    duration = ffmpeg_parse_infos(str(job.video_path))["duration"]
+                except Exception as e:
+                    self.logger.error(f"Failed to probe rendered video {job.item_id}: {e}")
+                    finished[job.item_id] = False
+                    continue
+                mixed.append((job, self.mix(track, duration, job.offset)))
+
+            with_audio = [(job, soundtrack) for job, soundtrack in mixed if soundtrack is not None]
+            audio_paths = {job.item_id: Path(tmp) / f"{job.item_id}.m4a" for job, _ in with_audio}
+            size = max(1, self.config.encode_batch_size)
+            for i in range(0, len(with_audio), size):
+                group = with_audio[i:i + size]
+                try:
+                    self.encode_batch([s for _, s in group], [audio_paths[job.item_id] for job, _ in group])
+                except Exception as e:
+                    self.logger.error(f"Failed to encode soundtracks {[job.item_id for job, _ in group]}: {e}")
+                    for job, _ in group:
+                        finished[job.item_id] = False
+                        audio_paths.pop(job.item_id)
+
+            for job, soundtrack in mixed:
+                if job.item_id in finished:
+                    continue
+                partial_path = job.video_path.with_name(f".{job.output_path.stem}.muxed{job.output_path.suffix}")
+                try:
+                    self.mux(job.video_path, audio_paths.get(job.item_id), partial_path)
+                    publish(partial_path, job.output_path)
+                    job.video_path.unlink(missing_ok=True)
+                    finished[job.item_id] = True
+                except Exception as e:
+                    self.logger.error(f"Failed to mux soundtrack of reel {job.item_id}: {e}")
+                    partial_path.unlink(missing_ok=True)
+                    finished[job.item_id] = False
+
+        self.logger.info(
+            f"Audio stage: {sum(finished.values())}/{len(jobs)} reels finished in "
+            f"{time.perf_counter() - start:.2f}s ({len(self._tracks)} tracks cached)."
+        )
+        return finished
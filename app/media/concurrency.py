@@ -0,0 +1,260 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import psutil
+from app.config.settings import settings
+
+
+@dataclass
+class ResourceSample:
+    rss_mb: float
+    cpu_percent: float
+    load_avg: float
+
+
+@dataclass
+class RenderResult:
+    job_id: int
+    success: bool
+    peak_rss_mb: float = 0.0
+    seconds: float = 0.0
+
+
+class ResourceSampler:
+    """
+    Samples RSS of the current process tree (including ffmpeg children),
+    system CPU utilisation and the 1-minute load average.
+    """
+
+    def __init__(self, process: Optional[psutil.Process] = None):
+        self.process = process or psutil.Process()
+        # First call primes psutil's CPU counters and always returns 0.0
+        psutil.cpu_percent(interval=None)
+
+    def tree_rss_mb(self) -> float:
+        total = 0
+        try:
+            processes = [self.process] + self.process.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return 0.0
+
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / (1024 * 1024)
+
+    def sample(self) -> ResourceSample:
+        load_avg = os.getloadavg()[0] if hasattr(os, "getloadavg") else 0.0
+        return ResourceSample(
+            rss_mb=self.tree_rss_mb(),
+            cpu_percent=psutil.cpu_percent(interval=None),
+            load_avg=load_avg,
+        )
+
+
+class PeakMemoryTracker:
+    """
+    Context manager that records the peak RSS of this process tree while
+    a single reel renders.
+
+    Usage::
+
+        with PeakMemoryTracker(0.25) as tracker:
+            render()
+        tracker.peak_mb
+    """
+
+    def __init__(self, interval: float = settings.concurrency.worker_sample_interval):
+        self.interval = interval
+        self.sampler = ResourceSampler()
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        self.peak_mb = max(self.peak_mb, self.sampler.tree_rss_mb())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="peak-memory-tracker", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return False
+
+
+class AdaptiveRenderPool:
+    """
+    Runs render jobs on a process pool while a watchdog samples memory,
+    CPU and load, raising or lowering the number of concurrent renders to
+    stay within the configured memory budget and CPU target.
+
+    When the memory budget is hit, new jobs are paused (never killed)
+    until running renders finish and free memory.
+    """
+
+    def __init__(
+        self,
+        logger,
+        worker: Callable[..., RenderResult],
+        initializer: Optional[Callable] = None,
+        config=None,
+        initargs: tuple = (),
+    ):
+        """
+        :param logger: Application logger instance
+        :param worker: Picklable function returning a ``RenderResult``
+        :param initializer: Optional per-worker-process initializer
+        :param config: Concurrency settings (defaults to ``settings.concurrency``)
+        :param initargs: Picklable arguments passed to ``initializer``
+        """
+        self.config = config or settings.concurrency
+        self.logger = logger
+        self.worker = worker
+        self.initializer = initializer
+        self.initargs = initargs
+        self.sampler = ResourceSampler()
+
+        self.max_limit = max(self.config.min_workers, self.config.max_workers)
+        self.limit = min(max(self.config.initial_workers, self.config.min_workers), self.max_limit)
+        self.paused = False
+        self.reel_estimate_mb = 0.0
+        self._last_adjust = time.monotonic()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.max_limit, initializer=self.initializer, initargs=self.initargs)
+
+    def _has_headroom(self, sample: ResourceSample, running: int) -> bool:
+        if running == 0:
+            # Always allow one job, otherwise the batch could never progress
+            return True
+        if self.paused or running >= self.limit:
+            return False
+        return sample.rss_mb + self.reel_estimate_mb <= self.config.memory_budget_mb
+
+    def _adjust(self, sample: ResourceSample, running: int):
+        budget = self.config.memory_budget_mb
+
+        if sample.rss_mb >= budget:
+            if not self.paused:
+                self.logger.warning(
+                    f"Memory budget reached ({sample.rss_mb:.0f}/{budget} MB), pausing new renders."
+                )
+            self.paused = True
+            self.limit = max(self.config.min_workers, min(self.limit, running) - 1)
+            return
+
+        if self.paused and sample.rss_mb + self.reel_estimate_mb <= budget:
+            self.paused = False
+            self.logger.info(f"Memory back under budget ({sample.rss_mb:.0f}/{budget} MB), resuming renders.")
+
+        now = time.monotonic()
+        if now - self._last_adjust < self.config.adjust_interval:
+            return
+        self._last_adjust = now
+
+        target = self.config.target_cpu_percent
+        tolerance = self.config.cpu_tolerance_percent
+        headroom = budget - sample.rss_mb
+
+        if (
+            sample.cpu_percent < target - tolerance
+            and headroom >= self.reel_estimate_mb
+            and running >= self.limit
+            and self.limit < self.max_limit
+        ):
+            self.limit += 1
+            self.logger.info(
+                f"Raising render concurrency to {self.limit} "
+                f"(cpu {sample.cpu_percent:.0f}%, rss {sample.rss_mb:.0f} MB, load {sample.load_avg:.1f})"
+            )
+        elif sample.cpu_percent > target + tolerance and self.limit > self.config.min_workers:
+            self.limit -= 1
+            self.logger.info(
+                f"Lowering render concurrency to {self.limit} "
+                f"(cpu {sample.cpu_percent:.0f}%, rss {sample.rss_mb:.0f} MB, load {sample.load_avg:.1f})"
+            )
+
+    def run(self, jobs: list[tuple[int, tuple]]) -> list[RenderResult]:
+        """
+        Execute ``worker(*args)`` for every ``(job_id, args)`` pair.
+
+        :param jobs: Jobs in submission order
+        :return: One ``RenderResult`` per job, in completion order
+        """
+        pending = deque(jobs)
+        retried: set[int] = set()
+        running: dict = {}
+        results: list[RenderResult] = []
+        executor = self._new_executor()
+
+        try:
+            while pending or running:
+                sample = self.sampler.sample()
+                self._adjust(sample, len(running))
+
+                while pending and self._has_headroom(sample, len(running)):
+                    job_id, args = pending.popleft()
+                    running[executor.submit(self.worker, *args)] = (job_id, args)
+                    sample.rss_mb += self.reel_estimate_mb
+
+                done, _ = wait(running, timeout=self.config.sample_interval, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    job_id, args = running.pop(future)
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        broken = True
+                        running[future] = (job_id, args)
+                        continue
+                    except Exception as e:
+                        self.logger.error(f"Render job {job_id} raised: {e}")
+                        result = RenderResult(job_id=job_id, success=False)
+
+                    self.reel_estimate_mb = max(self.reel_estimate_mb, result.peak_rss_mb)
+                    results.append(result)
+
+                if broken:
+                    executor = self._recover(executor, running, pending, retried, results)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        return results
+
+    def _recover(self, executor, running: dict, pending: deque, retried: set, results: list) -> ProcessPoolExecutor:
+        """
+        A worker died (typically OOM-killed). Requeue its in-flight jobs once,
+        shrink the concurrency ceiling and start a fresh pool.
+        """
+        self.logger.error("A render worker died unexpectedly, restarting the pool with lower concurrency.")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        for job_id, args in running.values():
+            if job_id in retried:
+                self.logger.error(f"Render job {job_id} failed twice, giving up.")
+                results.append(RenderResult(job_id=job_id, success=False))
+            else:
+                retried.add(job_id)
+                pending.appendleft((job_id, args))
+        running.clear()
+
+        self.max_limit = max(self.config.min_workers, self.max_limit - 1)
+        self.limit = max(self.config.min_workers, min(self.limit - 1, self.max_limit))
+        return self._new_executor()
@@ -0,0 +1,382 @@
+import hashlib
+import json
+import re
+import socket
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional
+
+from moviepy.config import FFMPEG_BINARY
+from app.config.settings import settings
+from app.utils.save_json import save_json
+
+
+@dataclass
+class EncoderProfile:
+    """
+    A concrete encoder choice (codec, preset, threads, quality) plus the
+    calibration numbers that justified it.
+    """
+    codec: str
+    preset: str
+    threads: Optional[int]
+    crf: int
+    hardware: bool = False
+    encode_seconds: Optional[float] = None
+    bitrate_kbps: Optional[float] = None
+    psnr: Optional[float] = None
+
+    # Upload-optimised output (unset = encoder/MoviePy defaults)
+    maxrate_kbps: Optional[int] = None
+    bufsize_kbps: Optional[int] = None
+    gop: Optional[int] = None
+    b_frames: Optional[int] = None
+    faststart: bool = False
+    audio_codec: Optional[str] = None
+    audio_bitrate_kbps: Optional[int] = None
+    audio_sample_rate: Optional[int] = None
+
+    def quality_params(self) -> list[str]:
+        """Constant-quality parameters (capped if ``maxrate_kbps`` is set)."""
+        if self.hardware:
+            params = ["-rc", "vbr", "-cq", str(self.crf)]
+        else:
+            params = ["-crf", str(self.crf)]
+        if self.maxrate_kbps:
+            params += ["-maxrate", f"{self.maxrate_kbps}k", "-bufsize", f"{self.bufsize_kbps or 2 * self.maxrate_kbps}k"]
+        return params
+
+    def video_params(self) -> list[str]:
+        """All video encoder parameters: quality, GOP structure and profile."""
+        params = self.quality_params()
+        if self.gop:
+            # Closed GOPs with a fixed keyframe interval, scene cuts allowed in between
+            params += ["-g", str(self.gop), "-keyint_min", str(max(1, self.gop // 2)), "-flags", "+cgop"]
+        if self.b_frames is not None:
+            params += ["-bf", str(self.b_frames)]
+        if self.gop or self.maxrate_kbps:
+            params += ["-profile:v", "high"]
+        return params
+
+    def ffmpeg_params(self, fragment_seconds: Optional[float] = None) -> list[str]:
+        """
+        Video parameters plus container flags.
+
+        :param fragment_seconds: Write a fragmented MP4 (empty moov, a fragment at
+            every keyframe and at least every ``fragment_seconds``) that only ever
+            grows, so it can be uploaded while it is being written
+        """
+        params = self.video_params()
+        if fragment_seconds:
+            params += [
+                "-movflags", "+frag_keyframe+empty_moov+default_base_moof",
+                "-frag_duration", str(int(fragment_seconds * 1_000_000)),
+            ]
+        elif self.faststart:
+            # Put the moov atom first so uploads/players can start before the end
+            params += ["-movflags", "+faststart"]
+        return params
+
+    def write_kwargs(self, fragment_seconds: Optional[float] = None) -> dict:
+        """Keyword arguments for ``VideoClip.write_videofile``."""
+        kwargs = {
+            "codec": self.codec,
+            "preset": self.preset,
+            "threads": self.threads,
+            "ffmpeg_params": self.ffmpeg_params(fragment_seconds),
+        }
+        if self.audio_codec:
+            kwargs["audio_codec"] = self.audio_codec
+        if self.audio_bitrate_kbps:
+            kwargs["audio_bitrate"] = f"{self.audio_bitrate_kbps}k"
+        if self.audio_sample_rate:
+            kwargs["audio_fps"] = self.audio_sample_rate
+        return kwargs
+
+
+class EncoderSelector:
+    """
+    Probes the available ffmpeg encoders once per host and ffmpeg version,
+    benchmarks the candidate profiles on a synthetic clip and returns the
+    fastest profile that meets the configured quality/bitrate target.
+
+    Results are cached on disk (``EncoderConfig.cache_file``) and in-process,
+    so constructing several generators never re-probes.
+    """
+
+    _profiles: dict[str, EncoderProfile] = {}
+    _ffmpeg_version: Optional[str] = None
+
+    def __init__(self, logger, config=None, video_config=None):
+        """
+        :param logger: Application logger instance
+        :param config: Encoder settings (defaults to ``settings.encoder``)
+        :param video_config: Video settings (defaults to ``settings.video``)
+        """
+        self.config = config or settings.encoder
+        self.video_config = video_config or settings.video
+        self.logger = logger
+
+    # ---------------------------------------------------------------
+    # Probing
+    # ---------------------------------------------------------------
+    def _run(self, cmd: list[str], timeout: float) -> subprocess.CompletedProcess:
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+
+    def ffmpeg_version(self) -> str:
+        """Return the first line of ``ffmpeg -version`` (or 'unknown')."""
+        if EncoderSelector._ffmpeg_version is not None:
+            return EncoderSelector._ffmpeg_version
+        try:
+            result = self._run([FFMPEG_BINARY, "-hide_banner", "-version"], self.config.probe_timeout)
+            version = result.stdout.splitlines()[0].strip() if result.stdout else "unknown"
+        except Exception as e:
+            self.logger.warning(f"Could not read ffmpeg version: {e}")
+            return "unknown"
+        EncoderSelector._ffmpeg_version = version
+        return version
+
+    def probe(self) -> dict:
+        """
+        Detect the video encoders compiled into ffmpeg and whether an
+        NVIDIA GPU is usable for NVENC.
+        """
+        encoders = []
+        try:
+            result = self._run([FFMPEG_BINARY, "-hide_banner", "-encoders"], self.config.probe_timeout)
+            for line in result.stdout.splitlines():
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].startswith("V"):
+                    encoders.append(parts[1])
+        except Exception as e:
+            self.logger.warning(f"Encoder probe error: {e}")
+
+        nvidia_gpu = False
+        if self.video_config.gpu_codec in encoders:
+            try:
+                nvidia_gpu = self._run(["nvidia-smi"], self.config.probe_timeout).returncode == 0
+            except Exception as e:
+                self.logger.warning(f"GPU detection error: {e}")
+
+        return {"encoders": encoders, "nvidia_gpu": nvidia_gpu}
+
+    def cache_key(self, ffmpeg_version: str) -> str:
+        """
+        Cache key: host + ffmpeg version + a fingerprint of everything that
+        influences the calibration outcome.
+        """
+        fingerprint = json.dumps(
+            {
+                "cpu_codecs": self.config.cpu_codecs,
+                "cpu_presets": self.config.cpu_presets,
+                "thread_counts": self.config.thread_counts,
+                "use_gpu": self.video_config.use_gpu,
+                "gpu_codec": self.video_config.gpu_codec,
+                "gpu_preset": self.video_config.gpu_preset,
+                "crf": self.video_config.crf,
+                "size": [self.video_config.target_width, self.video_config.target_height],
+                "fps": self.video_config.fps,
+                "min_psnr": self.config.min_psnr,
+                "max_bitrate_kbps": self.config.max_bitrate_kbps,
+                "upload": self.upload_fields(),
+            },
+            sort_keys=True,
+        )
+        digest = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:12]
+        return f"{socket.gethostname()}|{ffmpeg_version}|{digest}"
+
+    # ---------------------------------------------------------------
+    # Calibration
+    # ---------------------------------------------------------------
+    def upload_fields(self) -> dict:
+        """Upload-optimised output settings shared by every candidate profile."""
+        if not self.config.upload_optimized:
+            return {}
+        return {
+            "maxrate_kbps": self.config.maxrate_kbps,
+            "bufsize_kbps": self.config.bufsize_kbps,
+            "gop": max(1, round(self.video_config.fps * self.config.keyint_seconds)),
+            "b_frames": self.config.b_frames,
+            "faststart": True,
+            "audio_codec": self.config.audio_codec,
+            "audio_bitrate_kbps": self.config.audio_bitrate_kbps,
+            "audio_sample_rate": self.config.audio_sample_rate,
+        }
+
+    def candidates(self, probe: dict) -> list[EncoderProfile]:
+        """Build the list of profiles worth benchmarking on this host."""
+        profiles = []
+        if self.video_config.use_gpu and probe["nvidia_gpu"]:
+            profiles.append(EncoderProfile(
+                codec=self.video_config.gpu_codec,
+                preset=self.video_config.gpu_preset,
+                threads=None,
+                crf=self.video_config.crf,
+                hardware=True,
+                **self.upload_fields(),
+            ))
+
+        for codec in self.config.cpu_codecs:
+            if probe["encoders"] and codec not in probe["encoders"]:
+                continue
+            for preset in self.config.cpu_presets:
+                for threads in self.config.thread_counts:
+                    profiles.append(EncoderProfile(
+                        codec=codec,
+                        preset=preset,
+                        threads=threads,
+                        crf=self.video_config.crf,
+                        **self.upload_fields(),
+                    ))
+        return profiles
+
+    def _synthetic_source(self) -> list[str]:
+        size = f"{self.video_config.target_width}x{self.video_config.target_height}"
+        return [
+            "-f", "lavfi",
+            "-i", (
+                f"{self.config.calibration_source}=size={size}"
+                f":rate={self.video_config.fps}"
+                f":duration={self.config.calibration_duration}"
+            ),
+        ]
+
+    def _measure_psnr(self, encoded: Path) -> Optional[float]:
+        cmd = [
+            FFMPEG_BINARY, "-hide_banner", "-nostats",
+            "-i", str(encoded),
+            *self._synthetic_source(),
+            "-lavfi", "[0:v][1:v]psnr",
+            "-f", "null", "-",
+        ]
+        result = self._run(cmd, self.config.calibration_timeout)
+        match = re.search(r"average:([\d.]+|inf)", result.stderr)
+        if not match:
+            return None
+        return float("inf") if match.group(1) == "inf" else float(match.group(1))
+
+    def benchmark(self, profile: EncoderProfile, work_dir: Path) -> Optional[EncoderProfile]:
+        """
+        Encode the synthetic clip with ``profile`` and fill in its encode
+        time, bitrate and PSNR. Returns None if the encoder fails.
+        """
+        output = work_dir / f"{profile.codec}_{profile.preset}_{profile.threads}.mp4"
+        cmd = [
+            FFMPEG_BINARY, "-hide_banner", "-y", "-loglevel", "error",
+            *self._synthetic_source(),
+            "-c:v", profile.codec,
+            "-preset", profile.preset,
+            *profile.video_params(),
+            "-pix_fmt", "yuv420p",
+        ]
+        if profile.threads is not None:
+            cmd.extend(["-threads", str(profile.threads)])
+        cmd.append(str(output))
+
+        try:
+            start = time.perf_counter()
+            result = self._run(cmd, self.config.calibration_timeout)
+            elapsed = time.perf_counter() - start
+            if result.returncode != 0 or not output.exists():
+                self.logger.debug(f"Calibration failed for {profile.codec}/{profile.preset}: {result.stderr.strip()}")
+                return None
+
+            profile.encode_seconds = round(elapsed, 3)
+            profile.bitrate_kbps = round(output.stat().st_size * 8 / 1000 / self.config.calibration_duration, 1)
+            profile.psnr = self._measure_psnr(output)
+            return profile
+        except Exception as e:
+            self.logger.warning(f"Calibration error for {profile.codec}/{profile.preset}: {e}")
+            return None
+        finally:
+            output.unlink(missing_ok=True)
+
+    def meets_target(self, profile: EncoderProfile) -> bool:
+        if profile.bitrate_kbps is None or profile.bitrate_kbps > self.config.max_bitrate_kbps:
+            return False
+        return profile.psnr is not None and profile.psnr >= self.config.min_psnr
+
+    def calibrate(self, probe: dict) -> EncoderProfile:
+        """
+        Benchmark all candidates and return the fastest one meeting the
+        quality/bitrate target (or the best-quality result if none does).
+        """
+        results = []
+        with tempfile.TemporaryDirectory(prefix="encoder_calibration_") as tmp:
+            for candidate in self.candidates(probe):
+                measured = self.benchmark(candidate, Path(tmp))
+                if measured:
+                    self.logger.info(
+                        f"Calibrated {measured.codec}/{measured.preset}/threads={measured.threads}: "
+                        f"{measured.encode_seconds:.2f}s, {measured.bitrate_kbps:.0f} kbps, PSNR {measured.psnr}"
+                    )
+                    results.append(measured)
+
+        if not results:
+            self.logger.warning("Encoder calibration produced no usable profile, using libx264/medium.")
+            return EncoderProfile(
+                codec="libx264", preset="medium", threads=None, crf=self.video_config.crf, **self.upload_fields()
+            )
+
+        passing = [p for p in results if self.meets_target(p)]
+        if passing:
+            return min(passing, key=lambda p: p.encode_seconds)
+
+        self.logger.warning("No encoder profile met the quality/bitrate target, using the highest quality one.")
+        return max(results, key=lambda p: (p.psnr or 0, -p.encode_seconds))
+
+    # ---------------------------------------------------------------
+    # Cache
+    # ---------------------------------------------------------------
+    def _load_cache(self) -> dict:
+        try:
+            with open(self.config.cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable encoder cache {self.config.cache_file}: {e}")
+            return {}
+
+    def get_profile(self, force: bool = False) -> EncoderProfile:
+        """
+        Return the encoder profile for this host, probing and calibrating
+        only if no cached result matches the current host/ffmpeg/config.
+
+        :param force: Ignore cached results and recalibrate
+        """
+        key = self.cache_key(self.ffmpeg_version())
+        if not force and key in self._profiles:
+            return self._profiles[key]
+
+        cache = self._load_cache()
+        if not force and key in cache:
+            profile = EncoderProfile(**cache[key]["profile"])
+            self.logger.info(f"Using cached encoder profile: {profile.codec}/{profile.preset}")
+            EncoderSelector._profiles[key] = profile
+            return profile
+
+        self.logger.info("Probing encoders and running calibration benchmark...")
+        probe = self.probe()
+        if self.video_config.use_gpu and not probe["nvidia_gpu"]:
+            self.logger.warning("GPU not available, using CPU for encoding.")
+
+        profile = self.calibrate(probe)
+        cache[key] = {
+            "probe": probe,
+            "profile": asdict(profile),
+            "calibrated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        try:
+            save_json(cache, self.config.cache_file)
+        except RuntimeError as e:
+            self.logger.warning(f"Failed to save encoder cache: {e}")
+
+        self.logger.info(
+            f"Selected encoder profile: {profile.codec}/{profile.preset}/threads={profile.threads} (crf {profile.crf})"
+        )
+        EncoderSelector._profiles[key] = profile
+        return profile
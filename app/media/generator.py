@@ -1,101 +1,669 @@
-import random
+import math
+import time
 import logging
+from dataclasses import replace
 from pathlib import Path
+from typing import Optional
+import numpy as np
+from PIL import Image
 from moviepy import VideoFileClip, AudioFileClip, concatenate_videoclips
-from app.config.settings import settings
+from app.config.settings import settings, LOGS_DIR
+from app.utils.logger import SingletonLogger, log_context
+from app.storage.catalog import ContentCatalog
 from .processor import VideoProcessor
+from .plan import ClipPlan, ReelPlan, ReelPlanner
+from .audio import AudioMixer, SoundtrackJob
 from .utils import MediaUtils
+from .encoder import EncoderSelector
+from .hooks import HookLibrary
+from .variants import MultiOutputEncoder, OutputTarget
+from .concurrency import AdaptiveRenderPool, PeakMemoryTracker, RenderResult
+
+# Per-process generator used by parallel render workers
+_worker_generator = None
+
+
+def _init_render_worker(app_settings=settings):
+    global _worker_generator
+    logger = SingletonLogger(name="render_worker", log_level=settings.log_level, log_dir=LOGS_DIR).get_logger()
+    _worker_generator = VideoGenerator(logger, app_settings)
+
+
+def _render_in_worker(
+    quotes: list[str], output_index: int, draft: bool = False, defer_audio: bool = False
+) -> RenderResult:
+    return _worker_generator.render_tracked(quotes, output_index, draft, defer_audio)
+
 
 class VideoGenerator:
-    def __init__(self, logger):
+    def __init__(self, logger, app_settings=settings, warm: bool = False):
         """
         Main class for generating motivational videos.
-        Handles GPU detection, clip processing, and batch generation.
+        Handles encoder selection, clip processing, and batch generation.
+
+        :param app_settings: Settings to render with (a channel profile or the global settings)
+        :param warm: Keep fonts, logo, text and decoded music in memory between reels
         """
-        self.config = settings.video
-        self.processor = VideoProcessor(logger)
+        self.settings = app_settings
+        self.config = app_settings.video
+        self.draft_config = app_settings.draft
+        self.concurrency = app_settings.concurrency
+        self.processor = VideoProcessor(logger, app_settings, warm=warm)
+        self.draft_processor = VideoProcessor(logger, app_settings, scale=app_settings.draft.scale, warm=warm)
+        self.planner = ReelPlanner(logger, self.processor)
         self.utils = MediaUtils(logger)
-        self.gpu_available = self.utils.check_gpu_support()
+        self.catalog = ContentCatalog(logger, app_settings.catalog)
         self.logger = logger
-        if not self.gpu_available:
-            self.config.use_gpu = False
-            self.logger.warning("GPU not available, using CPU for encoding.")
+        selector = EncoderSelector(logger, app_settings.encoder, app_settings.video)
+        self.encoder = selector.get_profile()
+        self.mixer = AudioMixer(logger, app_settings.audio, app_settings.video, self.encoder)
+        self.hook_library = HookLibrary(
+            logger, self.processor, self.encoder, app_settings.hooks, selector.ffmpeg_version()
+        )
+        self.variants = app_settings.variants
+        self.multi_encoder = MultiOutputEncoder(logger, app_settings.variants)
 
     def generate_video(
         self,
         quotes: list[str],
         output_index: int,
-        videos_folder: str = settings.files.video_file,
-        music_folder: str = settings.files.music_file,
-        logo_path: str = settings.files.logo_file,
-        output_folder: str = settings.files.generated_reel_file,
+        videos_folder: str = None,
+        music_folder: str = None,
+        logo_path: str = None,
+        output_folder: str = None,
+        draft: bool = False,
+        defer_audio: bool = False,
+        fragment_seconds: float = None,
     ) -> bool:
         """
-        Generate a single motivational video.
+        Generate a single motivational video, or a draft preview of it.
+        Both follow the item's stored plan, so an approved draft renders
+        to exactly the same reel.
+
+        With ``variants.enabled``, the platform variants are encoded from
+        the same composition pass (soundtrack included, ``defer_audio`` is ignored).
+
+        :param defer_audio: Write the video stream only; ``finish_audio`` adds the soundtrack
+        :param fragment_seconds: Write a fragmented MP4 that can be uploaded while it is encoded
+        """
+        with log_context(reel_id=output_index, stage="draft" if draft else "render"):
+            plan = self.plan_reel(quotes, output_index, videos_folder, music_folder, logo_path)
+            if draft:
+                return self.render_draft(plan)
+            if self.variants.enabled and not fragment_seconds:
+                return self.render_variants(plan, output_folder)
+            return self._render(plan, output_folder, defer_audio, fragment_seconds)
+
+    def output_path(self, item_id: int, output_folder: str = None, draft: bool = False) -> Path:
+        """Where the reel (or its draft) of ``item_id`` is written."""
+        if draft:
+            suffix = ".png" if self.draft_config.mode == "sheet" else ".mp4"
+            return Path(self.draft_config.output_dir) / f"reel_{item_id}_draft{suffix}"
+        return Path(output_folder or self.settings.files.generated_reel_file) / f"reel_{item_id}.mp4"
+
+    def variant_path(self, item_id: int, name: str) -> Path:
+        """Where the ``name`` platform variant of ``item_id`` is written."""
+        return Path(self.variants.output_dir) / name / f"reel_{item_id}.mp4"
+
+    @staticmethod
+    def video_only_path(output_path: Path) -> Path:
+        """Hidden video-only render awaiting its soundtrack."""
+        return output_path.with_name(f".{output_path.stem}.video{output_path.suffix}")
+
+    def warm_up(self):
+        """
+        Load assets and probe source clips ahead of the first reel.
+        """
+        start = time.perf_counter()
+        files = self.settings.files
+        clips = self.planner.warm_up(files.video_file)
+        for processor in (self.processor, self.draft_processor):
+            processor.warm_up(files.music_file, files.logo_file)
+        hooks = self.hook_library.build(files.logo_file) if not self.variants.enabled else 0
+        self.logger.info(
+            f"Render assets warm in {time.perf_counter() - start:.1f}s: {clips} source clips, "
+            f"{hooks} encoded hooks, {self.processor.cache_stats()}"
+        )
+
+    def plan_reel(
+        self,
+        quotes: list[str],
+        output_index: int,
+        videos_folder: str = None,
+        music_folder: str = None,
+        logo_path: str = None,
+    ) -> ReelPlan:
+        """
+        Load the item's stored plan, or make and store a new one.
+        """
+        plan = self._stored_plan(quotes, output_index)
+        if plan:
+            self.logger.info(f"Reusing stored plan for reel {output_index}.")
+            return plan
+
+        plan = self.planner.plan(
+            output_index,
+            quotes,
+            videos_folder or self.settings.files.video_file,
+            music_folder or self.settings.files.music_file,
+            logo_path or self.settings.files.logo_file,
+        )
+        self.catalog.set_plan(output_index, plan.to_dict())
+        return plan
+
+    def _state(self, item_id: int) -> Optional[str]:
+        """Catalog state of the item (None if it is not in the catalog)."""
+        item = self.catalog.get(item_id)
+        return item["state"] if item else None
+
+    def _stored_plan(self, quotes: list[str], output_index: int) -> Optional[ReelPlan]:
+        stored = self.catalog.get_plan(output_index)
+        if not stored:
+            return None
+        plan = ReelPlan.from_dict(stored)
+        missing = [c.path for c in plan.clips if not Path(c.path).exists()]
+        if plan.quotes == list(quotes) and not missing:
+            return plan
+        self.logger.warning(
+            f"Stored plan for reel {output_index} is stale "
+            f"({'missing sources' if missing else 'quotes changed'}), planning again."
+        )
+        return None
+
+    def plan_batch(self, items: list[dict]) -> list[ReelPlan]:
+        """
+        Plan every reel of a batch before the first render: valid stored
+        plans are kept, the rest are planned together (balanced source and
+        music use) and stored. The plans are returned in render order,
+        with reels reading the same files next to each other.
         """
-        Path(output_folder).mkdir(exist_ok=True)
+        files = self.settings.files
+        window = max(self.settings.batch_plan.cache_window, self.concurrency.max_workers)
+        kept, requests = [], []
+        for item in items:
+            plan = self._stored_plan(item["quotes"], item["id"])
+            if plan:
+                kept.append(plan)
+            else:
+                requests.append((item["id"], item["quotes"]))
+
+        planned = self.planner.plan_batch(requests, files.video_file, files.music_file, files.logo_file, kept)
+        for plan in planned:
+            self.catalog.set_plan(plan.item_id, plan.to_dict())
+
+        by_id = {plan.item_id: plan for plan in kept + planned}
+        plans = [by_id[item["id"]] for item in items]
+        ordered = self.planner.order(plans, window)
+
+        before = self.planner.locality(plans, window)
+        after = self.planner.locality(ordered, window)
+        self.logger.info(
+            f"Batch planned: {len(planned)} new, {len(kept)} stored plans. Render order reads "
+            f"{after.hot}/{after.opens} source files while cached (item order: {before.hot}), "
+            f"{after.cold_bytes / (1024 * 1024):.0f} MB cold instead of {before.cold_bytes / (1024 * 1024):.0f} MB "
+            f"(window of {window} reels)."
+        )
+        return ordered
+
+    def _open_clip(self, clip: ClipPlan, processor: VideoProcessor) -> VideoFileClip:
+        factor = max(processor.config.target_width / clip.width, processor.config.target_height / clip.height)
+        if factor >= 1:
+            return VideoFileClip(clip.path)
+        # Have ffmpeg downscale while decoding instead of resizing full frames in Python
+        return VideoFileClip(
+            clip.path,
+            target_resolution=(math.ceil(clip.width * factor), math.ceil(clip.height * factor)),
+        )
+
+    def _compose(
+        self, plan: ReelPlan, processor: VideoProcessor, music: bool = True, logo: bool = True, hook: bool = True
+    ):
+        """
+        Build the reel described by ``plan``.
 
-        # Select and trim video clips
-        clips = self.processor.select_random_videos(videos_folder, len(quotes))
-        trimmed_clips = [self.processor.trim_random_clip(c) for c in clips]
+        :param music: Attach the planned music (False when audio is added in a later stage)
+        :param logo: Overlay the planned logo (False when each output places its own)
+        :param hook: Prepend the hook intro (False when a pre-encoded hook is joined later)
+
+        :return: (final clip, clips to close, music clip), or None if the clips could not be merged
+        """
+        clips = [self._open_clip(c, processor) for c in plan.clips]
+        trimmed_clips = [clip.subclipped(c.start, c.end) for clip, c in zip(clips, plan.clips)]
 
         # Merge clips with motivational text
-        color_set = random.choice(self.processor.color_sets)
-        merged_clip = self.processor.merge_videos_with_text(trimmed_clips, quotes, color_set)
+        color_set = tuple(plan.color_set)
+        merged_clip = processor.merge_videos_with_text(trimmed_clips, plan.quotes, color_set)
 
         if not merged_clip:
             self.logger.error("Failed to merge video clips.")
             self.utils.cleanup_clips(clips + trimmed_clips)
-            return False
+            return None
 
         # Generate hook clip and prepend
-        hook_clip = self.processor.generate_hook_clip(color_set)
+        hook_clip = processor.generate_hook_clip(color_set, plan.hook_phrase) if hook else None
         final_clip = concatenate_videoclips([hook_clip, merged_clip], method="compose") if hook_clip else merged_clip
 
         # Add background music
-        audio_clip = self.processor.get_random_music(music_folder)
+        audio_clip = processor.load_music(plan.music_path) if music and plan.music_path else None
         if audio_clip:
-            final_clip = self.processor.add_music_to_video(final_clip, audio_clip)
+            final_clip = processor.add_music_to_video(final_clip, audio_clip)
 
         # Add logo overlay
-        final_clip = self.processor.add_logo_to_video(final_clip, logo_path)
+        if logo and plan.logo_path:
+            final_clip = processor.add_logo_to_video(final_clip, plan.logo_path)
+
+        return final_clip, trimmed_clips + clips, audio_clip
+
+    def _close(self, final_clip, clips: list, audio_clip):
+        self.utils.cleanup_clips([final_clip] + clips)
+        if audio_clip:
+            audio_clip.close()
 
-        # Write output video
-        output_path = Path(output_folder) / f"reel_{output_index}.mp4"
+    def _render(
+        self, plan: ReelPlan, output_folder: str, defer_audio: bool = False, fragment_seconds: float = None
+    ) -> bool:
+        start = time.perf_counter()
+        output_index = plan.item_id
+        output_path = self.output_path(output_index, output_folder)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        start_state = self._state(output_index)
+
+        hook_path = None
+        if self.hook_library.usable and plan.hook_phrase and not fragment_seconds:
+            hook_path = self.hook_library.segment(plan.hook_phrase, tuple(plan.color_set), plan.logo_path)
+        if hook_path:
+            spliced = self._render_spliced(plan, output_path, hook_path, start)
+            if spliced is not None:
+                if not spliced or defer_audio:
+                    return spliced
+                finished = self.finish_audio([output_index], output_folder, {output_index: start_state})
+                return finished.get(output_index, False)
+
+        composed = self._compose(plan, self.processor, music=not defer_audio)
+        if composed is None:
+            self.catalog.mark_failed(output_index, "failed to merge video clips")
+            return False
+        final_clip, clips, audio_clip = composed
+
+        # Write output video to a hidden partial file, then publish atomically
+        partial_path = self.utils.partial_output_path(output_path)
         try:
-            final_clip.write_videofile(str(output_path), fps=self.config.fps)
+            encode_start = time.perf_counter()
+            final_clip.write_videofile(
+                str(partial_path),
+                fps=self.config.fps,
+                audio=not defer_audio,
+                **self.encoder.write_kwargs(fragment_seconds),
+            )
+            encode_seconds = time.perf_counter() - encode_start
+            self.utils.publish_atomically(
+                partial_path, self.video_only_path(output_path) if defer_audio else output_path
+            )
         except Exception as e:
             self.logger.error(f"Error writing video {output_index}: {e}")
-            self.utils.cleanup_clips([final_clip] + trimmed_clips + clips)
-            if audio_clip:
-                audio_clip.close()
+            partial_path.unlink(missing_ok=True)
+            self._close(final_clip, clips, audio_clip)
+            self.catalog.mark_failed(output_index, f"render error: {e}")
             return False
 
         # Cleanup resources
-        self.utils.cleanup_clips([final_clip] + trimmed_clips + clips)
-        if audio_clip:
-            audio_clip.close()
+        self._close(final_clip, clips, audio_clip)
+
+        if defer_audio:
+            self.catalog.record_timings(output_index, time.perf_counter() - start, encode_seconds)
+            self.logger.info(f"Video {output_index} encoded in {encode_seconds:.1f}s, soundtrack pending.")
+            return True
+
+        size_mb = output_path.stat().st_size / (1024 * 1024)
+        if not self.catalog.mark_rendered(
+            output_index, output_path, time.perf_counter() - start, encode_seconds, start_state
+        ):
+            return False
+        self.logger.info(
+            f"✅ Video {output_index} generated successfully: {size_mb:.2f} MB, "
+            f"encoded in {encode_seconds:.1f}s ({self.encoder.codec}/{self.encoder.preset})."
+        )
+        return True
+
+    def _render_spliced(self, plan: ReelPlan, output_path: Path, hook_path: Path, start: float):
+        """
+        Encode only the body of the reel and join the pre-encoded hook in
+        front of it by stream copy, leaving a video-only render for the
+        audio stage.
 
-        self.logger.info(f"✅ Video {output_index} generated successfully.")
+        :return: Whether the reel was rendered, or None if the hook cannot
+            be joined to this body (render the whole reel instead)
+        """
+        output_index = plan.item_id
+        composed = self._compose(plan, self.processor, music=False, hook=False)
+        if composed is None:
+            self.catalog.mark_failed(output_index, "failed to merge video clips")
+            return False
+        final_clip, clips, audio_clip = composed
+
+        body_path = self.utils.partial_output_path(output_path.with_name(f"{output_path.stem}.body.mp4"))
+        partial_path = self.utils.partial_output_path(output_path)
+        try:
+            encode_start = time.perf_counter()
+            final_clip.write_videofile(
+                str(body_path),
+                fps=self.config.fps,
+                audio=False,
+                **self.encoder.write_kwargs(),
+            )
+            encode_seconds = time.perf_counter() - encode_start
+            if not self.hook_library.compatible(hook_path, body_path):
+                # Stream parameters differ (e.g. the encoder changed underneath the library)
+                self.logger.warning(
+                    f"Hook {hook_path.name} does not match the stream of video {output_index}, "
+                    f"rendering it in full and re-encoding the hook."
+                )
+                hook_path.unlink(missing_ok=True)
+                return None
+            self.hook_library.splice(hook_path, body_path, partial_path)
+            self.utils.publish_atomically(partial_path, self.video_only_path(output_path))
+        except Exception as e:
+            self.logger.error(f"Error writing video {output_index}: {e}")
+            partial_path.unlink(missing_ok=True)
+            self.catalog.mark_failed(output_index, f"render error: {e}")
+            return False
+        finally:
+            body_path.unlink(missing_ok=True)
+            self._close(final_clip, clips, audio_clip)
+
+        self.catalog.record_timings(output_index, time.perf_counter() - start, encode_seconds)
+        self.logger.info(
+            f"Video {output_index} body encoded in {encode_seconds:.1f}s, "
+            f"joined to hook {hook_path.name}, soundtrack pending."
+        )
+        return True
+
+    def output_targets(self, item_id: int, output_path: Path, duration: float) -> list[OutputTarget]:
+        """
+        The main reel (``settings.video`` and the selected encoder profile)
+        followed by one target per configured variant profile.
+        """
+        targets = [OutputTarget(
+            name="main",
+            path=self.utils.partial_output_path(output_path),
+            width=self.config.target_width,
+            height=self.config.target_height,
+            duration=duration,
+            encoder=self.encoder,
+            logo_scale=0.1,
+            logo_position="bottom",
+            logo_margin=self.config.logo_margin_bottom,
+        )]
+        for profile in self.variants.profiles:
+            encoder = replace(
+                self.encoder,
+                crf=profile.crf,
+                maxrate_kbps=profile.maxrate_kbps,
+                bufsize_kbps=profile.bufsize_kbps,
+                audio_bitrate_kbps=profile.audio_bitrate_kbps,
+            )
+            targets.append(OutputTarget(
+                name=profile.name,
+                path=self.utils.partial_output_path(self.variant_path(item_id, profile.name)),
+                width=profile.target_width,
+                height=profile.target_height,
+                duration=min(duration, profile.max_duration or duration),
+                encoder=encoder,
+                logo_scale=profile.logo_scale,
+                logo_position=profile.logo_position,
+                logo_margin=profile.logo_margin,
+            ))
+        return targets
+
+    def render_variants(self, plan: ReelPlan, output_folder: str = None) -> bool:
+        """
+        Render the main reel and every platform variant from one
+        composition pass: frames are decoded, cropped and composed once and
+        piped into a single ffmpeg process with one encoder per output.
+        """
+        start = time.perf_counter()
+        output_index = plan.item_id
+        output_path = self.output_path(output_index, output_folder)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        start_state = self._state(output_index)
+
+        composed = self._compose(plan, self.processor, music=False, logo=False)
+        if composed is None:
+            self.catalog.mark_failed(output_index, "failed to merge video clips")
+            return False
+        final_clip, clips, audio_clip = composed
+
+        targets = self.output_targets(output_index, output_path, final_clip.duration)
+        for target in targets:
+            target.path.parent.mkdir(parents=True, exist_ok=True)
+        track = self.mixer.decode(plan.music_path) if plan.music_path else None
+        soundtrack = self.mixer.mix(track, final_clip.duration) if track is not None else None
+
+        try:
+            encode_start = time.perf_counter()
+            self.multi_encoder.write(
+                final_clip,
+                targets,
+                self.config.fps,
+                logo_path=plan.logo_path,
+                soundtrack=soundtrack,
+                sample_rate=self.mixer.sample_rate,
+                fade_out=self.settings.audio.fade_out,
+            )
+            encode_seconds = time.perf_counter() - encode_start
+            for target in targets[1:]:
+                self.utils.publish_atomically(target.path, self.variant_path(output_index, target.name))
+            self.utils.publish_atomically(targets[0].path, output_path)
+        except Exception as e:
+            self.logger.error(f"Error writing video {output_index} and its variants: {e}")
+            for target in targets:
+                target.path.unlink(missing_ok=True)
+            self._close(final_clip, clips, audio_clip)
+            self.catalog.mark_failed(output_index, f"render error: {e}")
+            return False
+
+        self._close(final_clip, clips, audio_clip)
+
+        size_mb = output_path.stat().st_size / (1024 * 1024)
+        if not self.catalog.mark_rendered(
+            output_index, output_path, time.perf_counter() - start, encode_seconds, start_state
+        ):
+            return False
+        self.logger.info(
+            f"✅ Video {output_index} generated successfully with {len(targets) - 1} variants "
+            f"({', '.join(t.name for t in targets[1:])}): {size_mb:.2f} MB, "
+            f"{len(targets)} outputs encoded in {encode_seconds:.1f}s ({self.encoder.codec}/{self.encoder.preset})."
+        )
+        return True
+
+    def finish_audio(
+        self, item_ids: list[int], output_folder: str = None, start_states: Optional[dict] = None
+    ) -> dict[int, bool]:
+        """
+        Add the planned soundtracks to video-only renders in one batch and
+        publish the finished reels.
+
+        :param start_states: Item id -> catalog state its render started from;
+            items that have left it since are not marked rendered
+        :return: Item id -> whether the reel was finished
+        """
+        start_states = start_states or {}
+        jobs = []
+        for item_id in item_ids:
+            stored = self.catalog.get_plan(item_id)
+            if stored is None:
+                self.logger.warning(f"No stored plan for reel {item_id}, finishing it without music.")
+            music_path = ReelPlan.from_dict(stored).music_path if stored else None
+            output_path = self.output_path(item_id, output_folder)
+            jobs.append(SoundtrackJob(item_id, self.video_only_path(output_path), output_path, music_path))
+
+        with log_context(stage="audio"):
+            finished = self.mixer.process(jobs, self.utils.publish_atomically)
+            for job in jobs:
+                if not finished.get(job.item_id):
+                    job.video_path.unlink(missing_ok=True)
+                    self.catalog.mark_failed(job.item_id, "audio stage failed")
+                    continue
+                item = self.catalog.get(job.item_id) or {}
+                encode_seconds = item.get("encode_seconds") or 0.0
+                if not self.catalog.mark_rendered(
+                    job.item_id, job.output_path, item.get("render_seconds"), encode_seconds,
+                    start_states.get(job.item_id),
+                ):
+                    finished[job.item_id] = False
+                    continue
+                self.logger.info(
+                    f"✅ Video {job.item_id} generated successfully: "
+                    f"{job.output_path.stat().st_size / (1024 * 1024):.2f} MB, "
+                    f"encoded in {encode_seconds:.1f}s ({self.encoder.codec}/{self.encoder.preset})."
+                )
+        return finished
+
+    def render_draft(self, plan: ReelPlan) -> bool:
+        """
+        Render a QA preview of ``plan``: a low-resolution, low-fps reel or a
+        contact sheet with one frame per segment. The catalog state of the
+        item is left untouched.
+        """
+        sheet = self.draft_config.mode == "sheet"
+        output_path = self.output_path(plan.item_id, draft=True)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = self.utils.partial_output_path(output_path)
+
+        composed = self._compose(plan, self.draft_processor)
+        if composed is None:
+            return False
+        final_clip, clips, audio_clip = composed
+
+        try:
+            if sheet:
+                self._write_contact_sheet(final_clip, partial_path)
+            else:
+                final_clip.write_videofile(
+                    str(partial_path),
+                    fps=self.draft_config.fps,
+                    codec="libx264",
+                    preset=self.draft_config.preset,
+                    ffmpeg_params=["-crf", str(self.draft_config.crf)],
+                    audio_codec="aac",
+                    audio_bitrate="64k",
+                )
+            self.utils.publish_atomically(partial_path, output_path)
+        except Exception as e:
+            self.logger.error(f"Error writing draft {plan.item_id}: {e}")
+            partial_path.unlink(missing_ok=True)
+            return False
+        finally:
+            self._close(final_clip, clips, audio_clip)
+
+        self.logger.info(f"📝 Draft {plan.item_id} written to {output_path}")
         return True
 
-    def generate_batch(self):
+    def _write_contact_sheet(self, clip, path: Path):
+        # One frame from the middle of the hook and of every quote segment
+        segment = self.config.video_duration
+        times = [(k + 0.5) * segment for k in range(int(clip.duration // segment))] or [clip.duration / 2]
+        frames = [clip.get_frame(t)[:, :, :3].astype(np.uint8) for t in times]
+
+        columns = min(self.draft_config.sheet_columns, len(frames))
+        rows = math.ceil(len(frames) / columns)
+        height, width = frames[0].shape[:2]
+        sheet = np.zeros((rows * height, columns * width, 3), dtype=np.uint8)
+        for i, frame in enumerate(frames):
+            row, column = divmod(i, columns)
+            sheet[row * height:(row + 1) * height, column * width:(column + 1) * width] = frame
+        Image.fromarray(sheet).save(path, format="PNG")
+
+    def render_tracked(
+        self, quotes: list[str], output_index: int, draft: bool = False, defer_audio: bool = False
+    ) -> RenderResult:
+        """
+        Generate a single video (or draft) while tracking its wall time and peak memory.
+        """
+        start = time.perf_counter()
+        with PeakMemoryTracker(self.concurrency.worker_sample_interval) as tracker:
+            success = self.generate_video(quotes, output_index, draft=draft, defer_audio=defer_audio)
+
+        return RenderResult(
+            job_id=output_index,
+            success=success,
+            peak_rss_mb=tracker.peak_mb,
+            seconds=time.perf_counter() - start,
+        )
+
+    def generate_batch(self, draft: bool = False):
         """
         Generate multiple motivational videos in a batch.
+
+        :param draft: Render QA previews (``settings.draft``) instead of full reels.
+            Plans are stored, so a later full render shows exactly the approved drafts.
         """
-        quotes_list = self.utils.load_quotes(settings.files.motivational_output)
-        if not quotes_list:
+        items = self.utils.load_content_items(self.settings.files.motivational_output)
+        if not items:
             self.logger.error("No quotes found for video generation.")
             return 0
-        count = len(quotes_list)
+        count = len(items)
+        # Full renders get their soundtracks in one audio stage after the video encodes
+        # (multi-output renders mix each output's soundtrack in the same pass)
+        defer_audio = not draft and self.settings.audio.batch_mix and not self.variants.enabled
+        if self.settings.batch_plan.enabled:
+            plans = self.plan_batch(items)
+            jobs = [(plan.item_id, (plan.quotes, plan.item_id, draft, defer_audio)) for plan in plans]
+        else:
+            jobs = [(item["id"], (item["quotes"], item["id"], draft, defer_audio)) for item in items]
+        if not draft and not self.variants.enabled:
+            # Encode missing hooks once here rather than in every worker
+            self.hook_library.build(self.settings.files.logo_file)
+
+        start_states = {} if draft else {job_id: self._state(job_id) for job_id, _ in jobs}
+
+        if self.concurrency.max_workers <= 1:
+            results = [self.render_tracked(*args) for _, args in jobs]
+        else:
+            # Workers render with this generator's settings (e.g. a channel profile)
+            pool = AdaptiveRenderPool(
+                self.logger,
+                _render_in_worker,
+                initializer=_init_render_worker,
+                config=self.concurrency,
+                initargs=(self.settings,),
+            )
+            results = pool.run(jobs)
+
+        if defer_audio:
+            finished = self.finish_audio([r.job_id for r in results if r.success], start_states=start_states)
+            for result in results:
+                result.success = result.success and finished.get(result.job_id, False)
 
         successful = 0
-        for i in range(count):
-            quotes = quotes_list[i % len(quotes_list)]
-            if self.generate_video(quotes, i + 1):
+        total_mb = total_encode = 0.0
+        for result in sorted(results, key=lambda r: r.job_id):
+            line = f"Reel {result.job_id}: peak memory {result.peak_rss_mb:.0f} MB, {result.seconds:.1f}s"
+            if result.success:
                 successful += 1
-            else:
-                self.logger.warning(f"Failed to generate video {i + 1}.")
+                item = None if draft else self.catalog.get(result.job_id)
+                if item and item["video_bytes"]:
+                    size_mb = item["video_bytes"] / (1024 * 1024)
+                    encode_seconds = item["encode_seconds"] or 0.0
+                    total_mb += size_mb
+                    total_encode += encode_seconds
+                    line += f", {size_mb:.2f} MB, encode {encode_seconds:.1f}s"
+            self.logger.info(line)
+            if not result.success:
+                self.logger.warning(f"Failed to generate {'draft' if draft else 'video'} {result.job_id}.")
+
+        if draft:
+            seconds = sum(r.seconds for r in results)
+            self.logger.info(
+                f"📝 Draft batch complete: {successful}/{count} drafts in {self.draft_config.output_dir} "
+                f"({seconds / max(1, len(results)):.1f}s/reel)."
+            )
+            return successful
 
         self.logger.info(f"🎉 Batch generation complete: {successful}/{count} videos successful.")
+        if successful:
+            self.logger.info(
+                f"Output: {total_mb:.1f} MB total ({total_mb / successful:.2f} MB/reel), "
+                f"{total_encode:.1f}s encoding ({total_encode / successful:.1f}s/reel)."
+            )
         return successful
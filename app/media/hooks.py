@@ -0,0 +1,259 @@
+import hashlib
+import json
+import struct
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import moviepy
+from moviepy.config import FFMPEG_BINARY
+
+from app.config.settings import settings
+from .encoder import EncoderProfile
+from .utils import MediaUtils
+
+# Bump when the way hook segments are composed changes
+FORMAT_VERSION = 1
+
+# Boxes on the way from ``moov`` to the sample descriptions
+STSD_PATH = (b"trak", b"mdia", b"minf", b"stbl", b"stsd")
+# VisualSampleEntry fields that precede its child boxes
+VISUAL_SAMPLE_ENTRY_SIZE = 78
+# Decoder configuration records holding the SPS/PPS (and VPS for HEVC)
+CONFIG_BOXES = (b"avcC", b"hvcC")
+
+
+def _file_key(path) -> Optional[list]:
+    path = Path(path) if path else None
+    if not path or not path.exists():
+        return None
+    stat = path.stat()
+    return [str(path.resolve()), stat.st_size, stat.st_mtime_ns]
+
+
+def _boxes(data: bytes, start: int = 0, end: Optional[int] = None):
+    """Yield (type, payload start, box end) of the boxes in ``data[start:end]``."""
+    end = len(data) if end is None else end
+    while start + 8 <= end:
+        size, kind = struct.unpack(">I4s", data[start:start + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", data[start + 8:start + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - start
+        if size < header:
+            return
+        yield kind, start + header, min(start + size, end)
+        start += size
+
+
+def _read_moov(path: Path) -> Optional[bytes]:
+    # Skip over the top-level boxes (mdat included) without reading them
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            size, kind = struct.unpack(">I4s", header)
+            header_size = 8
+            if size == 1:
+                size = struct.unpack(">Q", f.read(8))[0]
+                header_size = 16
+            if kind == b"moov":
+                return f.read() if size == 0 else f.read(size - header_size)
+            if size == 0 or size < header_size:
+                return None
+            f.seek(size - header_size, 1)
+
+
+def decoder_config(path: Path) -> Optional[bytes]:
+    """
+    The video track's decoder configuration record (``avcC``/``hvcC``) of an
+    MP4 file, or None if it has none. Two streams with the same record use
+    the same SPS/PPS and can be joined without re-encoding.
+    """
+    moov = _read_moov(path)
+    if moov is None:
+        return None
+
+    def descend(start: int, end: int, path: tuple):
+        for kind, payload, box_end in _boxes(moov, start, end):
+            if kind != path[0]:
+                continue
+            if len(path) > 1:
+                found = descend(payload, box_end, path[1:])
+                if found is not None:
+                    return found
+                continue
+            # stsd: version/flags and entry count, then the sample entries
+            for _, entry, entry_end in _boxes(moov, payload + 8, box_end):
+                for child, child_payload, child_end in _boxes(moov, entry + VISUAL_SAMPLE_ENTRY_SIZE, entry_end):
+                    if child in CONFIG_BOXES:
+                        return child + moov[child_payload:child_end]
+        return None
+
+    return descend(0, len(moov), STSD_PATH)
+
+
+class HookLibrary:
+    """
+    Pre-encoded hook intros, one video-only segment per hook phrase and
+    color set (logo included). Reels then only encode their body and the
+    matching hook is joined in front of it by stream copy.
+
+    Segments are named by a fingerprint of everything that shapes their
+    pixels or bitstream (phrase, colors, font, logo, resolution, fps,
+    encoder parameters, ffmpeg and MoviePy versions), so a settings or
+    asset change never reuses a stale hook.
+    """
+
+    def __init__(
+        self,
+        logger,
+        processor,
+        encoder: EncoderProfile,
+        config=None,
+        ffmpeg_version: str = "unknown",
+    ):
+        """
+        :param logger: Application logger instance
+        :param processor: ``VideoProcessor`` composing the hooks (as for full reels)
+        :param encoder: Encoder profile the reel bodies are written with
+        :param config: Hook library settings (defaults to ``settings.hooks``)
+        :param ffmpeg_version: ``ffmpeg -version`` line, part of the fingerprint
+        """
+        self.config = config or settings.hooks
+        self.processor = processor
+        self.encoder = encoder
+        self.ffmpeg_version = ffmpeg_version
+        self.library_dir = Path(self.config.library_dir)
+        self.utils = MediaUtils(logger)
+        self.logger = logger
+
+    @property
+    def usable(self) -> bool:
+        """Hooks must end on a frame boundary to be joined without shifting the body."""
+        video = self.processor.config
+        frames = video.video_duration * video.fps
+        return self.config.enabled and abs(frames - round(frames)) < 1e-6
+
+    def fingerprint(self, phrase: str, color_set: tuple, logo_path: Optional[str]) -> str:
+        video = self.processor.config
+        key = {
+            "format": FORMAT_VERSION,
+            "phrase": phrase,
+            "colors": list(color_set),
+            "font": _file_key(self.processor.font),
+            "logo": _file_key(logo_path),
+            "video": [
+                video.target_width, video.target_height, video.fps, video.video_duration,
+                video.hook_font_size, video.logo_margin_bottom, self.processor.scale,
+            ],
+            "encoder": [self.encoder.codec, self.encoder.preset, self.encoder.video_params()],
+            "ffmpeg": self.ffmpeg_version,
+            "moviepy": moviepy.__version__,
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()[:20]
+
+    def path(self, phrase: str, color_set: tuple, logo_path: Optional[str]) -> Path:
+        return self.library_dir / f"hook_{self.fingerprint(phrase, color_set, logo_path)}.mp4"
+
+    def segment(self, phrase: str, color_set: tuple, logo_path: Optional[str]) -> Optional[Path]:
+        """
+        The encoded hook for ``phrase`` and ``color_set``, encoded now if the
+        library does not have it yet.
+
+        :return: Segment path, or None if it could not be encoded
+        """
+        path = self.path(phrase, color_set, logo_path)
+        if path.exists():
+            # Mark it as in use, so no library sharing the directory prunes it
+            try:
+                path.touch()
+            except OSError:
+                pass
+            return path
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        clip = self.processor.generate_hook_clip(color_set, phrase)
+        if logo_path:
+            clip = self.processor.add_logo_to_video(clip, logo_path)
+        partial_path = self.utils.partial_output_path(path)
+        try:
+            clip.write_videofile(
+                str(partial_path),
+                fps=self.processor.config.fps,
+                audio=False,
+                logger=None,
+                **self.encoder.write_kwargs(),
+            )
+            self.utils.publish_atomically(partial_path, path)
+        except Exception as e:
+            self.logger.warning(f"Failed to encode hook '{phrase}' {color_set}: {e}")
+            partial_path.unlink(missing_ok=True)
+            return None
+        finally:
+            clip.close()
+
+        self.logger.info(f"Encoded hook '{phrase}' {color_set} into {path.name}")
+        return path
+
+    def build(self, logo_path: Optional[str]) -> int:
+        """
+        Encode every hook phrase x color set combination that is missing and
+        remove segments that match none of them and no library has used for
+        ``prune_after_days``. Other channels or profiles sharing the
+        directory keep theirs, as using a segment refreshes its mtime.
+
+        :return: Segments in the library
+        """
+        if not self.usable:
+            return 0
+        wanted = set()
+        for color_set in self.processor.color_sets:
+            for phrase in self.processor.hook_phrases:
+                path = self.segment(phrase, tuple(color_set), logo_path)
+                if path:
+                    wanted.add(path.name)
+
+        if self.config.prune_after_days > 0:
+            cutoff = time.time() - self.config.prune_after_days * 86400
+            for stale in self.library_dir.glob("hook_*.mp4"):
+                try:
+                    unused = stale.name not in wanted and stale.stat().st_mtime < cutoff
+                except OSError:
+                    continue
+                if unused:
+                    stale.unlink(missing_ok=True)
+                    self.logger.info(f"Removed stale hook {stale.name}")
+        return len(wanted)
+
+    def compatible(self, hook_path: Path, body_path: Path) -> bool:
+        """Whether both streams share their SPS/PPS, so the hook can be joined by stream copy."""
+        hook_config = decoder_config(hook_path)
+        return hook_config is not None and hook_config == decoder_config(body_path)
+
+    def splice(self, hook_path: Path, body_path: Path, output_path: Path):
+        """
+        Join the hook and the body into ``output_path`` without re-encoding.
+
+        :raises RuntimeError: ffmpeg failed
+        """
+        with tempfile.TemporaryDirectory(prefix="hook_") as tmp:
+            playlist = Path(tmp) / "concat.txt"
+            entries = (Path(p).resolve().as_posix().replace("'", "'\\''") for p in (hook_path, body_path))
+            playlist.write_text("".join(f"file '{entry}'\n" for entry in entries), encoding="utf-8")
+            cmd = [
+                FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y",
+                "-f", "concat", "-safe", "0", "-i", str(playlist), "-c", "copy",
+            ]
+            if self.encoder.faststart:
+                cmd += ["-movflags", "+faststart"]
+            cmd += ["-f", "mp4", str(output_path)]
+            result = subprocess.run(cmd, capture_output=True, timeout=self.config.ffmpeg_timeout)
+        if result.returncode != 0:
+            stderr = result.stderr.decode("utf-8", "replace").strip()
+            raise RuntimeError(stderr.splitlines()[-1] if stderr else f"ffmpeg exited with {result.returncode}")
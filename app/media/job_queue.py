@@ -0,0 +1,268 @@
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from app.config.settings import settings
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS render_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    reel_id INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    output_dir TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    heartbeat_at REAL,
+    output_path TEXT,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (reel_id, output_dir)
+);
+CREATE INDEX IF NOT EXISTS idx_render_jobs_claim ON render_jobs (status, lease_expires, id);
+"""
+
+
+@dataclass
+class RenderJob:
+    id: int
+    reel_id: int
+    quotes: list[str]
+    output_dir: Path
+    attempts: int
+    lease_owner: str
+
+
+class RenderJobQueue:
+    """
+    SQLite-backed queue of render jobs shared by any number of worker
+    processes or nodes.
+
+    Jobs are leased for ``lease_seconds`` and kept alive by heartbeats; a
+    lease that expires (crashed or partitioned worker) makes the job
+    claimable again until ``max_attempts`` is reached.
+    """
+
+    def __init__(self, logger, config=None):
+        """
+        :param logger: Application logger instance
+        :param config: Queue settings (defaults to ``settings.queue``)
+        """
+        self.config = config or settings.queue
+        self.logger = logger
+        self.db_file = Path(self.config.db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # Rollback journal (not WAL) so the database is safe on shared filesystems
+        conn = sqlite3.connect(self.db_file, timeout=self.config.busy_timeout, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, reel_id: int, quotes: list[str], output_dir: Path) -> int:
+        """
+        Add a render job (idempotent per reel and output directory). A job
+        that already finished or failed is reset to pending with the new
+        quotes, so enqueueing a reel again retries it.
+
+        :return: Job id
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            previous = conn.execute(
+                "SELECT status FROM render_jobs WHERE reel_id = ? AND output_dir = ?",
+                (reel_id, str(output_dir)),
+            ).fetchone()
+            conn.execute(
+                """
+                INSERT INTO render_jobs
+                    (reel_id, payload, output_dir, max_attempts, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (reel_id, output_dir) DO UPDATE SET
+                    payload = excluded.payload, status = ?, attempts = 0, max_attempts = excluded.max_attempts,
+                    lease_owner = NULL, lease_expires = NULL, heartbeat_at = NULL,
+                    output_path = NULL, last_error = NULL, updated_at = excluded.updated_at
+                WHERE render_jobs.status IN (?, ?)
+                """,
+                (
+                    reel_id, json.dumps({"quotes": quotes}), str(output_dir), self.config.max_attempts, now, now,
+                    PENDING, DONE, FAILED,
+                ),
+            )
+            row = conn.execute(
+                "SELECT id FROM render_jobs WHERE reel_id = ? AND output_dir = ?",
+                (reel_id, str(output_dir)),
+            ).fetchone()
+        if previous is not None and previous["status"] in (DONE, FAILED):
+            self.logger.info(f"Render job {row['id']} of reel {reel_id} was {previous['status']}, queued again.")
+        return row["id"]
+
+    def lease(self, worker_id: str) -> Optional[RenderJob]:
+        """
+        Atomically claim the oldest pending job or a job whose lease expired.
+
+        :param worker_id: Unique id of the claiming worker
+        :return: The leased job or None if nothing is claimable
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            while True:
+                row = conn.execute(
+                    """
+                    SELECT * FROM render_jobs
+                    WHERE status = ? OR (status = ? AND lease_expires < ?)
+                    ORDER BY id LIMIT 1
+                    """,
+                    (PENDING, LEASED, now),
+                ).fetchone()
+                if row is None:
+                    return None
+
+                if row["status"] == LEASED:
+                    self.logger.warning(
+                        f"Lease of job {row['id']} held by {row['lease_owner']} expired, reclaiming."
+                    )
+                if row["attempts"] >= row["max_attempts"]:
+                    conn.execute(
+                        "UPDATE render_jobs SET status = ?, lease_owner = NULL, last_error = ?, updated_at = ? WHERE id = ?",
+                        (FAILED, row["last_error"] or "lease expired", now, row["id"]),
+                    )
+                    continue
+
+                conn.execute(
+                    """
+                    UPDATE render_jobs
+                    SET status = ?, attempts = attempts + 1, lease_owner = ?,
+                        lease_expires = ?, heartbeat_at = ?, updated_at = ?
+                    WHERE id = ?
+                    """,
+                    (LEASED, worker_id, now + self.config.lease_seconds, now, now, row["id"]),
+                )
+                return RenderJob(
+                    id=row["id"],
+                    reel_id=row["reel_id"],
+                    quotes=json.loads(row["payload"])["quotes"],
+                    output_dir=Path(row["output_dir"]),
+                    attempts=row["attempts"] + 1,
+                    lease_owner=worker_id,
+                )
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """
+        Extend a lease. Returns False if the worker no longer owns the job.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE render_jobs SET lease_expires = ?, heartbeat_at = ?, updated_at = ?
+                WHERE id = ? AND lease_owner = ? AND status = ?
+                """,
+                (now + self.config.lease_seconds, now, now, job_id, worker_id, LEASED),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str, output_path: Path) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE render_jobs
+                SET status = ?, output_path = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                WHERE id = ? AND lease_owner = ? AND status = ?
+                """,
+                (DONE, str(output_path), now, job_id, worker_id, LEASED),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        """
+        Release a job after a failed attempt; it is retried until
+        ``max_attempts`` is reached, then marked failed.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE render_jobs
+                SET status = CASE WHEN attempts >= max_attempts THEN ? ELSE ? END,
+                    last_error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                WHERE id = ? AND lease_owner = ? AND status = ?
+                """,
+                (FAILED, PENDING, error, now, job_id, worker_id, LEASED),
+            )
+            return cursor.rowcount == 1
+
+    def cancel(self, reel_id: int, output_dir: Path, reason: str) -> bool:
+        """
+        Fail the pending or leased job of a reel that must not be rendered
+        (its worker's heartbeat and completion are then refused).
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE render_jobs
+                SET status = ?, last_error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                WHERE reel_id = ? AND output_dir = ? AND status IN (?, ?)
+                """,
+                (FAILED, reason, now, reel_id, str(output_dir), PENDING, LEASED),
+            )
+            return cursor.rowcount == 1
+
+    def status_counts(self, job_ids: Optional[list[int]] = None) -> dict[str, int]:
+        with self._connect() as conn:
+            if job_ids:
+                marks = ",".join("?" * len(job_ids))
+                rows = conn.execute(
+                    f"SELECT status, COUNT(*) AS n FROM render_jobs WHERE id IN ({marks}) GROUP BY status",
+                    job_ids,
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT status, COUNT(*) AS n FROM render_jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def wait_for(self, job_ids: list[int], timeout: Optional[float] = None) -> dict[str, int]:
+        """
+        Block until every given job is done or failed (or the timeout expires).
+
+        :return: Final status counts for the jobs
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            counts = self.status_counts(job_ids)
+            if counts.get(DONE, 0) + counts.get(FAILED, 0) >= len(job_ids):
+                return counts
+            if deadline is not None and time.monotonic() >= deadline:
+                self.logger.warning(f"Timed out waiting for render jobs: {counts}")
+                return counts
+            time.sleep(self.config.poll_interval)
@@ -0,0 +1,232 @@
+import random
+from collections import Counter, deque
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional
+
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from .processor import VideoProcessor, VIDEO_EXTENSIONS, AUDIO_EXTENSIONS
+
+
+@dataclass
+class ClipPlan:
+    path: str
+    start: float
+    end: float
+    # Source size, used to decode drafts directly at reduced resolution
+    width: int
+    height: int
+
+
+@dataclass
+class ReelPlan:
+    """
+    Every random choice behind one reel (clips and offsets, colors, hook,
+    music, logo), so a draft and the full render show exactly the same
+    content.
+    """
+    item_id: int
+    quotes: list[str]
+    clips: list[ClipPlan]
+    color_set: list[str]
+    hook_phrase: Optional[str]
+    music_path: Optional[str]
+    logo_path: Optional[str]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ReelPlan":
+        return cls(**{**data, "clips": [ClipPlan(**clip) for clip in data["clips"]]})
+
+    def sources(self) -> set[str]:
+        """Files the render reads: source clips and the music track."""
+        return {c.path for c in self.clips} | ({self.music_path} if self.music_path else set())
+
+
+@dataclass
+class BatchLocality:
+    """Source file opens of a render order, split by whether the file was read shortly before."""
+    opens: int = 0
+    # Opens of a file one of the previous ``window`` reels also read (page cache, warm caches)
+    hot: int = 0
+    # Bytes of the files opened cold
+    cold_bytes: int = 0
+
+
+class ReelPlanner:
+    """
+    Makes the random choices ``VideoGenerator`` used to make while
+    rendering, up front, for one reel or a whole batch, and orders a batch
+    so reels sharing files render close together. Sources are only
+    probed for duration and size;
+    nothing is decoded. Directory listings and probe results are kept
+    until the directory or file changes.
+    """
+
+    def __init__(self, logger, processor: VideoProcessor):
+        """
+        :param logger: Application logger instance
+        :param processor: Processor providing color sets, hook phrases and trim margins
+        """
+        self.logger = logger
+        self.processor = processor
+        self._listings: dict = {}
+        self._probes: dict = {}
+
+    def _list(self, folder: Path, extensions: tuple) -> list[Path]:
+        if not folder.exists():
+            self.logger.warning(f"Folder not found: {folder}")
+            return []
+        key = (str(folder), extensions)
+        mtime = folder.stat().st_mtime_ns
+        cached = self._listings.get(key)
+        if cached is None or cached[0] != mtime:
+            files = [f for f in folder.iterdir() if f.is_file() and f.suffix.lower() in extensions]
+            cached = self._listings[key] = (mtime, files)
+        return list(cached[1])
+
+    def _probe(self, file: Path) -> Optional[dict]:
+        try:
+            stat = file.stat()
+        except OSError as e:
+            self.logger.warning(f"Failed to probe video {file.name}: {e}")
+            return None
+        key = (str(file), stat.st_mtime_ns, stat.st_size)
+        if key in self._probes:
+            return self._probes[key]
+
+        try:
+            infos = ffmpeg_parse_infos(str(file))
+        except Exception as e:
+            self.logger.warning(f"Failed to probe video {file.name}: {e}")
+            return None
+        size = infos.get("video_size") or [0, 0]
+        info = None
+        if infos.get("duration") and size[0] > 0 and size[1] > 0:
+            info = {"duration": infos["duration"], "width": size[0], "height": size[1]}
+        self._probes[key] = info
+        return info
+
+    def warm_up(self, videos_folder: Path) -> int:
+        """
+        Probe every source clip ahead of the first plan.
+
+        :return: Number of usable clips
+        """
+        return sum(1 for f in self._list(Path(videos_folder), VIDEO_EXTENSIONS) if self._probe(f))
+
+    def plan(
+        self,
+        item_id: int,
+        quotes: list[str],
+        videos_folder: Path,
+        music_folder: Path,
+        logo_path: Path,
+    ) -> ReelPlan:
+        """
+        Choose clips, trim offsets, colors, hook phrase and music for one reel.
+        """
+        return self.plan_batch([(item_id, quotes)], videos_folder, music_folder, logo_path)[0]
+
+    @staticmethod
+    def _least_used(files: list[Path], uses: Counter) -> list[Path]:
+        # Random order within each usage count, so equally used files are equally likely
+        return sorted(files, key=lambda f: (uses[str(f)], random.random()))
+
+    def plan_batch(
+        self,
+        requests: list[tuple[int, list[str]]],
+        videos_folder: Path,
+        music_folder: Path,
+        logo_path: Path,
+        existing: list[ReelPlan] = (),
+    ) -> list[ReelPlan]:
+        """
+        Make every random choice for a batch of reels up front.
+
+        A reel never repeats a source clip, and sources and music tracks
+        are drawn least-used first (ties broken at random), so across the
+        batch each file is used as evenly as the counts allow.
+
+        :param requests: (item id, quotes) per reel to plan
+        :param existing: Plans already kept for this batch, counted as prior use
+        """
+        video_files = self._list(Path(videos_folder), VIDEO_EXTENSIONS)
+        music_files = self._list(Path(music_folder), AUDIO_EXTENSIONS)
+        uses = Counter(source for plan in existing for source in plan.sources())
+        clip_duration = self.processor.config.video_duration
+
+        plans = []
+        for item_id, quotes in requests:
+            count = len(quotes)
+            if len(video_files) < count:
+                self.logger.warning(
+                    f"Only {len(video_files)} videos available, requested {count}. Adjusting count."
+                )
+                count = len(video_files)
+
+            clips = []
+            for file in self._least_used(video_files, uses):
+                if len(clips) == count:
+                    break
+                info = self._probe(file)
+                if info is None:
+                    continue
+                start = self.processor.random_start(info["duration"])
+                clips.append(ClipPlan(str(file), start, start + clip_duration, info["width"], info["height"]))
+            music = str(self._least_used(music_files, uses)[0]) if music_files else None
+
+            plan = ReelPlan(
+                item_id=item_id,
+                quotes=list(quotes),
+                clips=clips,
+                color_set=list(random.choice(self.processor.color_sets)),
+                hook_phrase=random.choice(self.processor.hook_phrases),
+                music_path=music,
+                logo_path=str(logo_path) if logo_path else None,
+            )
+            uses.update(plan.sources())
+            plans.append(plan)
+        return plans
+
+    @staticmethod
+    def order(plans: list[ReelPlan], window: int) -> list[ReelPlan]:
+        """
+        Order reels so each one reads as many files as possible that the
+        previous ``window`` reels read (greedy; ties keep the given order).
+
+        :param window: Reels whose files are taken to still be cached
+            (at least the number rendered side by side)
+        """
+        remaining = list(plans)
+        recent = deque(maxlen=max(1, window))
+        ordered = []
+        while remaining:
+            hot = set().union(*recent)
+            index = max(range(len(remaining)), key=lambda i: (len(remaining[i].sources() & hot), -i))
+            plan = remaining.pop(index)
+            recent.append(plan.sources())
+            ordered.append(plan)
+        return ordered
+
+    @staticmethod
+    def locality(plans: list[ReelPlan], window: int) -> BatchLocality:
+        """Expected cache behaviour of rendering ``plans`` in this order."""
+        stats = BatchLocality()
+        recent = deque(maxlen=max(1, window))
+        for plan in plans:
+            hot = set().union(*recent)
+            for source in plan.sources():
+                stats.opens += 1
+                if source in hot:
+                    stats.hot += 1
+                    continue
+                try:
+                    stats.cold_bytes += Path(source).stat().st_size
+                except OSError:
+                    pass
+            recent.append(plan.sources())
+        return stats
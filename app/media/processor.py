@@ -1,4 +1,6 @@
 import random
+from collections import OrderedDict
+from dataclasses import replace
 from moviepy import (
     VideoFileClip,
     AudioFileClip,
@@ -9,10 +11,26 @@ from moviepy import (
     ImageClip,
     afx
 )
+from moviepy.audio.AudioClip import AudioArrayClip
 from moviepy.video.fx import FadeIn, FadeOut
 from pathlib import Path
+from typing import Optional
 from app.config.settings import settings
 
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".webm", ".flv")
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".m4a", ".aac", ".ogg")
+
+
+def _even(value: float) -> int:
+    return max(2, int(round(value / 2)) * 2)
+
+
+def _mtime(path: Path) -> int:
+    try:
+        return Path(path).stat().st_mtime_ns
+    except OSError:
+        return 0
+
 
 class VideoProcessor:
     """
@@ -20,15 +38,37 @@ class VideoProcessor:
     branding, and final composition for short-form vertical videos.
     """
 
-    def __init__(self, logger):
+    def __init__(self, logger, app_settings=settings, scale: float = 1.0, warm: bool = False):
         """
         Initialize the video processor with configuration and logger.
 
         :param logger: Application logger instance
+        :param app_settings: Settings providing video config and font
+        :param scale: Output scale relative to the configured resolution (drafts)
+        :param warm: Keep rendered text, logo layers and decoded music in memory
+            across reels (long-running render service)
         """
-        self.config = settings.video
+        self.config = app_settings.video
+        if scale != 1.0:
+            self.config = replace(
+                self.config,
+                target_width=_even(self.config.target_width * scale),
+                target_height=_even(self.config.target_height * scale),
+                text_font_size=max(8, round(self.config.text_font_size * scale)),
+                hook_font_size=max(8, round(self.config.hook_font_size * scale)),
+                logo_margin_bottom=round(self.config.logo_margin_bottom * scale),
+            )
+        self.scale = scale
+        self.audio_config = app_settings.audio
+        self.font = app_settings.files.font
         self.logger = logger
 
+        self.warm = warm
+        self.service_config = app_settings.service
+        self._text_cache: OrderedDict = OrderedDict()
+        self._logo_cache: dict = {}
+        self._music_cache: dict = {}
+
         # Predefined color combinations for text and strokes
         self.color_sets = [
             ("yellow", "white"),
@@ -74,28 +114,36 @@ class VideoProcessor:
 
         return clip_resized
 
-    def trim_random_clip(self, clip: VideoFileClip) -> VideoFileClip:
+    def random_start(self, duration: float) -> float:
         """
-        Extract a random subclip of fixed duration while avoiding
-        unsafe start and end margins.
+        Pick a random start time for a fixed-duration subclip while
+        avoiding unsafe start and end margins.
 
-        :param clip: Source video clip
-        :return: Trimmed video clip
+        :param duration: Source clip duration
+        :return: Start time in seconds
         """
         safe_duration = (
-            clip.duration
+            duration
             - self.config.safe_start_margin
             - self.config.safe_end_margin
         )
         clip_duration = self.config.video_duration
 
         if safe_duration <= clip_duration:
-            start_time = 0.25
-        else:
-            max_start = clip.duration - clip_duration - self.config.safe_end_margin
-            start_time = random.uniform(self.config.safe_start_margin, max_start)
+            return 0.25
+        max_start = duration - clip_duration - self.config.safe_end_margin
+        return random.uniform(self.config.safe_start_margin, max_start)
 
-        return clip.subclipped(start_time, start_time + clip_duration)
+    def trim_random_clip(self, clip: VideoFileClip) -> VideoFileClip:
+        """
+        Extract a random subclip of fixed duration while avoiding
+        unsafe start and end margins.
+
+        :param clip: Source video clip
+        :return: Trimmed video clip
+        """
+        start_time = self.random_start(clip.duration)
+        return clip.subclipped(start_time, start_time + self.config.video_duration)
 
     def merge_videos_with_text(
         self,
@@ -113,7 +161,7 @@ class VideoProcessor:
         :return: Final concatenated video
         """
         processed_clips = []
-        font_path = settings.files.font
+        font_path = self.font
 
         # Fallback if font file is missing
         if not Path(font_path).exists():
@@ -126,11 +174,11 @@ class VideoProcessor:
 
             # Text overlay
             txt_clip = (
-                TextClip(
+                self._text_clip(
                     text=sentence,
                     font=font_path,
                     method="caption",
-                    size=(900, None),
+                    size=(round(900 * self.scale), None),
                     font_size=self.config.text_font_size,
                     color=color_set[1],
                     stroke_width=1,
@@ -160,25 +208,26 @@ class VideoProcessor:
 
         return concatenate_videoclips(processed_clips, method="compose")
 
-    def generate_hook_clip(self, color_set: tuple) -> CompositeVideoClip:
+    def generate_hook_clip(self, color_set: tuple, phrase: Optional[str] = None) -> CompositeVideoClip:
         """
         Generate an intro hook clip with motivational text on a black background.
 
         :param color_set: Color set for hook text
+        :param phrase: Hook phrase (random if not given)
         :return: Hook video clip
         """
-        phrase = random.choice(self.hook_phrases)
-        font_path = settings.files.font
+        phrase = phrase or random.choice(self.hook_phrases)
+        font_path = self.font
 
         if not Path(font_path).exists():
             font_path = None
 
         txt_clip = (
-            TextClip(
+            self._text_clip(
                 text=phrase,
                 font=font_path,
                 method="caption",
-                size=(800, 1000),
+                size=(round(800 * self.scale), round(1000 * self.scale)),
                 font_size=self.config.hook_font_size,
                 stroke_width=1,
                 stroke_color=color_set[0],
@@ -203,7 +252,6 @@ class VideoProcessor:
         :return: List of loaded video clips
         """
         folder = Path(folder_path)
-        video_extensions = (".mp4", ".mov", ".avi", ".mkv", ".webm", ".flv")
 
         if not folder.exists():
             self.logger.error(f"Video folder not found: {folder_path}")
@@ -211,7 +259,7 @@ class VideoProcessor:
 
         video_files = [
             f for f in folder.iterdir()
-            if f.is_file() and f.suffix.lower() in video_extensions
+            if f.is_file() and f.suffix.lower() in VIDEO_EXTENSIONS
         ]
 
         if len(video_files) < count:
@@ -246,7 +294,6 @@ class VideoProcessor:
         :return: Audio clip or None if unavailable
         """
         folder = Path(folder_path)
-        audio_extensions = (".mp3", ".wav", ".m4a", ".aac", ".ogg")
 
         if not folder.exists():
             self.logger.warning(f"Music folder not found: {folder_path}")
@@ -254,28 +301,39 @@ class VideoProcessor:
 
         audio_files = [
             f for f in folder.iterdir()
-            if f.is_file() and f.suffix.lower() in audio_extensions
+            if f.is_file() and f.suffix.lower() in AUDIO_EXTENSIONS
         ]
 
         if not audio_files:
             self.logger.warning(f"No audio files found in {folder_path}")
             return None
 
-        selected_file = random.choice(audio_files)
+        return self.load_music(random.choice(audio_files))
 
+    def load_music(self, file: Path) -> AudioFileClip | None:
+        """
+        Load a background music track.
+
+        :param file: Audio file path
+        :return: Audio clip or None if it cannot be loaded
+        """
+        file = Path(file)
+        if self.warm:
+            return self._cached_music(file)
         try:
-            audio_clip = AudioFileClip(str(selected_file))
+            audio_clip = AudioFileClip(str(file))
             self.logger.info(
-                f"Loaded audio: {selected_file.name} ({audio_clip.duration:.1f}s)"
+                f"Loaded audio: {file.name} ({audio_clip.duration:.1f}s)"
             )
             return audio_clip
         except Exception as e:
-            self.logger.warning(f"Failed to load audio {selected_file.name}: {e}")
+            self.logger.warning(f"Failed to load audio {file.name}: {e}")
             return None
 
     def add_music_to_video(self, video: VideoFileClip, audio: AudioFileClip) -> VideoFileClip:
         """
-        Add background music to a video, looping and trimming as needed.
+        Add background music to a video, looping and trimming as needed, with
+        the same edge fades the batch audio stage applies.
 
         :param video: Final video clip
         :param audio: Background audio clip
@@ -286,6 +344,13 @@ class VideoProcessor:
 
         audio = audio.subclipped(0, video.duration)
         audio = audio.with_volume_scaled(self.config.music_volume)
+        fades = []
+        if self.audio_config.fade_in > 0:
+            fades.append(afx.AudioFadeIn(min(self.audio_config.fade_in, video.duration)))
+        if self.audio_config.fade_out > 0:
+            fades.append(afx.AudioFadeOut(min(self.audio_config.fade_out, video.duration)))
+        if fades:
+            audio = audio.with_effects(fades)
 
         return video.with_audio(audio)
 
@@ -303,16 +368,84 @@ class VideoProcessor:
             self.logger.warning(f"Logo file not found: {logo_path}")
             return video
 
-        bottom_padding = 250
+        bottom_padding = self.config.logo_margin_bottom
 
         logo_clip = (
-            ImageClip(str(logo_file))
+            self._logo_layer(logo_file, int(video.h * 0.1))
             .with_fps(video.fps)
             .with_duration(video.duration)
-            .resized(height=int(video.h * 0.1))
             .with_position(
                 ("center", video.h - int(video.h * 0.1) - bottom_padding)
             )
         )
 
         return CompositeVideoClip([video, logo_clip])
+
+    # ---------------------------------------------------------------
+    # Warm asset caches
+    # ---------------------------------------------------------------
+    def _text_clip(self, **kwargs) -> TextClip:
+        """
+        ``TextClip`` with the given arguments. In warm mode the rendered text
+        is reused: ``with_*`` calls return copies that share its image.
+        """
+        if not self.warm:
+            return TextClip(**kwargs)
+
+        key = tuple(sorted((name, str(value)) for name, value in kwargs.items()))
+        clip = self._text_cache.get(key)
+        if clip is None:
+            clip = TextClip(**kwargs)
+            self._text_cache[key] = clip
+            if len(self._text_cache) > self.service_config.text_cache_size:
+                self._text_cache.popitem(last=False)
+        else:
+            self._text_cache.move_to_end(key)
+        return clip
+
+    def _logo_layer(self, logo_file: Path, height: int) -> ImageClip:
+        if not self.warm:
+            return ImageClip(str(logo_file)).resized(height=height)
+
+        key = (str(logo_file), _mtime(logo_file), height)
+        if key not in self._logo_cache:
+            self._logo_cache[key] = ImageClip(str(logo_file)).resized(height=height)
+        return self._logo_cache[key]
+
+    def _cached_music(self, file: Path) -> AudioArrayClip | None:
+        # Decoded samples (no open ffmpeg reader), so closing a reel's audio
+        # never invalidates the cached track
+        key = (str(file), _mtime(file))
+        if key not in self._music_cache:
+            try:
+                with AudioFileClip(str(file)) as audio_clip:
+                    duration = min(audio_clip.duration, self.service_config.music_cache_seconds)
+                    samples = audio_clip.subclipped(0, duration).to_soundarray(fps=audio_clip.fps)
+                    self._music_cache[key] = AudioArrayClip(samples, fps=audio_clip.fps)
+            except Exception as e:
+                self.logger.warning(f"Failed to load audio {file.name}: {e}")
+                return None
+            self.logger.info(f"Decoded audio into memory: {file.name} ({duration:.1f}s)")
+        return self._music_cache[key]
+
+    def warm_up(self, music_folder: Path, logo_path: Path):
+        """
+        Pre-load every music track, the logo layer and the hook texts.
+        """
+        music_folder = Path(music_folder)
+        if music_folder.exists():
+            for file in sorted(music_folder.iterdir()):
+                if file.is_file() and file.suffix.lower() in AUDIO_EXTENSIONS:
+                    self.load_music(file)
+        if Path(logo_path).exists():
+            self._logo_layer(Path(logo_path), int(self.config.target_height * 0.1))
+        for color_set in self.color_sets:
+            for phrase in self.hook_phrases:
+                self.generate_hook_clip(color_set, phrase)
+
+    def cache_stats(self) -> dict:
+        return {
+            "text": len(self._text_cache),
+            "logo": len(self._logo_cache),
+            "music": len(self._music_cache),
+        }
@@ -0,0 +1,230 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from app.config.settings import settings
+from .generator import VideoGenerator
+
+RENDER_PATH = "/render"
+HEALTH_PATH = "/health"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def log_message(self, format, *args):
+        return
+
+    def _send(self, status: int, body: dict):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path != HEALTH_PATH:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+        self._send(200, self.server.service.health())
+
+    def do_POST(self):
+        if self.path != RENDER_PATH:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            job = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            self._send(400, {"error": f"Invalid JSON: {e}"})
+            return
+        if not isinstance(job, dict) or not job.get("quotes"):
+            self._send(400, {"error": "A render job needs a non-empty 'quotes' list"})
+            return
+
+        result = self.server.service.render(job)
+        self._send(200 if result["success"] else 500, result)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    service: "RenderService"
+
+
+class RenderService:
+    """
+    Resident render process behind a local HTTP endpoint.
+
+    One warm ``VideoGenerator`` (encoder profile, rendered text, logo
+    layer, decoded music, source clip metadata) serves every job, so a
+    small on-demand reel only pays for its own decode and encode.
+
+    ``POST /render`` takes ``{"quotes": [...], "item_id": ..., "draft": false,
+    "output_dir": ..., "content": {...}}`` and answers with the output path;
+    ``GET /health`` reports readiness and cache sizes.
+    """
+
+    def __init__(self, logger, app_settings=settings, host: Optional[str] = None, port: Optional[int] = None):
+        """
+        :param logger: Application logger instance
+        :param app_settings: Settings to render with
+        :param host: Interface to bind (defaults to ``settings.service.host``)
+        :param port: Port to bind (defaults to ``settings.service.port``, 0 = any free port)
+        """
+        self.config = app_settings.service
+        self.logger = logger
+        self.generator = VideoGenerator(logger, app_settings, warm=True)
+        self.slots = threading.Semaphore(self.config.max_concurrent_renders)
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.rendered = self.failed = 0
+        self._server = _Server((host or self.config.host, self.config.port if port is None else port), _Handler)
+        self._server.service = self
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def warm_up(self):
+        self.generator.warm_up()
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "rendered": self.rendered,
+            "failed": self.failed,
+            "max_concurrent_renders": self.config.max_concurrent_renders,
+            "encoder": f"{self.generator.encoder.codec}/{self.generator.encoder.preset}",
+            "caches": self.generator.processor.cache_stats(),
+        }
+
+    def render(self, job: dict) -> dict:
+        """
+        Render one job, creating its catalog item first if it has no id.
+
+        :return: ``{"item_id", "success", "output_path", "seconds", "queued_seconds"}``
+        """
+        received = time.perf_counter()
+        item_id = job.get("item_id")
+        if item_id is None:
+            content = {**(job.get("content") or {}), "quotes": job["quotes"]}
+            item_id = self.generator.catalog.add_generated(content)
+
+        draft = bool(job.get("draft"))
+        with self.slots:
+            started = time.perf_counter()
+            try:
+                success = self.generator.generate_video(
+                    job["quotes"], item_id, output_folder=job.get("output_dir"), draft=draft
+                )
+                error = None if success else "render failed"
+            except Exception as e:
+                self.logger.exception(f"Render service job for reel {item_id} failed.")
+                success, error = False, str(e)
+
+        with self.lock:
+            if success:
+                self.rendered += 1
+            else:
+                self.failed += 1
+
+        result = {
+            "item_id": item_id,
+            "success": success,
+            "output_path": str(self.generator.output_path(item_id, job.get("output_dir"), draft)) if success else None,
+            "seconds": round(time.perf_counter() - started, 3),
+            "queued_seconds": round(started - received, 3),
+        }
+        if error:
+            result["error"] = error
+        return result
+
+    def serve_forever(self):
+        self.logger.info(f"Render service listening on {self.base_url}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def start(self) -> "RenderService":
+        threading.Thread(target=self.serve_forever, name="render-service", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+
+class RenderServiceClient:
+    """Submits render jobs to a running ``RenderService``."""
+
+    def __init__(self, logger, config=None, base_url: Optional[str] = None):
+        """
+        :param logger: Application logger instance
+        :param config: Service settings (defaults to ``settings.service``)
+        :param base_url: Service URL (defaults to ``http://<host>:<port>`` from the config)
+        """
+        self.config = config or settings.service
+        self.logger = logger
+        self.base_url = base_url or f"http://{self.config.host}:{self.config.port}"
+
+    def _request(self, path: str, body: Optional[dict] = None, timeout: Optional[float] = None) -> dict:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=data,
+            headers={"Content-Type": "application/json"} if data is not None else {},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.config.request_timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            # Failed renders still carry a JSON result
+            try:
+                return json.loads(e.read())
+            except ValueError:
+                raise RuntimeError(f"Render service error {e.code}: {e.reason}") from e
+
+    def health(self, timeout: float = 2.0) -> Optional[dict]:
+        """Service status, or None if no service is reachable."""
+        try:
+            return self._request(HEALTH_PATH, timeout=timeout)
+        except (OSError, RuntimeError, ValueError):
+            return None
+
+    def render(
+        self,
+        quotes: list[str],
+        item_id: Optional[int] = None,
+        draft: bool = False,
+        output_dir: Optional[str] = None,
+        content: Optional[dict] = None,
+    ) -> dict:
+        """
+        Render one reel in the service and wait for it.
+
+        :param quotes: Quotes of the reel
+        :param item_id: Catalog item id (a new item is created if omitted)
+        :param draft: Render a QA draft instead of the full reel
+        :param output_dir: Output folder (defaults to the service's reel folder)
+        :param content: Title/description/tags for a new catalog item
+        :return: Service result with ``success`` and ``output_path``
+        """
+        job = {"quotes": quotes, "item_id": item_id, "draft": draft, "content": content}
+        if output_dir is not None:
+            job["output_dir"] = str(output_dir)
+        return self._request(RENDER_PATH, job)
@@ -0,0 +1,89 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Optional
+
+from app.config.settings import settings
+from .generator import VideoGenerator
+from .job_queue import RenderJobQueue, RenderJob
+
+
+class RenderWorker:
+    """
+    Pulls render jobs from the shared ``RenderJobQueue``, renders them with
+    ``VideoGenerator`` and reports the outcome, heartbeating while it works.
+    """
+
+    def __init__(self, logger, queue: Optional[RenderJobQueue] = None, worker_id: Optional[str] = None):
+        """
+        :param logger: Application logger instance
+        :param queue: Job queue (defaults to the configured shared queue)
+        :param worker_id: Unique worker id (defaults to host-pid-random)
+        """
+        self.config = settings.queue
+        self.logger = logger
+        self.queue = queue or RenderJobQueue(logger)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.generator = VideoGenerator(logger)
+
+    def _heartbeat_loop(self, job: RenderJob, stop: threading.Event):
+        while not stop.wait(self.config.heartbeat_interval):
+            if not self.queue.heartbeat(job.id, self.worker_id):
+                self.logger.warning(f"Lost lease on job {job.id} (reel {job.reel_id}).")
+                return
+
+    def process(self, job: RenderJob) -> bool:
+        """
+        Render one leased job and record its result in the queue.
+        """
+        self.logger.info(f"[{self.worker_id}] Rendering reel {job.reel_id} (job {job.id}, attempt {job.attempts})")
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat_loop, args=(job, stop), daemon=True)
+        heartbeat.start()
+
+        try:
+            success = self.generator.generate_video(job.quotes, job.reel_id, output_folder=job.output_dir)
+            error = None if success else "render failed"
+        except Exception as e:
+            success, error = False, str(e)
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        if success:
+            output_path = job.output_dir / f"reel_{job.reel_id}.mp4"
+            if not self.queue.complete(job.id, self.worker_id, output_path):
+                self.logger.warning(f"Job {job.id} was cancelled or reclaimed by another worker before completion.")
+            return True
+
+        self.queue.fail(job.id, self.worker_id, error)
+        self.logger.error(f"Job {job.id} (reel {job.reel_id}) failed: {error}")
+        return False
+
+    def run(self, exit_when_empty: bool = False, max_jobs: Optional[int] = None) -> int:
+        """
+        Worker loop.
+
+        :param exit_when_empty: Stop once no job is claimable instead of polling
+        :param max_jobs: Stop after this many jobs
+        :return: Number of jobs rendered successfully
+        """
+        self.logger.info(f"Render worker {self.worker_id} started on {self.queue.db_file}")
+        processed = successful = 0
+
+        while max_jobs is None or processed < max_jobs:
+            job = self.queue.lease(self.worker_id)
+            if job is None:
+                if exit_when_empty:
+                    break
+                time.sleep(self.config.poll_interval)
+                continue
+
+            processed += 1
+            if self.process(job):
+                successful += 1
+
+        self.logger.info(f"Render worker {self.worker_id} stopped: {successful}/{processed} jobs successful.")
+        return successful
@@ -1,30 +1,18 @@
-import subprocess
 import json
+import os
+from pathlib import Path
 from typing import List
 
 class MediaUtils:
     def __init__(self, logger):
         """
-        Media utilities for GPU detection, clip cleanup, and loading quotes.
+        Media utilities for clip cleanup and loading quotes.
         
         Args:
             logger: A logging.Logger instance for logging messages.
         """
         self.logger = logger
 
-    def check_gpu_support(self) -> bool:
-        """Detect NVIDIA GPU with NVENC support."""
-        try:
-            result = subprocess.run(['nvidia-smi'], capture_output=True, text=True, timeout=10)
-            if result.returncode != 0:
-                return False
-
-            ffmpeg_check = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'], capture_output=True, text=True, timeout=10)
-            return 'h264_nvenc' in ffmpeg_check.stdout
-        except Exception as e:
-            self.logger.warning(f"GPU detection error: {e}")
-            return False
-
     def cleanup_clips(self, clips):
         """Close all video/audio clips to free resources."""
         for clip in clips:
@@ -48,3 +36,28 @@ class MediaUtils:
             self.logger.warning(f"{file_path} not found, using sample quotes.")
             
         return quotes_list
+
+    def load_content_items(self, file_path: str) -> List[dict]:
+        """Load content items that carry an id and quotes from a JSON file."""
+        items = []
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                for item in json.load(f):
+                    if item.get("quotes") and item.get("id") is not None:
+                        items.append(item)
+        except FileNotFoundError:
+            self.logger.warning(f"{file_path} not found.")
+
+        return items
+
+    def partial_output_path(self, output_path: Path) -> Path:
+        """
+        Hidden temporary path next to ``output_path``. Readers only look for
+        ``reel_{id}.mp4``, so a partial file is never mistaken for a reel.
+        """
+        output_path = Path(output_path)
+        return output_path.with_name(f".{output_path.stem}.{os.getpid()}.partial{output_path.suffix}")
+
+    def publish_atomically(self, partial_path: Path, output_path: Path):
+        """Move a fully written file into place in a single rename."""
+        os.replace(partial_path, output_path)
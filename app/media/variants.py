@@ -0,0 +1,194 @@
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from moviepy.config import FFMPEG_BINARY
+
+from app.config.settings import settings
+from .audio import CHANNELS
+from .encoder import EncoderProfile
+
+# Overlay coordinates per logo placement (m = margin in output pixels)
+LOGO_POSITIONS = {
+    "bottom": ("(main_w-overlay_w)/2", "main_h-overlay_h-{m}"),
+    "top": ("(main_w-overlay_w)/2", "{m}"),
+    "top-right": ("main_w-overlay_w-{m}", "{m}"),
+    "bottom-right": ("main_w-overlay_w-{m}", "main_h-overlay_h-{m}"),
+}
+
+
+@dataclass
+class OutputTarget:
+    """One encoded output of a multi-output render."""
+    name: str
+    path: Path
+    width: int
+    height: int
+    duration: float
+    encoder: EncoderProfile
+    logo_scale: float = 0.1
+    logo_position: str = "bottom"
+    logo_margin: int = 0
+
+
+class MultiOutputEncoder:
+    """
+    Encodes one composed reel into several outputs with a single ffmpeg
+    process. The frames are rendered once and piped in as raw video, the
+    filter graph splits them, and each branch is scaled, trimmed, given
+    its own logo placement and soundtrack cut, then encoded with its own
+    settings. Decoding, cropping and text composition are shared by all
+    outputs; only the encodes are paid per output.
+    """
+
+    def __init__(self, logger, config=None):
+        """
+        :param logger: Application logger instance
+        :param config: Variant settings providing ``ffmpeg_timeout`` (defaults to ``settings.variants``)
+        """
+        self.config = config or settings.variants
+        self.logger = logger
+
+    @staticmethod
+    def _video_branch(index: int, target: OutputTarget, source_size: tuple[int, int], logo: bool) -> str:
+        chain = []
+        if (target.width, target.height) != tuple(source_size):
+            chain.append(
+                f"scale={target.width}:{target.height}:force_original_aspect_ratio=increase,"
+                f"crop={target.width}:{target.height}"
+            )
+        chain.append(f"trim=end={target.duration:.3f},setpts=PTS-STARTPTS")
+        branch = f"[v{index}]{','.join(chain)}"
+        if not logo or target.logo_position not in LOGO_POSITIONS:
+            return f"{branch},format=yuv420p[vo{index}]"
+
+        x, y = (p.format(m=target.logo_margin) for p in LOGO_POSITIONS[target.logo_position])
+        height = max(2, int(target.height * target.logo_scale))
+        return (
+            f"{branch}[b{index}];[l{index}]scale=-2:{height}[lg{index}];"
+            f"[b{index}][lg{index}]overlay=x={x}:y={y}:format=auto,format=yuv420p[vo{index}]"
+        )
+
+    @staticmethod
+    def _audio_branch(index: int, target: OutputTarget, full_duration: float, fade_out: float) -> str:
+        chain = f"[a{index}]atrim=end={target.duration:.3f},asetpts=PTS-STARTPTS"
+        if target.duration < full_duration - 1e-3 and fade_out > 0:
+            # The shared soundtrack only fades out at the full length
+            chain += f",afade=t=out:st={max(0.0, target.duration - fade_out):.3f}:d={fade_out:.3f}"
+        return f"{chain}[ao{index}]"
+
+    @staticmethod
+    def _split(stream: str, prefix: str, count: int, audio: bool = False) -> str:
+        name = "asplit" if audio else "split"
+        return f"[{stream}]{name}={count}{''.join(f'[{prefix}{i}]' for i in range(count))}"
+
+    def command(
+        self,
+        targets: list[OutputTarget],
+        source_size: tuple[int, int],
+        fps: float,
+        duration: float,
+        logo_path: Optional[str] = None,
+        soundtrack_path: Optional[Path] = None,
+        sample_rate: int = 48000,
+        fade_out: float = 0.0,
+    ) -> list[str]:
+        """
+        ffmpeg command reading rgb24 frames of ``source_size`` from stdin and
+        writing every target.
+
+        :param duration: Length of the composed reel (and of the soundtrack)
+        :param soundtrack_path: Raw float32 stereo PCM for the full length
+        :param fade_out: Fade applied to soundtracks cut shorter than ``duration``
+        """
+        count = len(targets)
+        cmd = [
+            FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{source_size[0]}x{source_size[1]}",
+            "-framerate", str(fps), "-i", "-",
+        ]
+        inputs = 1
+        logo_input = audio_input = None
+        if logo_path and Path(logo_path).exists():
+            logo_input, inputs = inputs, inputs + 1
+            cmd += ["-i", str(logo_path)]
+        if soundtrack_path is not None:
+            audio_input = inputs
+            cmd += ["-f", "f32le", "-ar", str(sample_rate), "-ac", str(CHANNELS), "-i", str(soundtrack_path)]
+
+        graph = [self._split("0:v", "v", count)]
+        if logo_input is not None:
+            graph.append(self._split(f"{logo_input}:v", "l", count))
+        if audio_input is not None:
+            graph.append(self._split(f"{audio_input}:a", "a", count, audio=True))
+        for i, target in enumerate(targets):
+            graph.append(self._video_branch(i, target, source_size, logo_input is not None))
+            if audio_input is not None:
+                graph.append(self._audio_branch(i, target, duration, fade_out))
+        cmd += ["-filter_complex", ";".join(graph)]
+
+        for i, target in enumerate(targets):
+            encoder = target.encoder
+            cmd += [
+                "-map", f"[vo{i}]", "-r", str(fps),
+                "-c:v", encoder.codec, "-preset", encoder.preset, *encoder.video_params(),
+            ]
+            if encoder.threads is not None:
+                cmd += ["-threads", str(encoder.threads)]
+            if audio_input is not None:
+                cmd += [
+                    "-map", f"[ao{i}]", "-c:a", encoder.audio_codec or "aac",
+                    "-b:a", f"{encoder.audio_bitrate_kbps or 128}k", "-ar", str(sample_rate),
+                ]
+            if encoder.faststart:
+                cmd += ["-movflags", "+faststart"]
+            cmd += ["-f", "mp4", str(target.path)]
+        return cmd
+
+    def write(
+        self,
+        clip,
+        targets: list[OutputTarget],
+        fps: float,
+        logo_path: Optional[str] = None,
+        soundtrack: Optional[np.ndarray] = None,
+        sample_rate: int = 48000,
+        fade_out: float = 0.0,
+    ):
+        """
+        Render ``clip`` once and encode it to every target.
+
+        :param clip: Composed reel without logo or audio
+        :param soundtrack: Float32 ``(samples, 2)`` PCM covering the whole clip
+        :raises RuntimeError: ffmpeg failed; outputs may be incomplete
+        """
+        source_size = (int(clip.w), int(clip.h))
+        with tempfile.TemporaryDirectory(prefix="variants_") as tmp, tempfile.TemporaryFile() as stderr:
+            soundtrack_path = None
+            if soundtrack is not None:
+                soundtrack_path = Path(tmp) / "soundtrack.f32"
+                soundtrack.astype(np.float32).tofile(soundtrack_path)
+
+            cmd = self.command(
+                targets, source_size, fps, clip.duration, logo_path, soundtrack_path, sample_rate, fade_out
+            )
+            process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr)
+            try:
+                for frame in clip.iter_frames(fps=fps, dtype="uint8"):
+                    process.stdin.write(np.ascontiguousarray(frame[:, :, :3]).tobytes())
+                process.stdin.close()
+                returncode = process.wait(timeout=self.config.ffmpeg_timeout)
+            except BrokenPipeError:
+                returncode = process.wait(timeout=self.config.ffmpeg_timeout)
+            except BaseException:
+                process.kill()
+                process.wait()
+                raise
+
+            if returncode != 0:
+                stderr.seek(0)
+                message = stderr.read().decode("utf-8", "replace").strip()
+                raise RuntimeError(message.splitlines()[-1] if message else f"ffmpeg exited with {returncode}")
@@ -0,0 +1,259 @@
+import datetime
+import hashlib
+import json
+import sqlite3
+import struct
+import subprocess
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from moviepy.config import FFMPEG_BINARY
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+
+from app.config.settings import settings
+from app.storage.catalog import file_sha256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reel_checks (
+    sha256 TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    problems TEXT NOT NULL,
+    details TEXT NOT NULL,
+    checked_at TEXT NOT NULL,
+    PRIMARY KEY (sha256, parameters)
+);
+"""
+
+# Top-level boxes a playable MP4 needs, before and after the media data
+REQUIRED_BOXES = ("ftyp", "moov")
+MEDIA_BOXES = ("mdat", "moof")
+
+
+def mp4_boxes(path: Path) -> tuple[list[tuple[str, int]], Optional[str]]:
+    """
+    Walk the top-level MP4 boxes by their headers only.
+
+    :return: ([(type, size)], error) where error describes a truncated or
+        malformed box layout
+    """
+    boxes = []
+    file_size = path.stat().st_size
+    with open(path, "rb") as f:
+        offset = 0
+        while offset < file_size:
+            f.seek(offset)
+            header = f.read(8)
+            if len(header) < 8:
+                return boxes, f"truncated box header at byte {offset}"
+            size, kind = struct.unpack(">I4s", header)
+            header_size = 8
+            if size == 1:
+                large = f.read(8)
+                if len(large) < 8:
+                    return boxes, f"truncated box header at byte {offset}"
+                size = struct.unpack(">Q", large)[0]
+                header_size = 16
+            elif size == 0:
+                size = file_size - offset
+            kind = kind.decode("latin-1")
+            if size < header_size:
+                return boxes, f"invalid '{kind}' box size {size} at byte {offset}"
+            if offset + size > file_size:
+                return boxes, f"'{kind}' box truncated: ends at byte {offset + size} of {file_size}"
+            boxes.append((kind, size))
+            offset += size
+    return boxes, None
+
+
+class ReelVerifier:
+    """
+    Cheap pre-upload integrity check of a rendered reel.
+
+    The container layout is validated from the MP4 box headers (ftyp, moov,
+    media data, no truncation), stream metadata (duration, resolution, fps,
+    audio) comes from one ffmpeg probe, and a few frames are decoded at
+    thumbnail size to catch black or frozen output. Results are cached per
+    file hash and check parameters.
+    """
+
+    def __init__(self, logger, config=None, video_config=None):
+        """
+        :param logger: Application logger instance
+        :param config: Verification settings (defaults to ``settings.verify``)
+        :param video_config: Video settings with the expected resolution and fps (defaults to ``settings.video``)
+        """
+        self.config = config or settings.verify
+        self.video_config = video_config or settings.video
+        self.logger = logger
+        self.cache_file = Path(self.config.cache_file)
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.cache_file, timeout=self.config.busy_timeout, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _parameters(self) -> str:
+        # Changed thresholds or targets invalidate cached results
+        fields = {
+            "width": self.video_config.target_width,
+            "height": self.video_config.target_height,
+            "fps": self.video_config.fps,
+            **{k: v for k, v in vars(self.config).items() if k not in ("cache_file", "busy_timeout", "enabled")},
+        }
+        return hashlib.sha1(json.dumps(fields, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:12]
+
+    # ---------------------------------------------------------------
+    # Checks
+    # ---------------------------------------------------------------
+    def check_container(self, path: Path) -> list[str]:
+        boxes, error = mp4_boxes(path)
+        problems = [error] if error else []
+        kinds = {kind for kind, _ in boxes}
+        problems += [f"no '{kind}' box" for kind in REQUIRED_BOXES if kind not in kinds]
+        if not kinds & set(MEDIA_BOXES):
+            problems.append("no media data")
+        return problems
+
+    def check_metadata(self, path: Path, details: dict) -> list[str]:
+        try:
+            infos = ffmpeg_parse_infos(str(path))
+        except Exception as e:
+            return [f"unreadable: {e}"]
+
+        problems = []
+        duration = infos.get("duration") or 0.0
+        size = infos.get("video_size")
+        fps = infos.get("video_fps")
+        details.update(duration=duration, size=size, fps=fps, audio=bool(infos.get("audio_found")))
+
+        if not infos.get("video_found"):
+            return ["no video stream"]
+        if not self.config.min_duration <= duration <= self.config.max_duration:
+            problems.append(
+                f"duration {duration:.2f}s outside {self.config.min_duration}-{self.config.max_duration}s"
+            )
+        expected_size = [self.video_config.target_width, self.video_config.target_height]
+        if size is not None and list(size) != expected_size:
+            problems.append(f"resolution {size[0]}x{size[1]}, expected {expected_size[0]}x{expected_size[1]}")
+        if fps and abs(fps - self.video_config.fps) > self.config.fps_tolerance:
+            problems.append(f"{fps:.2f} fps, expected {self.video_config.fps}")
+        if self.config.require_audio and not infos.get("audio_found"):
+            problems.append("no audio stream")
+        return problems
+
+    def sample_frames(self, path: Path, duration: float) -> np.ndarray:
+        """
+        Decode ``sampled_frames`` evenly spaced frames as grey thumbnails in
+        one sequential pass that stops after the last sample. Samples sit
+        mid-interval: keyframes and segment boundaries coincide with the
+        clips' fades from black.
+
+        :return: ``(frames, height, width)`` uint8 luma
+        """
+        width, height = self.config.sample_width, self.config.sample_height
+        count = max(1, self.config.sampled_frames)
+        interval = duration / count
+        select = f"gte(t,{interval / 2:.3f})*(isnan(prev_selected_t)+gte(t-prev_selected_t,{interval:.3f}))"
+        result = subprocess.run(
+            [
+                FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-i", str(path),
+                "-map", "0:v:0", "-an", "-frames:v", str(count),
+                "-vf", f"select='{select}',scale={width}:{height},format=gray",
+                "-fps_mode", "passthrough", "-f", "rawvideo", "-",
+            ],
+            capture_output=True,
+            timeout=self.config.ffmpeg_timeout,
+        )
+        if result.returncode != 0:
+            stderr = result.stderr.decode("utf-8", "replace").strip()
+            raise RuntimeError(stderr.splitlines()[-1] if stderr else f"ffmpeg exited with {result.returncode}")
+        frame_size = width * height
+        frames = len(result.stdout) // frame_size
+        return np.frombuffer(result.stdout[:frames * frame_size], dtype=np.uint8).reshape(frames, height, width)
+
+    def check_frames(self, path: Path, details: dict) -> list[str]:
+        try:
+            frames = self.sample_frames(path, details["duration"])
+        except Exception as e:
+            return [f"frame decode failed: {e}"]
+        if not len(frames):
+            return ["no decodable frames"]
+
+        frames = frames.astype(np.float32)
+        # Judged by the brightest pixels, so dark backgrounds with text still pass
+        black = np.percentile(frames, 99, axis=(1, 2)) <= self.config.black_luma
+        details.update(sampled_frames=len(frames), black_frames=int(black.sum()))
+
+        problems = []
+        if black.mean() > self.config.max_black_ratio:
+            problems.append(f"{int(black.sum())}/{len(frames)} sampled frames are black")
+        if len(frames) > 1:
+            changes = np.abs(np.diff(frames, axis=0)).mean(axis=(1, 2))
+            details["min_frame_change"] = round(float(changes.min()), 2)
+            if changes.max() <= self.config.frozen_difference:
+                problems.append(f"frozen: {len(frames)} sampled frames are identical")
+        return problems
+
+    # ---------------------------------------------------------------
+    # Public API
+    # ---------------------------------------------------------------
+    def verify(self, path: Path, expected_sha256: Optional[str] = None) -> list[str]:
+        """
+        Check a reel before upload.
+
+        :param expected_sha256: Hash recorded at render time; a different file fails
+        :return: Problems found (empty if the reel is fine)
+        """
+        path = Path(path)
+        start = time.perf_counter()
+        if not path.exists() or path.stat().st_size == 0:
+            return ["file missing or empty"]
+
+        sha256 = file_sha256(path)
+        if expected_sha256 and sha256 != expected_sha256:
+            return ["file changed since it was rendered"]
+
+        parameters = self._parameters()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT problems FROM reel_checks WHERE sha256 = ? AND parameters = ?",
+                (sha256, parameters),
+            ).fetchone()
+        if row:
+            return json.loads(row["problems"])
+
+        details = {}
+        problems = self.check_container(path)
+        if not problems:
+            problems = self.check_metadata(path, details)
+        if not problems:
+            problems = self.check_frames(path, details)
+        details["seconds"] = round(time.perf_counter() - start, 3)
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO reel_checks (sha256, parameters, problems, details, checked_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    sha256,
+                    parameters,
+                    json.dumps(problems),
+                    json.dumps(details),
+                    datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                ),
+            )
+        self.logger.info(
+            f"Verified {path.name} in {details['seconds']}s: {'; '.join(problems) if problems else 'ok'}"
+        )
+        return problems
@@ -0,0 +1,207 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Optional
+
+from app.config.settings import settings, LOGS_DIR
+from app.ai_workflow.generator import ContentGenerator
+from app.media.concurrency import RenderResult
+from app.media.generator import VideoGenerator
+from app.media.utils import MediaUtils
+from app.shorts_uploader.uploader import YouTubeUploader
+from app.shorts_uploader.utils import read_last_upload_time
+from app.shorts_uploader.youtube_scheduler import YouTubeScheduler
+from app.storage.catalog import UPLOADED
+from app.utils.logger import SingletonLogger, log_context
+
+# Per-process generators used by the shared render pool, keyed by channel
+_channel_generators = {}
+
+
+def _render_channel_reel(channel: str, app_settings, quotes: list[str], item_id: int) -> RenderResult:
+    if channel not in _channel_generators:
+        logger = SingletonLogger(name="render_worker", log_level=settings.log_level, log_dir=LOGS_DIR).get_logger()
+        _channel_generators[channel] = VideoGenerator(logger, app_settings)
+    return _channel_generators[channel].render_tracked(quotes, item_id)
+
+
+class FairJobQueue:
+    """
+    Per-channel FIFO queues served round-robin, so a channel with a large
+    backlog can never starve the others.
+    """
+
+    def __init__(self):
+        self.queues: "OrderedDict[str, deque]" = OrderedDict()
+
+    def put(self, channel: str, job):
+        self.queues.setdefault(channel, deque()).append(job)
+
+    def get(self) -> Optional[tuple[str, object]]:
+        for channel in list(self.queues):
+            queue = self.queues[channel]
+            # Move the served channel to the back of the rotation
+            self.queues.move_to_end(channel)
+            if queue:
+                return channel, queue.popleft()
+        return None
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self.queues.values())
+
+
+class MultiChannelRunner:
+    """
+    Runs the generate -> render -> upload pipeline for several channels at
+    once. Content generation runs concurrently per channel, renders share
+    one process pool fed round-robin across channels, and each rendered
+    reel is uploaded immediately on a shared upload thread pool (one upload
+    at a time per channel, since an API client is not thread-safe).
+    """
+
+    def __init__(
+        self,
+        logger,
+        profiles: dict,
+        render_workers: Optional[int] = None,
+        upload_workers: Optional[int] = None,
+    ):
+        """
+        :param logger: Application logger instance
+        :param profiles: Channel name -> Settings (see ``load_channel_profiles``)
+        :param render_workers: Size of the shared render pool
+        :param upload_workers: Size of the shared upload pool
+        """
+        self.logger = logger
+        self.profiles = profiles
+        self.render_workers = render_workers or max(1, settings.concurrency.max_workers)
+        self.upload_workers = upload_workers or max(1, len(profiles))
+        self.fair_queue = FairJobQueue()
+
+        self._schedulers: dict[str, YouTubeScheduler] = {}
+        self._uploaders: dict[str, YouTubeUploader] = {}
+        self._upload_locks = {name: threading.Lock() for name in profiles}
+        self.stats = {name: {"generated": 0, "rendered": 0, "uploaded": 0} for name in profiles}
+
+    def _channel_logger(self, channel: str):
+        return SingletonLogger(
+            name=f"channel.{channel}", log_level=settings.log_level, log_dir=LOGS_DIR
+        ).get_logger()
+
+    # ---------------------------------------------------------------
+    # Stages
+    # ---------------------------------------------------------------
+    def _generate_content(self, channel: str, video_count: int) -> list[dict]:
+        app_settings = self.profiles[channel]
+        logger = self._channel_logger(channel)
+        with log_context(stage="generate"):
+            ContentGenerator(logger, app_settings).generate_batch(video_count)
+        # Also picks up a batch left over from an interrupted run
+        return MediaUtils(logger).load_content_items(app_settings.files.motivational_output)
+
+    def _scheduler(self, channel: str) -> YouTubeScheduler:
+        if channel not in self._schedulers:
+            scheduler = YouTubeScheduler(logger=self._channel_logger(channel), app_settings=self.profiles[channel])
+            scheduler.authenticate()
+            scheduler.ledger.import_last_upload_time(read_last_upload_time(scheduler.last_upload_file))
+            self._uploaders[channel] = YouTubeUploader(
+                scheduler.youtube_client, scheduler.video_folder, logger=scheduler.logger
+            )
+            self._schedulers[channel] = scheduler
+        return self._schedulers[channel]
+
+    def _upload(self, channel: str, item_id: int) -> Optional[str]:
+        with self._upload_locks[channel]:
+            scheduler = self._scheduler(channel)
+            item = scheduler.catalog.get(item_id)
+            state = scheduler.schedule_video(self._uploaders[channel], item)
+            if state is None and scheduler.quota_blocked:
+                scheduler.defer_uploads([item])
+            if state == UPLOADED:
+                scheduler.videos.append(item)
+                self.stats[channel]["uploaded"] += 1
+            return state
+
+    # ---------------------------------------------------------------
+    # Orchestration
+    # ---------------------------------------------------------------
+    def run(self, video_count: int) -> dict:
+        """
+        Run all channels to completion.
+
+        :param video_count: Videos to generate per channel
+        :return: Per-channel counts of generated, rendered and uploaded reels
+        """
+        started = time.perf_counter()
+        self.logger.info(
+            f"Running {len(self.profiles)} channels with {self.render_workers} render "
+            f"and {self.upload_workers} upload workers."
+        )
+
+        content_pool = ThreadPoolExecutor(max_workers=max(1, len(self.profiles)), thread_name_prefix="content")
+        render_pool = ProcessPoolExecutor(max_workers=self.render_workers)
+        upload_pool = ThreadPoolExecutor(max_workers=self.upload_workers, thread_name_prefix="upload")
+
+        content_futures = {
+            content_pool.submit(self._generate_content, channel, video_count): channel
+            for channel in self.profiles
+        }
+        render_futures = {}
+        upload_futures = []
+
+        try:
+            while content_futures or render_futures or len(self.fair_queue):
+                while len(render_futures) < self.render_workers and len(self.fair_queue):
+                    channel, item = self.fair_queue.get()
+                    future = render_pool.submit(
+                        _render_channel_reel, channel, self.profiles[channel], item["quotes"], item["id"]
+                    )
+                    render_futures[future] = channel
+
+                done, _ = wait(
+                    list(content_futures) + list(render_futures),
+                    timeout=1.0,
+                    return_when=FIRST_COMPLETED,
+                )
+
+                for future in done:
+                    if future in content_futures:
+                        channel = content_futures.pop(future)
+                        try:
+                            items = future.result()
+                        except Exception:
+                            self.logger.exception(f"Content generation failed for channel '{channel}'.")
+                            continue
+                        self.stats[channel]["generated"] += len(items)
+                        for item in items:
+                            self.fair_queue.put(channel, item)
+                        continue
+
+                    channel = render_futures.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception:
+                        self.logger.exception(f"Render worker failed for channel '{channel}'.")
+                        continue
+                    if result.success:
+                        self.stats[channel]["rendered"] += 1
+                        upload_futures.append(upload_pool.submit(self._upload, channel, result.job_id))
+
+            for future in upload_futures:
+                try:
+                    future.result()
+                except Exception:
+                    self.logger.exception("Upload failed.")
+        finally:
+            content_pool.shutdown(wait=True)
+            render_pool.shutdown(wait=True)
+            upload_pool.shutdown(wait=True)
+
+        for channel, scheduler in self._schedulers.items():
+            scheduler.cleanup_after_upload()
+
+        self.logger.info(
+            f"Multi-channel run finished in {time.perf_counter() - started:.1f}s: {self.stats}"
+        )
+        return self.stats
@@ -0,0 +1,333 @@
+import argparse
+import copy
+import os
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+from moviepy.config import FFMPEG_BINARY
+
+from app.config.settings import settings, LOGS_DIR
+from app.media.encoder import EncoderProfile
+from app.media.utils import MediaUtils
+from app.storage.catalog import ContentCatalog, UPLOADED
+from app.utils.logger import SingletonLogger
+from .mock_server import MockYouTubeServer, MockServerConfig
+from .uploader import YouTubeUploader
+from .youtube_scheduler import YouTubeScheduler
+
+
+class UploadBenchmark:
+    """
+    Schedules N synthetic reels through ``YouTubeScheduler`` against a
+    local ``MockYouTubeServer`` and reports upload throughput, retries and
+    end-to-end scheduling time. Nothing touches the real API or quota.
+    """
+
+    def __init__(
+        self,
+        logger,
+        server_config: MockServerConfig,
+        chunk_size: int,
+        num_retries: int,
+        retry_backoff: float = settings.youtube.upload_retry_backoff,
+        quota_units: Optional[int] = None,
+    ):
+        """
+        :param logger: Application logger instance
+        :param server_config: Latency/bandwidth/fault injection for the mock server
+        :param chunk_size: Upload chunk size in bytes (-1 = single request)
+        :param num_retries: Retries per chunk passed to the uploader
+        :param retry_backoff: Base backoff delay in seconds between retries
+        :param quota_units: Daily budget of the quota ledger (None = enough for every reel)
+        """
+        self.logger = logger
+        self.server_config = server_config
+        self.chunk_size = chunk_size
+        self.num_retries = num_retries
+        self.retry_backoff = retry_backoff
+        self.quota_units = quota_units
+
+    def _bench_settings(self, work_dir: Path):
+        bench = copy.deepcopy(settings)
+        bench.files.motivational_output = work_dir / "motivational_content.json"
+        bench.youtube.video_folder = work_dir / "reels"
+        bench.youtube.uploaded_reels_path = work_dir / "uploaded"
+        bench.youtube.last_upload_file = work_dir / "last_upload_time.txt"
+        bench.youtube.slot_ledger_file = work_dir / "publish_slots.sqlite3"
+        bench.youtube.quota_ledger_file = work_dir / "quota_ledger.sqlite3"
+        bench.youtube.quota_daily_units = self.quota_units if self.quota_units is not None else 2 ** 31
+        bench.catalog.db_file = work_dir / "catalog.sqlite3"
+        # Synthetic reels are random bytes, not playable video
+        bench.verify.enabled = False
+        bench.youtube.video_folder.mkdir(parents=True, exist_ok=True)
+        return bench
+
+    def _make_reels(self, bench, reel_count: int, size_mb: float) -> list[int]:
+        catalog = ContentCatalog(self.logger, bench.catalog)
+        size = int(size_mb * 1024 * 1024)
+        ids = []
+        for i in range(reel_count):
+            item_id = catalog.add_generated({
+                "quotes": ["benchmark"],
+                "video_title": f"Benchmark reel {i + 1}",
+                "youtube_description": "Synthetic upload benchmark",
+                "video_tags": ["benchmark"],
+            })
+            path = bench.youtube.video_folder / f"reel_{item_id}.mp4"
+            path.write_bytes(os.urandom(size))
+            catalog.mark_rendered(item_id, path, 0.0)
+            ids.append(item_id)
+        return ids
+
+    def run(self, reel_count: int, size_mb: float) -> dict:
+        """
+        :param reel_count: Number of synthetic reels
+        :param size_mb: Size of each reel in MiB
+        :return: Benchmark report
+        """
+        with tempfile.TemporaryDirectory(prefix="upload_benchmark_") as tmp, \
+                MockYouTubeServer(self.server_config) as server:
+            bench = self._bench_settings(Path(tmp))
+            self._make_reels(bench, reel_count, size_mb)
+
+            scheduler = YouTubeScheduler(logger=self.logger, app_settings=bench)
+            scheduler.youtube_client = server.client()
+            scheduler.load_videos()
+            uploader = YouTubeUploader(
+                scheduler.youtube_client,
+                scheduler.video_folder,
+                logger=self.logger,
+                chunk_size=self.chunk_size,
+                num_retries=self.num_retries,
+                retry_backoff=self.retry_backoff,
+            )
+
+            per_reel = []
+            started = time.perf_counter()
+            for i, item in enumerate(scheduler.videos):
+                reel_started = time.perf_counter()
+                state = scheduler.schedule_video(uploader, item, i)
+                elapsed = time.perf_counter() - reel_started
+                if state is None and scheduler.quota_blocked:
+                    scheduler.defer_uploads(scheduler.videos[i:])
+                    per_reel += [{"id": v["id"], "state": "deferred", "seconds": 0.0, "mb_per_s": None}
+                                 for v in scheduler.videos[i:]]
+                    break
+                per_reel.append({
+                    "id": item["id"],
+                    "state": state,
+                    "seconds": round(elapsed, 3),
+                    "mb_per_s": round(size_mb / elapsed, 2) if elapsed else None,
+                })
+            total_seconds = time.perf_counter() - started
+
+            uploaded = sum(1 for r in per_reel if r["state"] == UPLOADED)
+            deferred = sum(1 for r in per_reel if r["state"] == "deferred")
+            stats = asdict(server.stats)
+            report = {
+                "reels": reel_count,
+                "size_mb": size_mb,
+                "chunk_size": self.chunk_size,
+                "num_retries": self.num_retries,
+                "server": asdict(self.server_config),
+                "uploaded": uploaded,
+                "deferred": deferred,
+                "failed": reel_count - uploaded - deferred,
+                "quota_units_used": scheduler.quota.used(),
+                "total_seconds": round(total_seconds, 3),
+                "throughput_mb_per_s": round(uploaded * size_mb / total_seconds, 2) if total_seconds else None,
+                "retries": uploader.retries,
+                "injected_faults": stats["injected_5xx"] + stats["injected_429"] + stats["dropped"],
+                "server_stats": stats,
+                "per_reel": per_reel,
+            }
+
+        self.logger.info(
+            f"Upload benchmark: {uploaded}/{reel_count} reels in {report['total_seconds']}s, "
+            f"{report['throughput_mb_per_s']} MB/s, {report['retries']} retries"
+        )
+        return report
+
+    def _encode(self, bench, item_id: int, duration: float, preset: str, fragment_seconds=None) -> bool:
+        """Stand-in render: encode a synthetic reel with ffmpeg and record it in the catalog."""
+        video = bench.video
+        output_path = bench.youtube.video_folder / f"reel_{item_id}.mp4"
+        partial_path = MediaUtils(self.logger).partial_output_path(output_path)
+        profile = EncoderProfile(codec="libx264", preset=preset, threads=None, crf=video.crf)
+        started = time.perf_counter()
+        result = subprocess.run(
+            [
+                FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y",
+                "-f", "lavfi", "-i", f"testsrc2=size={video.target_width}x{video.target_height}:rate={video.fps}:duration={duration}",
+                "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+                "-c:v", profile.codec, "-preset", profile.preset, "-pix_fmt", "yuv420p",
+                *profile.ffmpeg_params(fragment_seconds), "-c:a", "aac", "-f", "mp4", str(partial_path),
+            ],
+            capture_output=True,
+        )
+        if result.returncode != 0:
+            partial_path.unlink(missing_ok=True)
+            return False
+        os.replace(partial_path, output_path)
+        ContentCatalog(self.logger, bench.catalog).mark_rendered(
+            item_id, output_path, time.perf_counter() - started, time.perf_counter() - started
+        )
+        return True
+
+    def run_encode(self, reel_count: int, duration: float, preset: str, streaming: bool) -> dict:
+        """
+        Encode synthetic reels and schedule each one, either after its encode
+        (sequential) or while it encodes (streaming).
+
+        :param duration: Length of each synthetic reel in seconds
+        :param preset: x264 preset of the stand-in encode
+        :return: Benchmark report
+        """
+        with tempfile.TemporaryDirectory(prefix="upload_benchmark_") as tmp, \
+                MockYouTubeServer(self.server_config) as server:
+            bench = self._bench_settings(Path(tmp))
+            bench.verify.enabled = True
+            bench.verify.cache_file = Path(tmp) / "reel_checks.sqlite3"
+            bench.youtube.stream_chunk_size = max(self.chunk_size, 256 * 1024)
+            catalog = ContentCatalog(self.logger, bench.catalog)
+            scheduler = YouTubeScheduler(logger=self.logger, app_settings=bench)
+            scheduler.youtube_client = server.client()
+            uploader = YouTubeUploader(
+                scheduler.youtube_client,
+                scheduler.video_folder,
+                logger=self.logger,
+                chunk_size=self.chunk_size,
+                num_retries=self.num_retries,
+                retry_backoff=self.retry_backoff,
+            )
+
+            per_reel = []
+            for i in range(reel_count):
+                item_id = catalog.add_generated({
+                    "quotes": ["benchmark"],
+                    "video_title": f"Benchmark reel {i + 1}",
+                    "youtube_description": "Synthetic upload benchmark",
+                    "video_tags": ["benchmark"],
+                })
+                item = catalog.get(item_id)
+                output_path = bench.youtube.video_folder / f"reel_{item_id}.mp4"
+                started = time.perf_counter()
+                if streaming:
+                    state = scheduler.schedule_streaming(
+                        uploader,
+                        item,
+                        lambda fragment_seconds, item_id=item_id: self._encode(
+                            bench, item_id, duration, preset, fragment_seconds
+                        ),
+                        MediaUtils(self.logger).partial_output_path(output_path),
+                        output_path,
+                        i,
+                    )
+                else:
+                    state = None
+                    if self._encode(bench, item_id, duration, preset):
+                        state = scheduler.schedule_video(uploader, catalog.get(item_id), i)
+                item = catalog.get(item_id)
+                per_reel.append({
+                    "id": item_id,
+                    "state": state,
+                    "seconds": round(time.perf_counter() - started, 3),
+                    "encode_seconds": round(item["encode_seconds"] or 0.0, 3),
+                    "size_mb": round((item["video_bytes"] or 0) / (1024 * 1024), 2),
+                })
+
+            uploaded = [r for r in per_reel if r["state"] == UPLOADED]
+            report = {
+                "mode": "streaming" if streaming else "sequential",
+                "reels": reel_count,
+                "uploaded": len(uploaded),
+                "seconds_per_reel": round(sum(r["seconds"] for r in uploaded) / len(uploaded), 3) if uploaded else None,
+                "encode_seconds_per_reel": round(sum(r["encode_seconds"] for r in uploaded) / len(uploaded), 3) if uploaded else None,
+                "retries": uploader.retries,
+                "server_stats": asdict(server.stats),
+                "per_reel": per_reel,
+            }
+
+        self.logger.info(
+            f"Encode+upload benchmark ({report['mode']}): {report['uploaded']}/{reel_count} reels, "
+            f"{report['seconds_per_reel']}s per reel from render start to scheduled"
+        )
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark uploads against a local mock YouTube API server.")
+    parser.add_argument("--reels", type=int, default=5, help="Number of synthetic reels")
+    parser.add_argument("--size-mb", type=float, default=8.0, help="Size of each reel in MiB")
+    parser.add_argument("--chunk-size-mb", type=float, default=None,
+                        help="Upload chunk size in MiB (default: settings, -1 = single request)")
+    parser.add_argument("--num-retries", type=int, default=settings.youtube.upload_num_retries)
+    parser.add_argument("--retry-backoff", type=float, default=settings.youtube.upload_retry_backoff,
+                        help="Base backoff delay in seconds between retries")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--bandwidth-mbps", type=float, default=0.0, help="Upload cap in Mbit/s (0 = unlimited)")
+    parser.add_argument("--error-rate-5xx", type=float, default=0.0)
+    parser.add_argument("--error-rate-429", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Probability of a mid-chunk connection drop")
+    parser.add_argument("--quota-units", type=int, default=None,
+                        help="Daily budget of the quota ledger (default: enough for every reel)")
+    parser.add_argument("--server-quota-units", type=int, default=0,
+                        help="Quota the mock API enforces, e.g. lower than the ledger's (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--encode-seconds", type=float, default=None,
+                        help="Encode synthetic reels of this length and compare uploading after vs. while encoding")
+    parser.add_argument("--preset", default="veryfast", help="x264 preset of the synthetic encode")
+    args = parser.parse_args()
+
+    chunk_size = settings.youtube.upload_chunk_size
+    if args.chunk_size_mb is not None:
+        # googleapiclient requires chunks to be multiples of 256 KiB
+        chunk_size = -1 if args.chunk_size_mb < 0 else max(1, round(args.chunk_size_mb * 4)) * 256 * 1024
+
+    logger = SingletonLogger(name="upload_benchmark", log_level=settings.log_level, log_dir=LOGS_DIR).get_logger()
+    benchmark = UploadBenchmark(
+        logger,
+        MockServerConfig(
+            latency_ms=args.latency_ms,
+            bandwidth_mbps=args.bandwidth_mbps,
+            error_rate_5xx=args.error_rate_5xx,
+            error_rate_429=args.error_rate_429,
+            drop_rate=args.drop_rate,
+            quota_units=args.server_quota_units,
+            upload_cost=settings.youtube.quota_upload_cost,
+            seed=args.seed,
+        ),
+        chunk_size=chunk_size,
+        num_retries=args.num_retries,
+        retry_backoff=args.retry_backoff,
+        quota_units=args.quota_units,
+    )
+
+    if args.encode_seconds:
+        for streaming in (False, True):
+            report = benchmark.run_encode(args.reels, args.encode_seconds, args.preset, streaming)
+            for row in report.pop("per_reel"):
+                print(
+                    f"{report['mode']} reel {row['id']}: {row['state']} {row['seconds']}s after render start "
+                    f"(encode {row['encode_seconds']}s, {row['size_mb']} MB)"
+                )
+            print(
+                f"{report['mode']}: {report['uploaded']}/{report['reels']} uploaded, "
+                f"{report['seconds_per_reel']}s per reel (encode {report['encode_seconds_per_reel']}s), "
+                f"{report['retries']} retries"
+            )
+        return
+
+    report = benchmark.run(args.reels, args.size_mb)
+    for row in report.pop("per_reel"):
+        print(f"reel {row['id']}: {row['state']} in {row['seconds']}s ({row['mb_per_s']} MB/s)")
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+
+import httplib2
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+UPLOAD_PATH = "/upload/youtube/v3/videos"
+CONTENT_RANGE = re.compile(r"bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)")
+
+
+@dataclass
+class MockServerConfig:
+    # Added to every request, in milliseconds
+    latency_ms: float = 0.0
+    # Upload bandwidth cap in megabits per second (0 = unlimited)
+    bandwidth_mbps: float = 0.0
+    # Probability of answering a request with 5xx / 429 instead of handling it
+    error_rate_5xx: float = 0.0
+    error_rate_429: float = 0.0
+    # Probability of dropping the connection halfway through a chunk
+    drop_rate: float = 0.0
+    # Daily API quota in units (0 = unlimited); each videos.insert costs upload_cost
+    quota_units: int = 0
+    upload_cost: int = 1600
+    seed: Optional[int] = None
+
+
+@dataclass
+class UploadSession:
+    metadata: dict
+    total: Optional[int] = None
+    received: int = 0
+    data: bytearray = field(default_factory=bytearray)
+    video_id: Optional[str] = None
+
+
+@dataclass
+class MockServerStats:
+    requests: int = 0
+    sessions: int = 0
+    completed: int = 0
+    bytes_received: int = 0
+    injected_5xx: int = 0
+    injected_429: int = 0
+    dropped: int = 0
+    quota_used: int = 0
+    quota_rejected: int = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def log_message(self, format, *args):
+        return
+
+    def _send(self, status: int, body: Optional[dict] = None, headers: Optional[dict] = None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _inject_faults(self) -> bool:
+        mock = self.server.mock
+        config = mock.config
+        if config.latency_ms:
+            time.sleep(config.latency_ms / 1000)
+
+        with mock.lock:
+            mock.stats.requests += 1
+            roll = mock.random.random()
+        if roll < config.error_rate_5xx:
+            with mock.lock:
+                mock.stats.injected_5xx += 1
+            self._drain_body()
+            self._send(503, {"error": {"code": 503, "message": "Backend Error (injected)"}})
+            return True
+        if roll < config.error_rate_5xx + config.error_rate_429:
+            with mock.lock:
+                mock.stats.injected_429 += 1
+            self._drain_body()
+            self._send(429, {"error": {"code": 429, "message": "Rate Limit Exceeded (injected)"}})
+            return True
+        return False
+
+    def _drain_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+    def _read_body(self, length: int, session: Optional[UploadSession] = None) -> Optional[bytes]:
+        """
+        Read the request body honouring the bandwidth cap. Returns None if
+        the connection was dropped on purpose (the bytes read so far are
+        kept by the session, like the real service).
+        """
+        mock = self.server.mock
+        config = mock.config
+        with mock.lock:
+            drop_at = int(length * mock.random.uniform(0.1, 0.9)) if mock.random.random() < config.drop_rate else None
+
+        data = bytearray()
+        chunk = 64 * 1024
+        started = time.monotonic()
+        while len(data) < length:
+            want = min(chunk, length - len(data))
+            if drop_at is not None and len(data) + want > drop_at:
+                want = drop_at - len(data)
+                data.extend(self.rfile.read(want))
+                with mock.lock:
+                    mock.stats.dropped += 1
+                if session is not None:
+                    session.data.extend(data)
+                    session.received += len(data)
+                self.close_connection = True
+                self.connection.close()
+                return None
+
+            data.extend(self.rfile.read(want))
+            if config.bandwidth_mbps:
+                expected = len(data) * 8 / (config.bandwidth_mbps * 1_000_000)
+                delay = expected - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+        return bytes(data)
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        if parsed.path != UPLOAD_PATH or query.get("uploadType") != ["resumable"]:
+            self._drain_body()
+            self._send(404, {"error": {"code": 404, "message": "Only resumable videos.insert is mocked"}})
+            return
+        if self._inject_faults():
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        metadata = json.loads(self.rfile.read(length) or b"{}")
+        total = self.headers.get("X-Upload-Content-Length")
+
+        mock = self.server.mock
+        config = mock.config
+        with mock.lock:
+            over_quota = bool(config.quota_units) and mock.stats.quota_used + config.upload_cost > config.quota_units
+            if over_quota:
+                mock.stats.quota_rejected += 1
+            else:
+                mock.stats.quota_used += config.upload_cost
+        if over_quota:
+            self._send(403, {"error": {
+                "code": 403,
+                "message": "The request cannot be completed because you have exceeded your quota.",
+                "errors": [{"domain": "youtube.quota", "reason": "quotaExceeded"}],
+            }})
+            return
+
+        upload_id = uuid.uuid4().hex
+        with mock.lock:
+            mock.sessions[upload_id] = UploadSession(metadata=metadata, total=int(total) if total else None)
+            mock.stats.sessions += 1
+
+        location = f"{mock.base_url}{UPLOAD_PATH}?uploadType=resumable&upload_id={upload_id}"
+        self._send(200, headers={"Location": location})
+
+    def do_PUT(self):
+        parsed = urlparse(self.path)
+        upload_id = parse_qs(parsed.query).get("upload_id", [None])[0]
+        mock = self.server.mock
+        session = mock.sessions.get(upload_id)
+        if session is None:
+            self._drain_body()
+            self._send(404, {"error": {"code": 404, "message": "Unknown upload session"}})
+            return
+        if self._inject_faults():
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        match = CONTENT_RANGE.fullmatch(self.headers.get("Content-Range", f"bytes */{length}").strip())
+        if match is None:
+            self._drain_body()
+            self._send(400, {"error": {"code": 400, "message": "Bad Content-Range"}})
+            return
+
+        start, _end, total = match.groups()
+        if total != "*":
+            session.total = int(total)
+
+        if start is not None:
+            start = int(start)
+            if start > session.received:
+                # Gap: tell the client what we actually have
+                self._drain_body()
+                self._incomplete(session)
+                return
+            # Retransmission of bytes we already hold: keep the newer copy
+            del session.data[start:]
+            session.received = start
+            data = self._read_body(length, session)
+            if data is None:
+                return
+            session.data.extend(data)
+            session.received += len(data)
+            with mock.lock:
+                mock.stats.bytes_received += len(data)
+        else:
+            self._drain_body()
+
+        if session.total is not None and session.received >= session.total:
+            self._complete(session)
+        else:
+            self._incomplete(session)
+
+    def _incomplete(self, session: UploadSession):
+        headers = {"Range": f"bytes=0-{session.received - 1}"} if session.received else {}
+        self._send(308, headers=headers)
+
+    def _complete(self, session: UploadSession):
+        mock = self.server.mock
+        if session.video_id is None:
+            session.video_id = f"mock{uuid.uuid4().hex[:7]}"
+            with mock.lock:
+                mock.stats.completed += 1
+            if not mock.keep_data:
+                session.data = bytearray()
+        body = {
+            "kind": "youtube#video",
+            "id": session.video_id,
+            "snippet": session.metadata.get("snippet", {}),
+            "status": {**session.metadata.get("status", {}), "uploadStatus": "uploaded"},
+        }
+        self._send(200, body)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    mock: "MockYouTubeServer"
+
+
+class MockYouTubeServer:
+    """
+    Local stand-in for the YouTube Data API resumable ``videos.insert``
+    protocol, with configurable latency, bandwidth cap, injected 5xx/429
+    errors, mid-upload connection drops and a daily quota.
+
+    Usage::
+
+        with MockYouTubeServer(MockServerConfig(error_rate_5xx=0.05)) as server:
+            client = server.client()
+            YouTubeUploader(client, folder, logger).schedule_upload(...)
+    """
+
+    def __init__(self, config: Optional[MockServerConfig] = None, host: str = "127.0.0.1", port: int = 0,
+                 keep_data: bool = False):
+        """
+        :param config: Fault/latency injection settings
+        :param host: Interface to bind
+        :param port: Port to bind (0 = any free port)
+        :param keep_data: Keep uploaded bytes of completed sessions (for verification)
+        """
+        self.config = config or MockServerConfig()
+        self.random = random.Random(self.config.seed)
+        self.lock = threading.Lock()
+        self.sessions: dict[str, UploadSession] = {}
+        self.stats = MockServerStats()
+        self.keep_data = keep_data
+        self._server = _Server((host, port), _Handler)
+        self._server.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockYouTubeServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-youtube", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def client(self, timeout: float = 60.0):
+        """A googleapiclient YouTube client pointed at this server."""
+        # The media upload URL is derived from the discovery document's
+        # rootUrl (not api_endpoint), so rewrite it to plain http here
+        document = json.loads(get_static_doc("youtube", "v3"))
+        document["rootUrl"] = document["mtlsRootUrl"] = self.base_url + "/"
+        http = httplib2.Http(timeout=timeout)
+        # Resumable uploads answer 308 without Location; don't treat it as a redirect
+        http.redirect_codes = http.redirect_codes - {308}
+        return build_from_document(
+            document,
+            http=http,
+            developerKey="mock",
+        )
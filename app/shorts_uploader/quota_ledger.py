@@ -0,0 +1,246 @@
+import datetime
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from app.config.settings import settings
+from .scheduler import as_utc, utc_now
+
+RESERVED = "reserved"
+SPENT = "spent"
+# Recorded when the API reports the quota used up: fills the window's budget
+EXHAUSTED = "exhausted"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quota_usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project TEXT NOT NULL,
+    quota_day TEXT NOT NULL,
+    units INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT,
+    item_id INTEGER,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_quota_usage_window ON quota_usage (project, quota_day, status);
+CREATE TABLE IF NOT EXISTS quota_deferrals (
+    project TEXT NOT NULL,
+    item_id INTEGER NOT NULL,
+    priority TEXT NOT NULL,
+    deferred_at TEXT NOT NULL,
+    PRIMARY KEY (project, item_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_quota_deferrals_priority ON quota_deferrals (project, priority);
+"""
+
+# Fixed-width UTC format so timestamps sort lexicographically
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S+00:00"
+
+
+def _key(dt: datetime.datetime) -> str:
+    return as_utc(dt).strftime(TIME_FORMAT)
+
+
+class QuotaLedger:
+    """
+    Persistent YouTube Data API quota ledger per Google Cloud project.
+
+    Units are reserved before a request is made and settled afterwards,
+    all inside ``BEGIN IMMEDIATE`` transactions, so concurrent uploader
+    processes sharing the ledger never admit more than the daily budget
+    between them. Windows are quota days that start at ``quota_reset_time``
+    in ``quota_timezone`` (midnight Pacific time for YouTube). Items that
+    could not be admitted are recorded as deferrals, ordered by the
+    publish time they would have taken, so the next window uploads them
+    first.
+    """
+
+    def __init__(self, logger, project: Optional[str] = None, config=None):
+        """
+        :param logger: Application logger instance
+        :param project: Google Cloud project whose quota is tracked
+        :param config: YouTube settings (defaults to ``settings.youtube``)
+        """
+        self.config = config or settings.youtube
+        self.project = project or self.config.quota_project
+        self.budget = self.config.quota_daily_units
+        self.tz = ZoneInfo(self.config.quota_timezone)
+        self.logger = logger
+        self.db_file = Path(self.config.quota_ledger_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    # ---------------------------------------------------------------
+    # Windows
+    # ---------------------------------------------------------------
+    def _window_start(self, now: Optional[datetime.datetime] = None) -> datetime.datetime:
+        local = as_utc(now or utc_now()).astimezone(self.tz)
+        start = datetime.datetime.combine(local.date(), self.config.quota_reset_time, tzinfo=self.tz)
+        if start > local:
+            start = datetime.datetime.combine(
+                local.date() - datetime.timedelta(days=1), self.config.quota_reset_time, tzinfo=self.tz
+            )
+        return start
+
+    def window(self, now: Optional[datetime.datetime] = None) -> str:
+        """Quota day ``now`` falls in, as the local date it started on."""
+        return self._window_start(now).date().isoformat()
+
+    def next_reset(self, now: Optional[datetime.datetime] = None) -> datetime.datetime:
+        """UTC time the current window ends and the budget is available again."""
+        start = self._window_start(now)
+        # Combine on the next local date so the reset stays at wall-clock time across DST
+        following = datetime.datetime.combine(
+            start.date() + datetime.timedelta(days=1), self.config.quota_reset_time, tzinfo=self.tz
+        )
+        return following.astimezone(datetime.timezone.utc)
+
+    # ---------------------------------------------------------------
+    # Budget
+    # ---------------------------------------------------------------
+    def _expire_stale(self, conn):
+        # A crashed uploader may have reached the API: count its units as spent
+        cutoff = utc_now() - datetime.timedelta(hours=self.config.quota_reservation_ttl_hours)
+        cursor = conn.execute(
+            "UPDATE quota_usage SET status = ? WHERE project = ? AND status = ? AND created_at < ?",
+            (SPENT, self.project, RESERVED, _key(cutoff)),
+        )
+        if cursor.rowcount:
+            self.logger.warning(
+                f"Settled {cursor.rowcount} stale quota reservations of project '{self.project}' as spent."
+            )
+
+    def _used(self, conn, window: str) -> int:
+        row = conn.execute(
+            "SELECT COALESCE(SUM(units), 0) AS used FROM quota_usage WHERE project = ? AND quota_day = ?",
+            (self.project, window),
+        ).fetchone()
+        return row["used"]
+
+    def used(self) -> int:
+        """Units reserved or spent in the current window."""
+        with self._connect() as conn:
+            return self._used(conn, self.window())
+
+    def remaining(self) -> int:
+        return max(0, self.budget - self.used())
+
+    def admit(self, units: int, owner: str, item_id: Optional[int] = None) -> Optional[int]:
+        """
+        Reserve ``units`` of the current window's budget if they fit.
+
+        :return: Reservation id to ``spend`` or ``release``, or None if the
+            budget is used up until ``next_reset``
+        """
+        window = self.window()
+        with self._transaction() as conn:
+            self._expire_stale(conn)
+            if self._used(conn, window) + units > self.budget:
+                return None
+            cursor = conn.execute(
+                """
+                INSERT INTO quota_usage (project, quota_day, units, status, owner, item_id, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (self.project, window, units, RESERVED, owner, item_id, _key(utc_now())),
+            )
+            return cursor.lastrowid
+
+    def spend(self, reservation: int) -> bool:
+        """The request was made: its units are gone for this window."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE quota_usage SET status = ? WHERE id = ? AND status = ?", (SPENT, reservation, RESERVED)
+            )
+            return cursor.rowcount == 1
+
+    def release(self, reservation: int) -> bool:
+        """The request was never made (or was refused for quota): return its units."""
+        with self._transaction() as conn:
+            cursor = conn.execute("DELETE FROM quota_usage WHERE id = ? AND status = ?", (reservation, RESERVED))
+            return cursor.rowcount == 1
+
+    def exhaust(self, owner: str) -> int:
+        """
+        The API reported the quota as exceeded (e.g. it is shared with
+        other tools): mark the rest of the window's budget as used so no
+        process admits another request before the reset.
+
+        :return: Units that were still unaccounted for
+        """
+        window = self.window()
+        with self._transaction() as conn:
+            missing = max(0, self.budget - self._used(conn, window))
+            if missing:
+                conn.execute(
+                    """
+                    INSERT INTO quota_usage (project, quota_day, units, status, owner, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (self.project, window, missing, EXHAUSTED, owner, _key(utc_now())),
+                )
+        self.logger.warning(
+            f"API quota of project '{self.project}' exhausted ({missing} units unaccounted for), "
+            f"next window at {self.next_reset().isoformat()}."
+        )
+        return missing
+
+    # ---------------------------------------------------------------
+    # Deferrals
+    # ---------------------------------------------------------------
+    def defer(self, items: list[tuple[int, datetime.datetime]]):
+        """
+        Record items that must wait for the next window.
+
+        :param items: (item id, publish time it would have taken); an item
+            deferred again keeps its earlier priority
+        """
+        now_key = _key(utc_now())
+        with self._transaction() as conn:
+            for item_id, priority in items:
+                conn.execute(
+                    """
+                    INSERT INTO quota_deferrals (project, item_id, priority, deferred_at) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (project, item_id) DO UPDATE SET priority = MIN(priority, excluded.priority)
+                    """,
+                    (self.project, item_id, _key(priority), now_key),
+                )
+
+    def deferred(self) -> list[int]:
+        """Deferred item ids, earliest publish priority first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT item_id FROM quota_deferrals WHERE project = ? ORDER BY priority, item_id", (self.project,)
+            )
+            return [row["item_id"] for row in rows]
+
+    def clear_deferral(self, item_id: int) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM quota_deferrals WHERE project = ? AND item_id = ?", (self.project, item_id)
+            )
+            return cursor.rowcount == 1
@@ -1,30 +1,63 @@
 import datetime
+from typing import Iterator, Optional
+from zoneinfo import ZoneInfo
 from app.config.settings import settings
 
-PUBLISH_TIMES_SRI_LANKA = settings.youtube.publish_times_sri_lanka
-TIMEZONE_OFFSET = settings.youtube.timezone_offset
+PUBLISH_TIMES = settings.youtube.publish_times
+PUBLISH_TIMEZONE = ZoneInfo(settings.youtube.timezone)
+
+
+def utc_now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def as_utc(dt: datetime.datetime) -> datetime.datetime:
+    """Treat naive datetimes as UTC (legacy files) and convert aware ones."""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.astimezone(datetime.timezone.utc)
+
+
+def iter_publish_slots(
+    start_utc: datetime.datetime,
+    publish_times: Optional[list] = None,
+    tz: Optional[ZoneInfo] = None,
+    horizon_days: int = settings.youtube.slot_horizon_days,
+) -> Iterator[datetime.datetime]:
+    """
+    Yield publish slots (tz-aware UTC) at or after ``start_utc``, in order.
+    Daily local times are resolved in ``tz`` so DST changes are respected.
+    """
+    publish_times = sorted(publish_times or PUBLISH_TIMES)
+    tz = tz or PUBLISH_TIMEZONE
+    start_utc = as_utc(start_utc)
+    day = start_utc.astimezone(tz).date()
+
+    for _ in range(horizon_days):
+        for t in publish_times:
+            slot = datetime.datetime.combine(day, t, tzinfo=tz).astimezone(datetime.timezone.utc)
+            if slot >= start_utc:
+                yield slot
+        day += datetime.timedelta(days=1)
+
 
 def get_next_publish_datetimes(video_count, last_time_utc=None):
     """
     Generate a list of next publish datetimes (UTC) for the given number of videos.
     Distribute videos over scheduled times across days if needed.
     """
-    now_utc = datetime.datetime.utcnow()
+    now_utc = utc_now()
     if last_time_utc:
         # Start from next day after last upload
-        start_day = (last_time_utc + datetime.timedelta(hours=TIMEZONE_OFFSET)).date() + datetime.timedelta(days=1)
+        next_day = as_utc(last_time_utc).astimezone(PUBLISH_TIMEZONE).date() + datetime.timedelta(days=1)
+        start = max(now_utc, datetime.datetime.combine(next_day, datetime.time(0, 0), tzinfo=PUBLISH_TIMEZONE))
     else:
-        start_day = (now_utc + datetime.timedelta(hours=TIMEZONE_OFFSET)).date()
+        start = now_utc
 
     schedule = []
-    day = start_day
-    while len(schedule) < video_count:
-        for t in PUBLISH_TIMES_SRI_LANKA:
-            dt_slt = datetime.datetime.combine(day, t)
-            dt_utc = dt_slt - datetime.timedelta(hours=TIMEZONE_OFFSET)
-            if dt_utc > now_utc:
-                schedule.append(dt_utc)
-            if len(schedule) >= video_count:
-                break
-        day += datetime.timedelta(days=1)
+    for slot in iter_publish_slots(start):
+        if slot > now_utc:
+            schedule.append(slot)
+        if len(schedule) >= video_count:
+            break
     return schedule
@@ -0,0 +1,200 @@
+import datetime
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from app.config.settings import settings
+from .scheduler import iter_publish_slots, as_utc, utc_now
+
+RESERVED = "reserved"
+PUBLISHED = "published"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS publish_slots (
+    channel TEXT NOT NULL,
+    slot_utc TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT,
+    item_id INTEGER,
+    reserved_at TEXT NOT NULL,
+    PRIMARY KEY (channel, slot_utc)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_publish_slots_stale ON publish_slots (status, reserved_at);
+"""
+
+# Fixed-width UTC format so slots sort lexicographically in the index
+SLOT_FORMAT = "%Y-%m-%dT%H:%M:%S+00:00"
+
+
+def _key(slot: datetime.datetime) -> str:
+    return as_utc(slot).strftime(SLOT_FORMAT)
+
+
+class PublishSlotLedger:
+    """
+    Persistent ledger of publish slots per channel.
+
+    Every reserved or published slot is a row keyed by (channel, slot), so
+    "next N free slots" is an index seek to ``now`` followed by a merge of
+    the configured daily slot grid against the reserved rows: O(log n) to
+    locate the start plus the slots actually walked, independent of how
+    many months of history the ledger holds. Released slots (failed
+    uploads) become free again and are backfilled first.
+    """
+
+    def __init__(self, logger, channel: Optional[str] = None, config=None):
+        """
+        :param logger: Application logger instance
+        :param channel: Channel whose slots are managed
+        :param config: YouTube settings (defaults to ``settings.youtube``)
+        """
+        self.config = config or settings.youtube
+        self.channel = channel or self.config.channel
+        self.tz = ZoneInfo(self.config.timezone)
+        self.logger = logger
+        self.db_file = Path(self.config.slot_ledger_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _earliest_start(self, not_before: Optional[datetime.datetime] = None) -> datetime.datetime:
+        start = utc_now() + datetime.timedelta(minutes=self.config.min_lead_minutes)
+        if not_before is not None:
+            start = max(start, as_utc(not_before))
+        return start
+
+    def _free_slots(self, conn, count: int, start: datetime.datetime) -> list[datetime.datetime]:
+        taken = conn.execute(
+            "SELECT slot_utc FROM publish_slots WHERE channel = ? AND slot_utc >= ? ORDER BY slot_utc",
+            (self.channel, _key(start)),
+        )
+        next_taken = next(taken, None)
+
+        free = []
+        for slot in iter_publish_slots(start, self.config.publish_times, self.tz, self.config.slot_horizon_days):
+            key = _key(slot)
+            # Advance the reserved-slot cursor up to the current candidate
+            while next_taken is not None and next_taken["slot_utc"] < key:
+                next_taken = next(taken, None)
+            if next_taken is not None and next_taken["slot_utc"] == key:
+                continue
+            free.append(slot)
+            if len(free) >= count:
+                break
+        return free
+
+    def _expire_stale(self, conn):
+        cutoff = utc_now() - datetime.timedelta(hours=self.config.reservation_ttl_hours)
+        cursor = conn.execute(
+            "DELETE FROM publish_slots WHERE channel = ? AND status = ? AND reserved_at < ?",
+            (self.channel, RESERVED, _key(cutoff)),
+        )
+        if cursor.rowcount:
+            self.logger.warning(f"Released {cursor.rowcount} stale slot reservations for channel '{self.channel}'.")
+
+    def next_free_slots(self, count: int, not_before: Optional[datetime.datetime] = None) -> list[datetime.datetime]:
+        """Return (without reserving) the next ``count`` free slots."""
+        with self._connect() as conn:
+            return self._free_slots(conn, count, self._earliest_start(not_before))
+
+    def reserve(
+        self,
+        count: int,
+        owner: str,
+        item_ids: Optional[list[int]] = None,
+        not_before: Optional[datetime.datetime] = None,
+    ) -> list[datetime.datetime]:
+        """
+        Atomically reserve the next ``count`` free slots for ``owner``.
+        Concurrent uploaders never receive the same slot.
+        """
+        now_key = _key(utc_now())
+        with self._transaction() as conn:
+            self._expire_stale(conn)
+            slots = self._free_slots(conn, count, self._earliest_start(not_before))
+            for i, slot in enumerate(slots):
+                conn.execute(
+                    """
+                    INSERT INTO publish_slots (channel, slot_utc, status, owner, item_id, reserved_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (self.channel, _key(slot), RESERVED, owner, item_ids[i] if item_ids else None, now_key),
+                )
+
+        if len(slots) < count:
+            self.logger.warning(
+                f"Only {len(slots)}/{count} free slots within {self.config.slot_horizon_days} days."
+            )
+        return slots
+
+    def confirm(self, slot: datetime.datetime, item_id: Optional[int] = None) -> bool:
+        """Mark a reserved slot as published (permanently taken)."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE publish_slots SET status = ?, item_id = COALESCE(?, item_id) WHERE channel = ? AND slot_utc = ?",
+                (PUBLISHED, item_id, self.channel, _key(slot)),
+            )
+            return cursor.rowcount == 1
+
+    def release(self, slot: datetime.datetime) -> bool:
+        """Free a reserved slot so the next reservation backfills it."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM publish_slots WHERE channel = ? AND slot_utc = ? AND status = ?",
+                (self.channel, _key(slot), RESERVED),
+            )
+            return cursor.rowcount == 1
+
+    def is_empty(self) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT 1 FROM publish_slots WHERE channel = ? LIMIT 1", (self.channel,)).fetchone()
+        return row is None
+
+    def import_last_upload_time(self, last_time: Optional[datetime.datetime]) -> int:
+        """
+        Seed an empty ledger from the legacy ``last_upload_time.txt``: the
+        old scheduler may have used any slot up to that time, so all future
+        slots up to and including it are recorded as published.
+        """
+        if last_time is None or not self.is_empty():
+            return 0
+
+        last_key = _key(last_time)
+        now_key = _key(utc_now())
+        imported = 0
+        with self._transaction() as conn:
+            for slot in iter_publish_slots(utc_now(), self.config.publish_times, self.tz, self.config.slot_horizon_days):
+                key = _key(slot)
+                if key > last_key:
+                    break
+                conn.execute(
+                    "INSERT OR IGNORE INTO publish_slots (channel, slot_utc, status, reserved_at) VALUES (?, ?, ?, ?)",
+                    (self.channel, key, PUBLISHED, now_key),
+                )
+                imported += 1
+
+        self.logger.info(f"Seeded slot ledger with {imported} slots up to {last_time.isoformat()}.")
+        return imported
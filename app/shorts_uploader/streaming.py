@@ -0,0 +1,184 @@
+import json
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from googleapiclient.http import MediaUpload
+
+# Non-final chunks of a resumable upload must be multiples of this
+CHUNK_GRANULARITY = 256 * 1024
+
+
+class EncodeAborted(Exception):
+    """The reel being uploaded while it encodes will not be completed."""
+
+
+class FragmentTail:
+    """
+    Follows a fragmented MP4 while it is written and reports how many
+    leading bytes form complete top-level boxes. Fragmented output only
+    ever grows, so those bytes are final.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.complete = 0
+        self._file = None
+
+    def open(self) -> bool:
+        if self._file is None:
+            try:
+                # Kept open: the finished file is renamed into place under us
+                self._file = open(self.path, "rb")
+            except FileNotFoundError:
+                return False
+        return True
+
+    def poll(self) -> int:
+        """Advance over the boxes written since the last poll."""
+        if not self.open():
+            return self.complete
+        size = self.size()
+        while self.complete + 8 <= size:
+            self._file.seek(self.complete)
+            header = self._file.read(16)
+            box_size = struct.unpack(">I", header[:4])[0]
+            if box_size == 1:
+                if len(header) < 16:
+                    break
+                box_size = struct.unpack(">Q", header[8:16])[0]
+            if box_size < 8 or self.complete + box_size > size:
+                # Size 0 (box runs to the end) or still being written
+                break
+            self.complete += box_size
+        return self.complete
+
+    def size(self) -> int:
+        self._file.seek(0, 2)
+        return self._file.tell()
+
+    def read(self, begin: int, length: int) -> bytes:
+        self._file.seek(begin)
+        return self._file.read(length)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class GrowingFileUpload(MediaUpload):
+    """
+    Resumable media body for a reel that is still being encoded.
+
+    Chunks are handed out only once they consist of complete MP4 boxes,
+    and the total size stays unknown (``bytes a-b/*``) until ``finish``
+    is called after the encode; ``abort`` fails the upload instead.
+    """
+
+    def __init__(self, path: Path, chunksize: int, poll_interval: float = 0.2, stall_timeout: float = 300.0):
+        """
+        :param path: File the encoder writes
+        :param chunksize: Bytes per request (rounded up to a multiple of 256 KiB)
+        :param poll_interval: Seconds between checks for newly written fragments
+        :param stall_timeout: Give up if the file does not grow for this long
+        """
+        super().__init__()
+        self.tail = FragmentTail(path)
+        self._chunksize = max(CHUNK_GRANULARITY, -(-chunksize // CHUNK_GRANULARITY) * CHUNK_GRANULARITY)
+        self.poll_interval = poll_interval
+        self.stall_timeout = stall_timeout
+        self._total: Optional[int] = None
+        self._error: Optional[str] = None
+        self._done = threading.Event()
+        # End of the last chunk handed out (where the next request starts)
+        self._offset = 0
+
+    def finish(self, path: Optional[Path] = None):
+        """
+        The encode completed; the remaining bytes form the final chunk.
+
+        :param path: Where the finished file now lives, if it was renamed
+            before the upload opened it
+        """
+        if path is not None and not self.tail.open():
+            self.tail.path = Path(path)
+            self.tail.open()
+        self._total = self.tail.size()
+        self._done.set()
+
+    def abort(self, error: str):
+        self._error = error
+        self._done.set()
+
+    def close(self):
+        self.tail.close()
+
+    # MediaUpload interface
+    def chunksize(self) -> int:
+        return self._chunksize
+
+    def mimetype(self) -> str:
+        return "video/mp4"
+
+    def size(self) -> Optional[int]:
+        # Read before every request to choose between "bytes a-b/*" and the
+        # real total: wait until the next chunk can go out with a byte to
+        # spare, or the total is known, so a "/*" chunk is never the last one
+        self._wait_for(self._offset + self._chunksize + 1)
+        return self._total
+
+    def resumable(self) -> bool:
+        return True
+
+    def has_stream(self) -> bool:
+        return False
+
+    def _wait_for(self, end: int):
+        """Block until ``end`` bytes of complete boxes exist or the total is known."""
+        last_growth, available = time.monotonic(), -1
+        while True:
+            if self._error:
+                raise EncodeAborted(self._error)
+            if self._total is not None:
+                return
+            complete = self.tail.poll()
+            if complete >= end:
+                return
+            if complete != available:
+                last_growth, available = time.monotonic(), complete
+            elif time.monotonic() - last_growth > self.stall_timeout:
+                raise EncodeAborted(f"no new fragments for {self.stall_timeout:.0f}s")
+            self._done.wait(self.poll_interval)
+
+    def getbytes(self, begin: int, length: int) -> bytes:
+        # Keep at least one byte back while the total is unknown, so the last
+        # chunk is always short and sent with the total size
+        self._wait_for(begin + length + 1)
+        if self._total is not None:
+            length = min(length, self._total - begin)
+        data = self.tail.read(begin, length)
+        self._offset = begin + len(data)
+        return data
+
+    def to_json(self) -> str:
+        """
+        Serialise the upload's parameters. A restored upload follows the file
+        from the start again, and ``finish`` must still be called on it.
+        """
+        return json.dumps({
+            "_class": type(self).__name__,
+            "_module": type(self).__module__,
+            "path": str(self.tail.path),
+            "chunksize": self._chunksize,
+            "mimetype": self.mimetype(),
+            "poll_interval": self.poll_interval,
+            "stall_timeout": self.stall_timeout,
+        })
+
+    @staticmethod
+    def from_json(s: str) -> "GrowingFileUpload":
+        d = json.loads(s)
+        return GrowingFileUpload(Path(d["path"]), d["chunksize"], d["poll_interval"], d["stall_timeout"])
@@ -1,12 +1,31 @@
 import os
 import datetime
+import random
+import time
 from pathlib import Path
 from typing import Optional, List
 
-from googleapiclient.http import MediaFileUpload
+from googleapiclient.http import MediaFileUpload, MediaUpload
 from googleapiclient.errors import HttpError
+import httplib2
 import logging
 
+from app.config.settings import settings
+from .streaming import EncodeAborted
+
+# Statuses worth retrying; anything else (quota, auth, bad metadata) is final
+RETRIABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRIABLE_EXCEPTIONS = (httplib2.HttpLib2Error, OSError)
+# 403 reasons meaning the project's daily API quota is used up
+QUOTA_REASONS = ("quotaExceeded", "dailyLimitExceeded")
+
+
+def is_quota_error(error: HttpError) -> bool:
+    if error.resp.status != 403:
+        return False
+    content = error.content.decode("utf-8", "replace") if isinstance(error.content, bytes) else str(error.content)
+    return any(reason in content for reason in QUOTA_REASONS)
+
 
 class YouTubeUploader:
     """
@@ -18,10 +37,52 @@ class YouTubeUploader:
         youtube_client,
         video_folder: Path,
         logger: logging.Logger,
+        chunk_size: int = settings.youtube.upload_chunk_size,
+        num_retries: int = settings.youtube.upload_num_retries,
+        retry_backoff: float = settings.youtube.upload_retry_backoff,
     ):
         self.youtube = youtube_client
         self.video_folder = Path(video_folder)
         self.logger = logger
+        self.chunk_size = chunk_size
+        self.num_retries = num_retries
+        self.retry_backoff = retry_backoff
+        self.retries = 0
+        # Set when the last upload was refused because the API quota is used up
+        self.quota_exceeded = False
+
+    def _next_chunk(self, request, video_file: str):
+        """
+        Send the next chunk, retrying transient failures.
+
+        ``next_chunk(num_retries=...)`` re-sends an already consumed file
+        slice on retry, so the retry loop lives here instead: after a failed
+        chunk the request is in its error state and the next call first asks
+        the server how many bytes it holds, then resumes from there.
+        """
+        for attempt in range(self.num_retries + 1):
+            try:
+                return request.next_chunk()
+            except HttpError as e:
+                if e.resp.status not in RETRIABLE_STATUS_CODES or attempt == self.num_retries:
+                    raise
+                reason = f"status {e.resp.status}"
+            except RETRIABLE_EXCEPTIONS as e:
+                if attempt == self.num_retries:
+                    raise
+                reason = repr(e)
+
+            self.retries += 1
+            delay = self.retry_backoff * (2 ** attempt) * random.uniform(0.5, 1.0)
+            self.logger.warning(
+                "Retrying upload of %s in %.2fs (attempt %d/%d, %s)",
+                video_file,
+                delay,
+                attempt + 1,
+                self.num_retries,
+                reason,
+            )
+            time.sleep(delay)
 
     def schedule_upload(
         self,
@@ -30,13 +91,19 @@ class YouTubeUploader:
         description: str,
         publish_time: datetime.datetime,
         tags: Optional[List[str]] = None,
+        media: Optional[MediaUpload] = None,
     ):
         """
         Schedule a video upload at a given UTC datetime.
+
+        :param media: Media body to send instead of the finished file (e.g. a
+            ``GrowingFileUpload`` of a reel that is still encoding)
         """
         tags = tags or []
+        self.quota_exceeded = False
 
-        if publish_time <= datetime.datetime.utcnow():
+        publish_time = publish_time.astimezone(datetime.timezone.utc)
+        if publish_time <= datetime.datetime.now(datetime.timezone.utc):
             self.logger.warning(
                 "Skipping upload for %s: publish time %s is in the past",
                 video_file,
@@ -61,18 +128,19 @@ class YouTubeUploader:
         }
 
         full_video_path = self.video_folder / video_file
-        if not full_video_path.exists():
+        if media is None and not full_video_path.exists():
             self.logger.error("Video file not found: %s", full_video_path)
             return None
 
         try:
             self.logger.info("Starting upload: %s", video_file)
 
-            media = MediaFileUpload(
-                str(full_video_path),
-                chunksize=-1,
-                resumable=True,
-            )
+            if media is None:
+                media = MediaFileUpload(
+                    str(full_video_path),
+                    chunksize=self.chunk_size,
+                    resumable=True,
+                )
 
             request = self.youtube.videos().insert(
                 part="snippet,status",
@@ -82,7 +150,7 @@ class YouTubeUploader:
 
             response = None
             while response is None:
-                status, response = request.next_chunk()
+                status, response = self._next_chunk(request, video_file)
                 if status:
                     self.logger.info(
                         "Upload progress for %s: %d%%",
@@ -98,6 +166,7 @@ class YouTubeUploader:
             return response
 
         except HttpError as e:
+            self.quota_exceeded = is_quota_error(e)
             self.logger.error(
                 "YouTube API error while uploading %s (status %s): %s",
                 video_file,
@@ -106,6 +175,10 @@ class YouTubeUploader:
             )
             return None
 
+        except EncodeAborted as e:
+            self.logger.warning("Upload of %s abandoned: %s", video_file, e)
+            return None
+
         except Exception:
             self.logger.exception(
                 "Unexpected error occurred while uploading %s",
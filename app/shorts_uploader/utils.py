@@ -10,18 +10,18 @@ SCOPES = settings.youtube.scopes
 CLIENT_SECRETS_FILE = settings.youtube.client_secrets_file
 TOKEN_FILE = settings.youtube.token_file
 
-def get_authenticated_service():
+def get_authenticated_service(token_file=TOKEN_FILE, client_secrets_file=CLIENT_SECRETS_FILE, scopes=SCOPES):
     """Authenticate and return a YouTube API client."""
     creds = None
-    if TOKEN_FILE.exists():
-        with open(TOKEN_FILE, "rb") as token:
+    if token_file.exists():
+        with open(token_file, "rb") as token:
             creds = pickle.load(token)
     if not creds or not creds.valid:
-        if not CLIENT_SECRETS_FILE.exists():
-            raise FileNotFoundError(f"Client secrets not found at {CLIENT_SECRETS_FILE}")
-        flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRETS_FILE, SCOPES)
+        if not client_secrets_file.exists():
+            raise FileNotFoundError(f"Client secrets not found at {client_secrets_file}")
+        flow = InstalledAppFlow.from_client_secrets_file(client_secrets_file, scopes)
         creds = flow.run_local_server(port=0)
-        with open(TOKEN_FILE, "wb") as token:
+        with open(token_file, "wb") as token:
             pickle.dump(creds, token)
     return build("youtube", "v3", credentials=creds)
 
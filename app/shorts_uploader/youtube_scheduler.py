@@ -1,16 +1,24 @@
-import json
+import os
+import datetime
+import time
+import socket
 import shutil
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Callable, List, Optional
 
 from app.config.settings import settings
+from app.media.verify import ReelVerifier
+from app.storage.catalog import ContentCatalog, RENDERED, UPLOADED, FAILED
+from app.utils.logger import log_context
 from .utils import (
     get_authenticated_service,
     read_last_upload_time,
-    save_last_upload_time,
 )
-from .scheduler import get_next_publish_datetimes
+from .quota_ledger import QuotaLedger
+from .slot_ledger import PublishSlotLedger
+from .streaming import GrowingFileUpload
 from .uploader import YouTubeUploader
 
 
@@ -23,14 +31,24 @@ class YouTubeScheduler:
     def __init__(
         self,
         logger = None,
-        content_file: Path = settings.files.motivational_output,
+        content_file: Path = None,
+        app_settings = settings,
     ):
-        self.content_file = content_file
-        self.video_folder = settings.youtube.video_folder
-        self.uploaded_reels_path = settings.youtube.uploaded_reels_path
-        self.last_upload_file = settings.data_dir / "last_upload_time.txt"
+        self.settings = app_settings
+        self.config = app_settings.youtube
+        self.content_file = content_file or app_settings.files.motivational_output
+        self.video_folder = self.config.video_folder
+        self.uploaded_reels_path = self.config.uploaded_reels_path
+        self.last_upload_file = self.config.last_upload_file
+        self.channel = app_settings.catalog.channel
+        self.owner = f"{socket.gethostname()}-{os.getpid()}"
         self.youtube_client = None
         self.videos: List[dict] = []
+        self.catalog = ContentCatalog(logger, app_settings.catalog)
+        self.ledger = PublishSlotLedger(logger, channel=self.config.channel, config=self.config)
+        self.quota = QuotaLedger(logger, config=self.config)
+        self.quota_blocked = False
+        self.verifier = ReelVerifier(logger, app_settings.verify, app_settings.video) if app_settings.verify.enabled else None
 
         # Logger fallback
         self.logger = logger
@@ -40,22 +58,25 @@ class YouTubeScheduler:
 
     # Core workflow steps
     def load_videos(self):
-        if not self.content_file.exists():
-            self.logger.error("Content file not found: %s", self.content_file)
-            raise FileNotFoundError(f"Content file not found: {self.content_file}")
-
-        with open(self.content_file, "r", encoding="utf-8") as f:
-            self.videos = json.load(f)
+        self.videos = self.catalog.items_in_state(RENDERED, channel=self.channel)
 
         if not self.videos:
-            self.logger.error("No videos found in content file.")
+            self.logger.error("No rendered videos found in the content catalog.")
             raise ValueError("No videos found to upload.")
 
+        # Reels deferred for quota go first, in the order of the publish times they were due
+        deferred = {item_id: rank for rank, item_id in enumerate(self.quota.deferred())}
+        self.videos.sort(key=lambda v: (v["id"] not in deferred, deferred.get(v["id"], 0), v["id"]))
+
         self.logger.info("Loaded %d videos for scheduling.", len(self.videos))
 
     def authenticate(self):
         self.logger.info("Authenticating YouTube client...")
-        self.youtube_client = get_authenticated_service()
+        self.youtube_client = get_authenticated_service(
+            token_file=self.config.token_file,
+            client_secrets_file=self.config.client_secrets_file,
+            scopes=self.config.scopes,
+        )
         self.logger.info("YouTube authentication successful.")
 
     def schedule_all_uploads(self):
@@ -64,67 +85,304 @@ class YouTubeScheduler:
             raise RuntimeError("YouTube client not authenticated.")
 
         uploader = YouTubeUploader(self.youtube_client, self.video_folder, logger=self.logger)
-        last_upload_time = read_last_upload_time(self.last_upload_file)
+        self.ledger.import_last_upload_time(read_last_upload_time(self.last_upload_file))
 
-        publish_schedule: List = get_next_publish_datetimes(
-            len(self.videos), last_upload_time
+        self.logger.info(
+            "Scheduling %d videos, %d of %d API quota units left in project '%s'.",
+            len(self.videos),
+            self.quota.remaining(),
+            self.quota.budget,
+            self.quota.project,
         )
 
-        self.logger.info("Scheduling %d videos.", len(self.videos))
-
         for i, video_info in enumerate(self.videos):
-            video_file = f"reel_{video_info.get('id')}.mp4"
-            full_path = self.video_folder / video_file
+            if self.schedule_video(uploader, video_info, i) is None:
+                if self.quota_blocked:
+                    self.defer_uploads(self.videos[i:])
+                break
 
-            if not full_path.exists():
-                self.logger.warning("Skipping missing file: %s", video_file)
-                continue
+    def schedule_video(self, uploader: YouTubeUploader, video_info: dict, index: int = 0) -> Optional[str]:
+        """
+        Reserve a publish slot for one catalog item and upload it.
 
-            title = video_info.get("video_title", f"My Reel {i + 1}")
-            description = (
-                f"{title}\n\n"
-                f"{video_info.get('youtube_description', '')}\n\n"
-                f"{', '.join(video_info.get('video_tags', []))}"
-            )
+        :return: Resulting catalog state, or None if no publish slot is free
+        """
+        with log_context(reel_id=video_info["id"], stage="upload"):
+            return self._schedule_video(uploader, video_info, index)
 
-            tags = settings.youtube.default_tags + video_info.get("video_tags", [])
+    def _metadata(self, video_info: dict, index: int) -> tuple[str, str, list[str]]:
+        # Catalog rows carry explicit NULLs, so fall back on any empty value
+        title = video_info.get("video_title") or f"My Reel {index + 1}"
+        video_tags = video_info.get("video_tags") or []
+        description = (
+            f"{title}\n\n"
+            f"{video_info.get('youtube_description') or ''}\n\n"
+            f"{', '.join(video_tags)}"
+        )
+        tags = self.config.default_tags + video_tags
+        return title, description, tags
 
-            self.logger.info(
-                "Scheduling video '%s' at %s",
-                video_file,
-                publish_schedule[i],
+    # Quota admission
+    def _admit(self, item_id: int, name: str) -> Optional[int]:
+        """Reserve the quota of one upload; None if it has to wait for the next window."""
+        self.quota_blocked = False
+        reservation = self.quota.admit(self.config.quota_upload_cost, self.owner, item_id)
+        if reservation is None:
+            self.quota_blocked = True
+            self.logger.warning(
+                "API quota of project '%s' used up (%d/%d units), deferring '%s' until %s.",
+                self.quota.project,
+                self.quota.used(),
+                self.quota.budget,
+                name,
+                self.quota.next_reset().isoformat(),
             )
+        return reservation
 
-            uploader.schedule_upload(
-                video_file,
-                title,
-                description,
-                publish_schedule[i],
-                tags,
-            )
+    def _settle(self, uploader: YouTubeUploader, reservation: int):
+        if uploader.quota_exceeded:
+            # Refused requests are not charged, but nothing more fits in this window
+            self.quota.release(reservation)
+            self.quota.exhaust(self.owner)
+            self.quota_blocked = True
+        else:
+            self.quota.spend(reservation)
+
+    def defer_uploads(self, videos: list[dict]):
+        """
+        Record reels that have to wait for the next quota window, with the
+        publish slots they would have taken as their priority.
+        """
+        slots = self.ledger.next_free_slots(len(videos))
+        if len(slots) < len(videos):
+            # Past the slot horizon: keep the order after the last known slot
+            last = slots[-1] if slots else self.quota.next_reset()
+            slots += [last] * (len(videos) - len(slots))
+        self.quota.defer([(video["id"], slot) for video, slot in zip(videos, slots)])
+        self.logger.info(
+            "Deferred %d reels to the quota window starting %s.",
+            len(videos),
+            self.quota.next_reset().isoformat(),
+        )
+
+    def _release(self, reservation: Optional[int], publish_time: Optional[datetime.datetime]):
+        if reservation is not None:
+            self.quota.release(reservation)
+        if publish_time is not None:
+            self.ledger.release(publish_time)
+
+    def _schedule_video(
+        self,
+        uploader: YouTubeUploader,
+        video_info: dict,
+        index: int,
+        reservation: Optional[int] = None,
+        publish_time: Optional[datetime.datetime] = None,
+    ) -> Optional[str]:
+        """
+        :param reservation: Quota reservation already held for this reel (None = admit it now)
+        :param publish_time: Publish slot already reserved for this reel (None = reserve one now)
+        """
+        full_path = Path(video_info["video_path"])
+        video_file = full_path.name
+
+        if not full_path.exists():
+            self.logger.warning("Skipping missing file: %s", video_file)
+            self._release(reservation, publish_time)
+            self.catalog.mark_failed(video_info["id"], "rendered file missing")
+            return FAILED
+
+        if self.verifier:
+            # Corrupt, truncated, black or frozen reels would waste bandwidth and quota
+            problems = self.verifier.verify(full_path, expected_sha256=video_info.get("video_sha256"))
+            if problems:
+                self.logger.error("Skipping '%s', verification failed: %s", video_file, "; ".join(problems))
+                self._release(reservation, publish_time)
+                self.catalog.mark_failed(video_info["id"], f"verification failed: {'; '.join(problems)}")
+                return FAILED
+
+        title, description, tags = self._metadata(video_info, index)
+
+        # Admit before reserving a slot, so deferred reels never hold one
+        if reservation is None:
+            reservation = self._admit(video_info["id"], video_file)
+            if reservation is None:
+                self._release(None, publish_time)
+                return None
+
+        if publish_time is None:
+            slots = self.ledger.reserve(1, self.owner, item_ids=[video_info["id"]])
+            if not slots:
+                self.logger.error("No free publish slot left for '%s'.", video_file)
+                self.quota.release(reservation)
+                return None
+            publish_time = slots[0]
+        self.catalog.mark_scheduled(video_info["id"], publish_time)
 
-        save_last_upload_time(self.last_upload_file, publish_schedule[-1])
         self.logger.info(
-            "Last upload time saved: %s", publish_schedule[-1]
+            "Scheduling video '%s' at %s",
+            video_file,
+            publish_time,
+        )
+
+        started = time.perf_counter()
+        response = uploader.schedule_upload(
+            str(full_path),
+            title,
+            description,
+            publish_time,
+            tags,
         )
+        self._settle(uploader, reservation)
+
+        if response and response.get("id"):
+            self.ledger.confirm(publish_time, video_info["id"])
+            self.quota.clear_deferral(video_info["id"])
+            self.catalog.mark_uploaded(
+                video_info["id"],
+                response["id"],
+                publish_at=publish_time,
+                upload_seconds=time.perf_counter() - started,
+            )
+            return UPLOADED
+
+        # Free the slot so the next reservation backfills the gap
+        self.ledger.release(publish_time)
+        if uploader.quota_exceeded:
+            self.catalog.unschedule(video_info["id"], "deferred: API quota exceeded")
+            return None
+        self.catalog.mark_failed(video_info["id"], "upload failed")
+        return FAILED
+
+    def schedule_streaming(
+        self,
+        uploader: YouTubeUploader,
+        video_info: dict,
+        render: Callable[[Optional[float]], bool],
+        partial_path: Path,
+        output_path: Path,
+        index: int = 0,
+    ) -> Optional[str]:
+        """
+        Render a reel as fragmented MP4 and upload it while it encodes, so
+        the time from render start to scheduled approaches the longer of
+        encode and upload instead of their sum. The upload session is
+        finalized once the encode completes and the reel passes
+        verification; if the streaming encode or upload fails, the reel is
+        rendered and uploaded the normal way.
+
+        :param render: ``render(fragment_seconds)`` writes the reel to ``partial_path``,
+            publishes it to ``output_path`` and records it in the catalog;
+            ``fragment_seconds`` None means a normal render
+        :return: Resulting catalog state, or None if no publish slot is free
+        """
+        with log_context(reel_id=video_info["id"], stage="upload"):
+            return self._schedule_streaming(uploader, video_info, render, Path(partial_path), Path(output_path), index)
+
+    def _schedule_streaming(
+        self, uploader: YouTubeUploader, video_info: dict, render, partial_path: Path, output_path: Path, index: int
+    ) -> Optional[str]:
+        item_id = video_info["id"]
+        title, description, tags = self._metadata(video_info, index)
+
+        reservation = self._admit(item_id, output_path.name)
+        if reservation is None:
+            return None
+
+        slots = self.ledger.reserve(1, self.owner, item_ids=[item_id])
+        if not slots:
+            self.logger.error("No free publish slot left for '%s'.", output_path.name)
+            self.quota.release(reservation)
+            return None
+        publish_time = slots[0]
+
+        media = GrowingFileUpload(
+            partial_path,
+            self.config.stream_chunk_size,
+            poll_interval=self.config.stream_poll_interval,
+            stall_timeout=self.config.stream_stall_timeout,
+        )
+        started = time.perf_counter()
+        problems = []
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="stream-upload") as pool:
+            upload = pool.submit(
+                uploader.schedule_upload, str(output_path), title, description, publish_time, tags, media
+            )
+            try:
+                rendered = render(self.config.stream_fragment_seconds)
+            except Exception:
+                self.logger.exception("Streaming render of '%s' failed.", output_path.name)
+                rendered = False
+            encode_seconds = time.perf_counter() - started
+
+            if rendered and self.verifier:
+                problems = self.verifier.verify(output_path)
+            if not rendered:
+                media.abort("encode failed")
+            elif problems:
+                media.abort(f"verification failed: {'; '.join(problems)}")
+            else:
+                media.finish(output_path)
+            response = upload.result()
+        media.close()
+
+        seconds = time.perf_counter() - started
+        if response and response.get("id"):
+            self._settle(uploader, reservation)
+            self.ledger.confirm(publish_time, item_id)
+            self.quota.clear_deferral(item_id)
+            self.catalog.mark_uploaded(item_id, response["id"], publish_at=publish_time, upload_seconds=seconds)
+            self.logger.info(
+                "Reel '%s' scheduled %.1fs after render start (encode %.1fs, upload overlapped).",
+                output_path.name,
+                seconds,
+                encode_seconds,
+            )
+            return UPLOADED
+
+        if uploader.quota_exceeded or problems:
+            self._settle(uploader, reservation)
+            self.ledger.release(publish_time)
+            if uploader.quota_exceeded:
+                # Rendered (if the encode finished) and left for the next window
+                return None
+            self.logger.error("Skipping '%s', verification failed: %s", output_path.name, "; ".join(problems))
+            self.catalog.mark_failed(item_id, f"verification failed: {'; '.join(problems)}")
+            return FAILED
+        if rendered:
+            self.logger.warning("Streaming upload of '%s' failed, uploading the finished file.", output_path.name)
+        else:
+            self.logger.warning("Streaming encode of '%s' failed, rendering it normally.", output_path.name)
+            if not render(None):
+                self._release(reservation, publish_time)
+                return FAILED
+        # The fallback upload takes over this attempt's quota reservation and slot
+        return self._schedule_video(uploader, self.catalog.get(item_id), index, reservation, publish_time)
 
     # Post-upload cleanup
     def cleanup_after_upload(self):
         """
-        Move generated reels to uploaded folder
+        Move uploaded reels to uploaded folder
         and delete motivational content JSON.
         """
         moved_files = 0
 
         for video_info in self.videos:
-            video_file = f"reel_{video_info.get('id')}.mp4"
-            src = self.video_folder / video_file
-            dst = self.uploaded_reels_path / video_file
+            item = self.catalog.get(video_info["id"])
+            if not item or item["state"] != UPLOADED:
+                continue
+
+            src = Path(item["video_path"])
+            dst = self.uploaded_reels_path / src.name
+            if dst.exists():
+                # Legacy archives reused per-batch ids, keep both files
+                dst = dst.with_name(f"{src.stem}_{(item['video_sha256'] or '')[:8]}{src.suffix}")
 
             if src.exists():
                 shutil.move(str(src), str(dst))
+                self.catalog.set_video_path(item["id"], dst)
                 moved_files += 1
-                self.logger.info("Moved video: %s", video_file)
+                self.logger.info("Moved video: %s", src.name)
 
         if self.content_file.exists():
             self.content_file.unlink()
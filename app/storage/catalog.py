@@ -0,0 +1,414 @@
+import datetime
+import hashlib
+import json
+import re
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from app.config.settings import settings
+from app.utils.save_json import save_json
+
+GENERATED = "generated"
+RENDERED = "rendered"
+SCHEDULED = "scheduled"
+UPLOADED = "uploaded"
+FAILED = "failed"
+STATES = (GENERATED, RENDERED, SCHEDULED, UPLOADED, FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS content_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel TEXT NOT NULL,
+    theme TEXT,
+    quotes TEXT NOT NULL,
+    video_title TEXT,
+    youtube_description TEXT,
+    video_tags TEXT,
+    state TEXT NOT NULL,
+    video_path TEXT,
+    video_sha256 TEXT,
+    video_bytes INTEGER,
+    youtube_video_id TEXT,
+    publish_at TEXT,
+    error TEXT,
+    generated_at TEXT,
+    rendered_at TEXT,
+    scheduled_at TEXT,
+    uploaded_at TEXT,
+    failed_at TEXT,
+    render_seconds REAL,
+    encode_seconds REAL,
+    upload_seconds REAL,
+    plan TEXT,
+    legacy_key TEXT UNIQUE
+);
+CREATE INDEX IF NOT EXISTS idx_items_state ON content_items (state, id);
+CREATE INDEX IF NOT EXISTS idx_items_channel_state ON content_items (channel, state, publish_at);
+CREATE INDEX IF NOT EXISTS idx_items_youtube_id ON content_items (youtube_video_id);
+CREATE INDEX IF NOT EXISTS idx_items_sha256 ON content_items (video_sha256);
+"""
+
+JSON_COLUMNS = ("quotes", "video_tags")
+
+# Columns added after the first release: (name, type), applied on open
+MIGRATIONS = (("encode_seconds", "REAL"), ("plan", "TEXT"))
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentCatalog:
+    """
+    Indexed SQLite catalog tracking every content item through its
+    lifecycle (generated -> rendered -> scheduled -> uploaded, or failed).
+
+    Ids are globally unique across runs. The database runs in WAL mode so
+    renderers, uploaders and readers can use it concurrently.
+    """
+
+    def __init__(self, logger, config=None):
+        """
+        :param logger: Application logger instance
+        :param config: Catalog settings (defaults to ``settings.catalog``)
+        """
+        self.config = config or settings.catalog
+        self.logger = logger
+        self.db_file = Path(self.config.db_file)
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+
+    @staticmethod
+    def _migrate(conn):
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(content_items)")}
+        for name, column_type in MIGRATIONS:
+            if name not in columns:
+                conn.execute(f"ALTER TABLE content_items ADD COLUMN {name} {column_type}")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, timeout=self.config.busy_timeout, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _to_item(row: sqlite3.Row) -> dict:
+        item = dict(row)
+        for column in JSON_COLUMNS:
+            item[column] = json.loads(item[column]) if item[column] else []
+        return item
+
+    def _update(self, item_id: int, expected_state: Optional[str] = None, **fields) -> bool:
+        """
+        :param expected_state: Only update the item while it is in this state
+        """
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        query = f"UPDATE content_items SET {columns} WHERE id = ?"
+        params = [*fields.values(), item_id]
+        if expected_state is not None:
+            query += " AND state = ?"
+            params.append(expected_state)
+        with self._transaction() as conn:
+            cursor = conn.execute(query, params)
+        if cursor.rowcount == 0:
+            if expected_state is not None:
+                self.logger.warning(
+                    f"Catalog item {item_id} is missing or no longer {expected_state}, "
+                    f"{', '.join(fields)} not recorded."
+                )
+            else:
+                self.logger.warning(f"Catalog has no item {item_id}, {', '.join(fields)} not recorded.")
+        return cursor.rowcount == 1
+
+    # ---------------------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------------------
+    def add_generated(self, content: dict, theme: Optional[str] = None, channel: Optional[str] = None) -> int:
+        """
+        Record a newly generated content item.
+
+        :return: Globally unique item id
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO content_items
+                    (channel, theme, quotes, video_title, youtube_description, video_tags, state, generated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    channel or self.config.channel,
+                    theme,
+                    json.dumps(content.get("quotes", []), ensure_ascii=False),
+                    content.get("video_title"),
+                    content.get("youtube_description"),
+                    json.dumps(content.get("video_tags", []), ensure_ascii=False),
+                    GENERATED,
+                    _now(),
+                ),
+            )
+        return cursor.lastrowid
+
+    def update_content(self, item_id: int, content: dict) -> bool:
+        """Fill in the rest of an item recorded from its streamed quotes."""
+        return self._update(
+            item_id,
+            quotes=json.dumps(content.get("quotes", []), ensure_ascii=False),
+            video_title=content.get("video_title"),
+            youtube_description=content.get("youtube_description"),
+            video_tags=json.dumps(content.get("video_tags", []), ensure_ascii=False),
+        )
+
+    def mark_rendered(
+        self,
+        item_id: int,
+        video_path: Path,
+        render_seconds: Optional[float] = None,
+        encode_seconds: Optional[float] = None,
+        expected_state: Optional[str] = None,
+    ) -> bool:
+        """
+        :param expected_state: State the item's render started from; the item
+            is only marked rendered if nothing (e.g. a failed content
+            generation) moved it on in the meantime
+        """
+        video_path = Path(video_path)
+        return self._update(
+            item_id,
+            expected_state,
+            state=RENDERED,
+            video_path=str(video_path),
+            video_sha256=file_sha256(video_path),
+            video_bytes=video_path.stat().st_size,
+            rendered_at=_now(),
+            render_seconds=render_seconds,
+            encode_seconds=encode_seconds,
+            error=None,
+        )
+
+    def mark_scheduled(self, item_id: int, publish_at: datetime.datetime) -> bool:
+        return self._update(item_id, state=SCHEDULED, publish_at=publish_at.isoformat(), scheduled_at=_now())
+
+    def mark_uploaded(
+        self,
+        item_id: int,
+        youtube_video_id: str,
+        publish_at: Optional[datetime.datetime] = None,
+        upload_seconds: Optional[float] = None,
+    ) -> bool:
+        fields = {
+            "state": UPLOADED,
+            "youtube_video_id": youtube_video_id,
+            "uploaded_at": _now(),
+            "upload_seconds": upload_seconds,
+            "error": None,
+        }
+        if publish_at is not None:
+            fields["publish_at"] = publish_at.isoformat()
+        return self._update(item_id, **fields)
+
+    def unschedule(self, item_id: int, reason: str) -> bool:
+        """Return a scheduled item to rendered (its upload was deferred)."""
+        return self._update(item_id, state=RENDERED, publish_at=None, scheduled_at=None, error=reason)
+
+    def mark_failed(self, item_id: int, error: str) -> bool:
+        return self._update(item_id, state=FAILED, error=error, failed_at=_now())
+
+    def set_video_path(self, item_id: int, video_path: Path) -> bool:
+        return self._update(item_id, video_path=str(video_path))
+
+    def record_timings(self, item_id: int, render_seconds: float, encode_seconds: float) -> bool:
+        """Record render timings without changing the item's state."""
+        return self._update(item_id, render_seconds=render_seconds, encode_seconds=encode_seconds)
+
+    def set_plan(self, item_id: int, plan: dict) -> bool:
+        """Store the render plan (every random choice) of an item."""
+        return self._update(item_id, plan=json.dumps(plan, ensure_ascii=False))
+
+    def get_plan(self, item_id: int) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT plan FROM content_items WHERE id = ?", (item_id,)).fetchone()
+        return json.loads(row["plan"]) if row and row["plan"] else None
+
+    # ---------------------------------------------------------------
+    # Queries
+    # ---------------------------------------------------------------
+    def get(self, item_id: int) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM content_items WHERE id = ?", (item_id,)).fetchone()
+        return self._to_item(row) if row else None
+
+    def items_in_state(self, state: str, channel: Optional[str] = None, limit: Optional[int] = None) -> list[dict]:
+        """Items in a lifecycle state, oldest first (index-backed)."""
+        query = "SELECT * FROM content_items WHERE state = ?"
+        params: list = [state]
+        if channel is not None:
+            query = "SELECT * FROM content_items WHERE channel = ? AND state = ?"
+            params = [channel, state]
+        query += " ORDER BY id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._connect() as conn:
+            return [self._to_item(row) for row in conn.execute(query, params)]
+
+    def items_after(self, item_id: int, channel: Optional[str] = None) -> list[dict]:
+        """Items with an id greater than ``item_id``, oldest first."""
+        query = "SELECT * FROM content_items WHERE id > ?"
+        params: list = [item_id]
+        if channel is not None:
+            query += " AND channel = ?"
+            params.append(channel)
+
+        with self._connect() as conn:
+            return [self._to_item(row) for row in conn.execute(query + " ORDER BY id", params)]
+
+    def find_by_sha256(self, sha256: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM content_items WHERE video_sha256 = ?", (sha256,)).fetchone()
+        return self._to_item(row) if row else None
+
+    def state_counts(self, channel: Optional[str] = None) -> dict[str, int]:
+        with self._connect() as conn:
+            if channel is None:
+                rows = conn.execute("SELECT state, COUNT(*) AS n FROM content_items GROUP BY state")
+            else:
+                rows = conn.execute(
+                    "SELECT state, COUNT(*) AS n FROM content_items WHERE channel = ? GROUP BY state",
+                    (channel,),
+                )
+            return {row["state"]: row["n"] for row in rows}
+
+    # ---------------------------------------------------------------
+    # Legacy import
+    # ---------------------------------------------------------------
+    def import_legacy(
+        self,
+        content_file: Path = settings.files.motivational_output,
+        reels_dir: Path = settings.youtube.video_folder,
+        uploaded_dir: Path = settings.youtube.uploaded_reels_path,
+    ) -> dict[str, int]:
+        """
+        Import state kept in ``motivational_content.json`` and the reel
+        directories. Safe to run repeatedly: every legacy source gets a
+        stable key, and JSON items already created by this catalog are
+        recognised by id and title.
+
+        Imported items keep their JSON id when the catalog has no item with
+        that id yet. Otherwise they get a new id and the JSON file is
+        rewritten with it, so later renders and uploads of the item update
+        its catalog row.
+
+        :return: Number of imported items per state
+        """
+        imported = {state: 0 for state in STATES}
+
+        if Path(content_file).exists():
+            with open(content_file, "r", encoding="utf-8") as f:
+                items = json.load(f)
+
+            remapped = 0
+            for item in items:
+                legacy_id = item.get("id")
+                existing = self.get(legacy_id) if legacy_id is not None else None
+                if existing and existing["video_title"] == item.get("video_title"):
+                    continue
+
+                reel = Path(reels_dir) / f"reel_{legacy_id}.mp4"
+                state = RENDERED if reel.exists() else GENERATED
+                item_id, inserted = self._import_item(
+                    item, reel if reel.exists() else None, state, None if existing else legacy_id
+                )
+                if inserted:
+                    imported[state] += 1
+                if item_id != legacy_id:
+                    self.logger.info(f"Legacy item {legacy_id} is catalog item {item_id}.")
+                    item["id"] = item_id
+                    remapped += 1
+
+            if remapped:
+                save_json(items, content_file)
+                self.logger.info(f"Rewrote {remapped} ids in {content_file} to their catalog ids.")
+
+        if Path(uploaded_dir).exists():
+            for reel in sorted(Path(uploaded_dir).glob("reel_*.mp4")):
+                if self._import_item({}, reel, UPLOADED)[1]:
+                    imported[UPLOADED] += 1
+
+        self.logger.info(f"Legacy import complete: {imported}")
+        return imported
+
+    def _import_item(
+        self, item: dict, reel: Optional[Path], state: str, item_id: Optional[int] = None
+    ) -> tuple[int, bool]:
+        """
+        :param item_id: Id to insert the item under (None = next free id)
+        :return: Catalog id of the item and whether it was inserted now
+            (False if its legacy key was imported before)
+        """
+        sha256 = file_sha256(reel) if reel else None
+        if sha256:
+            legacy_key = f"file:{sha256}"
+        else:
+            fingerprint = json.dumps([item.get("quotes"), item.get("video_title")], ensure_ascii=False)
+            legacy_key = f"json:{hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()}"
+
+        now = _now()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT id FROM content_items WHERE legacy_key = ?", (legacy_key,)).fetchone()
+            if row is not None:
+                return row["id"], False
+            cursor = conn.execute(
+                """
+                INSERT INTO content_items
+                    (id, channel, quotes, video_title, youtube_description, video_tags, state,
+                     video_path, video_sha256, video_bytes, generated_at, rendered_at, uploaded_at, legacy_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    item_id,
+                    self.config.channel,
+                    json.dumps(item.get("quotes", []), ensure_ascii=False),
+                    item.get("video_title") or (re.sub(r"[_-]+", " ", reel.stem) if reel else None),
+                    item.get("youtube_description"),
+                    json.dumps(item.get("video_tags", []), ensure_ascii=False),
+                    state,
+                    str(reel) if reel else None,
+                    sha256,
+                    reel.stat().st_size if reel else None,
+                    now,
+                    now if reel else None,
+                    now if state == UPLOADED else None,
+                    legacy_key,
+                ),
+            )
+        return cursor.lastrowid, True
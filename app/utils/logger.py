@@ -1,12 +1,239 @@
+import atexit
+import datetime
+import json
 import logging
+import multiprocessing.util
+import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Optional
 
+try:
+    import fcntl
+except ImportError:  # Windows: rotation falls back to in-process locking only
+    fcntl = None
+
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(filename)s:%(lineno)d | %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Inherited by child processes so every process of one run logs the same run id
+RUN_ID_ENV = "LOG_RUN_ID"
+
+_log_context: ContextVar[dict] = ContextVar("log_context", default={})
+
+
+def get_run_id() -> str:
+    return os.environ.setdefault(RUN_ID_ENV, uuid.uuid4().hex[:12])
+
+
+def start_run(run_id: Optional[str] = None) -> str:
+    """Start a new run id for this process and the processes it spawns."""
+    os.environ[RUN_ID_ENV] = run_id or uuid.uuid4().hex[:12]
+    return os.environ[RUN_ID_ENV]
+
+
+@contextmanager
+def log_context(**ids):
+    """
+    Attach ids (``reel_id``, ``stage``, ...) to every record logged inside
+    the block by the current thread or task.
+    """
+    token = _log_context.set({**_log_context.get(), **{k: v for k, v in ids.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the run/reel/stage ids onto the record in the calling thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if hasattr(record, "run_id"):
+            # Already stamped in the logging thread before being queued
+            return True
+        context = _log_context.get()
+        record.run_id = context.get("run_id") or get_run_id()
+        record.reel_id = context.get("reel_id")
+        record.stage = context.get("stage")
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line, including the run/reel/stage ids."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created).astimezone().isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "source": f"{record.filename}:{record.lineno}",
+            "pid": record.process,
+            "thread": record.threadName,
+            "run_id": getattr(record, "run_id", None),
+            "reel_id": getattr(record, "reel_id", None),
+            "stage": getattr(record, "stage", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LockedRotatingFileHandler(RotatingFileHandler):
+    """
+    ``RotatingFileHandler`` that is safe when several processes write the
+    same file: every write and rollover happens under an exclusive
+    ``flock`` on ``<file>.lock``, and a process whose file was rotated away
+    by another process reopens the new file before writing.
+    """
+
+    def __init__(self, filename, maxBytes: int = 0, backupCount: int = 0, encoding: Optional[str] = None):
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding, delay=True)
+        self._lock_path = self.baseFilename + ".lock"
+        self._lock_file = None
+        self._lock_pid = None
+
+    def _lock(self):
+        if fcntl is None:
+            return
+        # flock is shared with a forked parent through an inherited fd
+        if self._lock_pid != os.getpid():
+            self._lock_file = open(self._lock_path, "a")
+            self._lock_pid = os.getpid()
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+
+    def _unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _reopen_if_rotated(self):
+        if self.stream is None:
+            return
+        try:
+            current = os.stat(self.baseFilename)
+        except FileNotFoundError:
+            current = None
+        opened = os.fstat(self.stream.fileno())
+        if current is None or (current.st_ino, current.st_dev) != (opened.st_ino, opened.st_dev):
+            self.stream.close()
+            self.stream = self._open()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self._lock()
+            try:
+                self._reopen_if_rotated()
+                if self.shouldRollover(record):
+                    self.doRollover()
+                logging.FileHandler.emit(self, record)
+            finally:
+                self._unlock()
+        except Exception:
+            self.handleError(record)
+
+
+class _Router(logging.Handler):
+    """Listener-side handler that forwards each record to its logger's handlers."""
+
+    def __init__(self, pipeline: "_LogPipeline"):
+        super().__init__()
+        self.pipeline = pipeline
+
+    def handle(self, record: logging.LogRecord):
+        for handler in self.pipeline.targets.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class _LogPipeline:
+    """
+    One in-memory queue and one writer thread per process. Loggers only
+    enqueue (an unbounded ``SimpleQueue``, so callers never block on I/O);
+    the writer thread does all formatting and stream/file writes.
+    """
+
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.targets: dict[str, list[logging.Handler]] = {}
+        self.queue_handlers: list[QueueHandler] = []
+        self.listener: Optional[QueueListener] = None
+        self.lock = threading.Lock()
+
+    def attach(self, logger: logging.Logger, handlers: list[logging.Handler]):
+        with self.lock:
+            self.targets[logger.name] = handlers
+            handler = QueueHandler(self.queue)
+            handler.addFilter(ContextFilter())
+            self.queue_handlers.append(handler)
+            logger.addHandler(handler)
+            if self.listener is None:
+                self._start()
+
+    def _start(self):
+        self.listener = QueueListener(self.queue, _Router(self))
+        self.listener.start()
+
+    def stop(self):
+        with self.lock:
+            if self.listener is not None:
+                self.listener.stop()
+                self.listener = None
+
+    def after_fork(self):
+        # The writer thread does not survive fork and the queue may hold
+        # the parent's pending records (or a lock taken mid-put): start over
+        self.lock = threading.Lock()
+        self.queue = queue.SimpleQueue()
+        for handler in self.queue_handlers:
+            handler.queue = self.queue
+        if self.listener is not None:
+            self._start()
+
+
+_pipeline = _LogPipeline()
+_shared_handlers: dict[object, logging.Handler] = {}
+
+atexit.register(_pipeline.stop)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_pipeline.after_fork)
+# Pool workers exit through os._exit, which skips atexit; multiprocessing
+# finalizers still run (and must be registered after its post-fork reset)
+multiprocessing.util.register_after_fork(
+    _pipeline, lambda pipeline: multiprocessing.util.Finalize(pipeline, pipeline.stop, exitpriority=0)
+)
+
+
+def configure_logging(queue_mode: bool = True, json_lines: bool = False):
+    """
+    Select how ``SingletonLogger`` instances created afterwards write logs.
+
+    :param queue_mode: Enqueue records and write them on a background thread
+    :param json_lines: Write the log file as JSON lines (``*.jsonl``) with run/reel/stage ids
+    """
+    SingletonLogger.queue_mode = queue_mode
+    SingletonLogger.json_lines = json_lines
+
+
+def _shared_handler(key, factory) -> logging.Handler:
+    # One handler per stream/file per process, however many loggers use it
+    if key not in _shared_handlers:
+        handler = factory()
+        handler.addFilter(ContextFilter())
+        _shared_handlers[key] = handler
+    return _shared_handlers[key]
+
 
 class SingletonLogger:
     _instances = {}
+    queue_mode = False
+    json_lines = False
 
     def __new__(cls, name: str, log_level: int = logging.INFO, log_dir: Optional[Path] = None, log_file: str = "app.log"):
         # If an instance for this logger name already exists, return it
@@ -30,36 +257,43 @@ class SingletonLogger:
         # -------------------------
         # Log format
         # -------------------------
-        formatter = logging.Formatter(
-            fmt="%(asctime)s | %(levelname)s | %(name)s | %(filename)s:%(lineno)d | %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S",
-        )
+        formatter = logging.Formatter(fmt=LOG_FORMAT, datefmt=DATE_FORMAT)
+        file_formatter = JsonLinesFormatter() if self.json_lines else formatter
+
+        handlers = []
 
         # -------------------------
         # Console handler
         # -------------------------
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(log_level)
+        console_handler = _shared_handler("console", lambda: logging.StreamHandler(sys.stdout))
         console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
+        handlers.append(console_handler)
 
         # -------------------------
         # File handler (optional)
         # -------------------------
         if log_dir:
             try:
+                log_dir = Path(log_dir).resolve()
                 log_dir.mkdir(parents=True, exist_ok=True)
-                file_handler = RotatingFileHandler(
-                    filename=log_dir / log_file,
+                log_path = log_dir / (Path(log_file).with_suffix(".jsonl") if self.json_lines else log_file)
+                file_handler = _shared_handler(log_path, lambda: LockedRotatingFileHandler(
+                    filename=log_path,
                     maxBytes=5 * 1024 * 1024,  # 5 MB
                     backupCount=5,
                     encoding="utf-8",
-                )
-                file_handler.setLevel(log_level)
-                file_handler.setFormatter(formatter)
-                self.logger.addHandler(file_handler)
+                ))
+                file_handler.setFormatter(file_formatter)
+                handlers.append(file_handler)
             except Exception as e:
-                self.logger.error(f"Failed to initialize file logger: {e}")
+                print(f"Failed to initialize file logger: {e}", file=sys.stderr)
+
+        if self.queue_mode:
+            # Handler levels are left open; the logger level does the filtering
+            _pipeline.attach(self.logger, handlers)
+        else:
+            for handler in handlers:
+                self.logger.addHandler(handler)
 
         self._initialized = True
 
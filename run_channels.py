@@ -0,0 +1,62 @@
+import argparse
+from app.config.settings import settings, LOGS_DIR
+from app.config.channels import load_channel_profiles
+from app.pipeline.multi_channel import MultiChannelRunner
+from app.utils.logger import SingletonLogger, start_run
+
+
+logger = SingletonLogger(name=__name__, log_level=settings.log_level, log_dir=LOGS_DIR).get_logger()
+
+
+def main(video_count, channels, render_workers, upload_workers):
+    """
+    Multi-channel entry point: every channel profile shares one pool of
+    render and upload workers.
+    """
+    run_id = start_run()
+    logger.info(f"Multi-channel run started (run {run_id})")
+
+    try:
+        profiles = load_channel_profiles(channels)
+        if not profiles:
+            logger.error("No channel profiles found in channels/.")
+            return
+        MultiChannelRunner(
+            logger,
+            profiles,
+            render_workers=render_workers,
+            upload_workers=upload_workers,
+        ).run(video_count)
+        logger.info("Multi-channel run finished successfully.")
+    except Exception:
+        logger.exception("Multi-channel run terminated due to an unexpected error.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the pipeline for several channels at once.")
+    parser.add_argument(
+        "--video-count",
+        type=int,
+        default=1,
+        help="Number of videos to generate per channel (default: 1)"
+    )
+    parser.add_argument(
+        "--channels",
+        nargs="+",
+        default=None,
+        help="Channel profile names from channels/ (default: all)"
+    )
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=None,
+        help="Size of the shared render pool"
+    )
+    parser.add_argument(
+        "--upload-workers",
+        type=int,
+        default=None,
+        help="Size of the shared upload pool (default: one per channel)"
+    )
+    args = parser.parse_args()
+    main(args.video_count, args.channels, args.render_workers, args.upload_workers)
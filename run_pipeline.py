@@ -1,15 +1,19 @@
 import argparse
-from pathlib import Path
-from app.config.settings import settings
+from app.config.settings import settings, LOGS_DIR
 from app.ai_workflow.generator import ContentGenerator
 from app.media.generator import VideoGenerator
+from app.media.job_queue import RenderJobQueue
+from app.media.render_service import RenderServiceClient
+from app.media.utils import MediaUtils
+from app.storage.catalog import ContentCatalog, GENERATED, RENDERED
+from app.shorts_uploader.uploader import YouTubeUploader
+from app.shorts_uploader.utils import read_last_upload_time
 from app.shorts_uploader.youtube_scheduler import YouTubeScheduler
-from app.utils.logger import SingletonLogger
+from app.utils.logger import SingletonLogger, log_context, start_run
 import logging
 
 
-log_dir = Path("logs")
-logger = SingletonLogger(name=__name__, log_level=settings.log_level, log_dir=log_dir).get_logger()
+logger = SingletonLogger(name=__name__, log_level=settings.log_level, log_dir=LOGS_DIR).get_logger()
 
 
 def run_ai_content_generation(logger, response_count):
@@ -22,6 +26,30 @@ def run_ai_content_generation(logger, response_count):
     logger.info("AI content generation completed.")
 
 
+def run_streaming_content_generation(logger, response_count):
+    """
+    Generate AI content in streaming mode, queueing each render as soon as its quotes are complete.
+
+    :return: Render job ids
+    """
+    logger.info("Starting streaming AI content generation...")
+    queue = RenderJobQueue(logger)
+    job_ids = []
+
+    def queue_render(item_id, quotes):
+        job_ids.append(queue.enqueue(item_id, quotes, settings.files.generated_reel_file))
+        logger.info(f"Quotes of item {item_id} complete, render job queued.")
+
+    def cancel_render(item_id, reason):
+        if queue.cancel(item_id, settings.files.generated_reel_file, reason):
+            logger.warning(f"Render job of item {item_id} cancelled: {reason}")
+
+    generator = ContentGenerator(logger=logger)
+    generator.generate_batch(response_count, on_quotes=queue_render, on_failed=cancel_render)
+    logger.info("Streaming AI content generation completed.")
+    return job_ids
+
+
 def run_video_generation(logger):
     """
     Generate videos from AI-generated content.
@@ -32,6 +60,103 @@ def run_video_generation(logger):
     logger.info("Video generation completed.")
 
 
+def run_draft_generation(logger, contact_sheet=False):
+    """
+    Render low-resolution QA drafts (or contact sheets) of the generated content.
+    """
+    logger.info("Starting draft generation...")
+    if contact_sheet:
+        settings.draft.mode = "sheet"
+    generator = VideoGenerator(logger=logger)
+    generator.generate_batch(draft=True)
+    logger.info(f"Draft generation completed, review {settings.draft.output_dir}.")
+
+
+def run_queued_video_generation(logger):
+    """
+    Queue videos for render-worker processes and wait until they finish.
+    """
+    logger.info("Queueing video generation jobs...")
+    queue = RenderJobQueue(logger)
+    items = MediaUtils(logger).load_content_items(settings.files.motivational_output)
+    job_ids = [
+        queue.enqueue(item["id"], item["quotes"], settings.files.generated_reel_file)
+        for item in items
+    ]
+    logger.info(f"Queued {len(job_ids)} render jobs, waiting for workers...")
+    counts = queue.wait_for(job_ids)
+    logger.info(f"Queued video generation completed: {counts}")
+
+
+def run_service_video_generation(logger):
+    """
+    Submit videos to a running render service, rendering locally if none is reachable.
+    """
+    client = RenderServiceClient(logger)
+    health = client.health()
+    if health is None:
+        logger.warning(f"No render service at {client.base_url}, rendering locally.")
+        run_video_generation(logger)
+        return
+
+    items = MediaUtils(logger).load_content_items(settings.files.motivational_output)
+    logger.info(f"Submitting {len(items)} render jobs to {client.base_url}...")
+    successful = 0
+    for item in items:
+        try:
+            result = client.render(item["quotes"], item_id=item["id"])
+        except (OSError, RuntimeError, ValueError) as e:
+            # Unreachable service, timeout or unreadable reply: the item keeps its state for the next run
+            logger.error(f"Render service request for reel {item['id']} failed, skipping it: {e}")
+            continue
+        if result.get("success"):
+            successful += 1
+            logger.info(f"Reel {item['id']} rendered in {result['seconds']}s: {result['output_path']}")
+        else:
+            logger.warning(f"Render service failed reel {item['id']}: {result.get('error')}")
+    logger.info(f"Render service video generation completed: {successful}/{len(items)} videos successful.")
+
+
+def run_streaming_render_upload(logger):
+    """
+    Render each reel as fragmented MP4 and upload it to YouTube while it encodes.
+    """
+    logger.info("Starting streaming render and upload...")
+    items = MediaUtils(logger).load_content_items(settings.files.motivational_output)
+    generator = VideoGenerator(logger=logger)
+    scheduler = YouTubeScheduler(logger=logger)
+    scheduler.authenticate()
+    scheduler.ledger.import_last_upload_time(read_last_upload_time(scheduler.last_upload_file))
+    uploader = YouTubeUploader(scheduler.youtube_client, scheduler.video_folder, logger=logger)
+
+    for index, item in enumerate(items):
+        video_info = scheduler.catalog.get(item["id"]) or item
+        if video_info.get("state", GENERATED) == RENDERED:
+            state = scheduler.schedule_video(uploader, video_info, index)
+        elif video_info.get("state", GENERATED) == GENERATED:
+            output_path = generator.output_path(item["id"])
+            state = scheduler.schedule_streaming(
+                uploader,
+                video_info,
+                lambda fragment_seconds, item=item: generator.generate_video(
+                    item["quotes"], item["id"], fragment_seconds=fragment_seconds
+                ),
+                generator.utils.partial_output_path(output_path),
+                output_path,
+                index,
+            )
+        else:
+            continue
+        if state is None:
+            if scheduler.quota_blocked:
+                scheduler.defer_uploads([scheduler.catalog.get(i["id"]) or i for i in items[index:]])
+            break
+        scheduler.videos.append(video_info)
+
+    scheduler.cleanup_after_upload()
+    logger.info("Streaming render and upload completed.")
+
+
 def run_youtube_scheduler(logger):
     """
     Schedule and upload videos to YouTube.
@@ -42,16 +167,65 @@ def run_youtube_scheduler(logger):
     logger.info("YouTube scheduling workflow completed.")
 
 
-def main(video_count):
+def run_legacy_import(logger):
+    """
+    Import pre-catalog state (content JSON and reel folders) into the catalog.
+    """
+    logger.info("Importing legacy content state into the catalog...")
+    ContentCatalog(logger).import_legacy()
+
+
+def main(
+    video_count,
+    use_queue=False,
+    import_legacy=False,
+    draft=False,
+    contact_sheet=False,
+    use_service=False,
+    stream=False,
+    stream_upload=False,
+):
     """
     Application entry point.
     """
-    logger.info("Application started")
+    run_id = start_run()
+    logger.info(f"Application started (run {run_id})")
 
     try:
-        run_ai_content_generation(logger, video_count)
-        run_video_generation(logger)
-        run_youtube_scheduler(logger)
+        if import_legacy:
+            with log_context(stage="import"):
+                run_legacy_import(logger)
+        stream = stream and not (draft or contact_sheet or stream_upload)
+        job_ids = []
+        with log_context(stage="generate"):
+            if stream:
+                job_ids = run_streaming_content_generation(logger, video_count)
+            else:
+                run_ai_content_generation(logger, video_count)
+        if draft or contact_sheet:
+            # Stop for review; the next normal run renders the stored plans
+            with log_context(stage="draft"):
+                run_draft_generation(logger, contact_sheet)
+            logger.info("Application finished successfully.")
+            return
+        if stream_upload:
+            # Render and upload overlap per reel, no separate upload stage
+            with log_context(stage="upload"):
+                run_streaming_render_upload(logger)
+            logger.info("Application finished successfully.")
+            return
+        with log_context(stage="render"):
+            if job_ids:
+                logger.info(f"Waiting for {len(job_ids)} streamed render jobs...")
+                logger.info(f"Queued video generation completed: {RenderJobQueue(logger).wait_for(job_ids)}")
+            elif use_queue or stream:
+                run_queued_video_generation(logger)
+            elif use_service:
+                run_service_video_generation(logger)
+            else:
+                run_video_generation(logger)
+        with log_context(stage="upload"):
+            run_youtube_scheduler(logger)
         logger.info("Application finished successfully.")
     except Exception:
         logger.exception("Application terminated due to an unexpected error.")
@@ -65,5 +239,49 @@ if __name__ == "__main__":
         default=1,
         help="Number of videos to generate (default: 1)"
     )
+    parser.add_argument(
+        "--queue",
+        action="store_true",
+        help="Render through the shared job queue (run render workers separately)"
+    )
+    parser.add_argument(
+        "--render-service",
+        action="store_true",
+        help="Render through a running render service (run_render_service.py)"
+    )
+    parser.add_argument(
+        "--import-legacy",
+        action="store_true",
+        help="Import existing content JSON and reel folders into the catalog first"
+    )
+    parser.add_argument(
+        "--draft",
+        action="store_true",
+        help="Render low-resolution drafts for review and stop before full rendering and upload"
+    )
+    parser.add_argument(
+        "--contact-sheet",
+        action="store_true",
+        help="Like --draft, but write one contact sheet of key frames per reel"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream AI responses and queue each render as soon as its quotes are complete (implies --queue)"
+    )
+    parser.add_argument(
+        "--stream-upload",
+        action="store_true",
+        help="Upload each reel while it is still encoding (fragmented MP4) instead of after the render stage"
+    )
     args = parser.parse_args()
-    main(args.video_count)
+    main(
+        args.video_count,
+        use_queue=args.queue,
+        import_legacy=args.import_legacy,
+        draft=args.draft,
+        contact_sheet=args.contact_sheet,
+        use_service=args.render_service,
+        stream=args.stream,
+        stream_upload=args.stream_upload,
+    )
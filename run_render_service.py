@@ -0,0 +1,45 @@
+import argparse
+from app.config.settings import settings, LOGS_DIR
+from app.media.render_service import RenderService
+from app.utils.logger import SingletonLogger, start_run
+
+
+logger = SingletonLogger(name="render_service", log_level=settings.log_level, log_dir=LOGS_DIR).get_logger()
+
+
+def main(host, port, warm_up):
+    """
+    render-service entry point: keep a warm renderer resident and serve jobs.
+    """
+    start_run()
+    try:
+        service = RenderService(logger, host=host, port=port)
+        if warm_up:
+            service.warm_up()
+        service.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Render service stopped.")
+    except Exception:
+        logger.exception("Render service terminated due to an unexpected error.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resident render service with warm assets.")
+    parser.add_argument(
+        "--host",
+        default=settings.service.host,
+        help=f"Interface to bind (default: {settings.service.host})"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=settings.service.port,
+        help=f"Port to listen on (default: {settings.service.port})"
+    )
+    parser.add_argument(
+        "--no-warm-up",
+        action="store_true",
+        help="Skip pre-loading music, logo, hook texts and clip metadata at startup"
+    )
+    args = parser.parse_args()
+    main(args.host, args.port, warm_up=not args.no_warm_up)
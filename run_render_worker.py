@@ -0,0 +1,39 @@
+import argparse
+from app.config.settings import settings, LOGS_DIR
+from app.media.render_worker import RenderWorker
+from app.utils.logger import SingletonLogger
+
+
+logger = SingletonLogger(name="render_worker", log_level=settings.log_level, log_dir=LOGS_DIR).get_logger()
+
+
+def main(exit_when_empty, max_jobs, worker_id):
+    """
+    render-worker entry point: lease and render jobs from the shared queue.
+    """
+    try:
+        RenderWorker(logger, worker_id=worker_id).run(exit_when_empty=exit_when_empty, max_jobs=max_jobs)
+    except Exception:
+        logger.exception("Render worker terminated due to an unexpected error.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render worker leasing jobs from the shared render queue.")
+    parser.add_argument(
+        "--exit-when-empty",
+        action="store_true",
+        help="Exit once the queue has no claimable jobs instead of polling"
+    )
+    parser.add_argument(
+        "--max-jobs",
+        type=int,
+        default=None,
+        help="Exit after rendering this many jobs"
+    )
+    parser.add_argument(
+        "--worker-id",
+        default=None,
+        help="Worker id recorded on leases (default: host-pid-random)"
+    )
+    args = parser.parse_args()
+    main(args.exit_when_empty, args.max_jobs, args.worker_id)
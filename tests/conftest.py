@@ -0,0 +1,37 @@
+import logging
+import multiprocessing
+
+import pytest
+
+# Spawned (not forked) processes: each opens its own connections, as separate uploaders and workers do
+CONTEXT = multiprocessing.get_context("spawn")
+PROCESS_TIMEOUT = 60.0
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger("tests")
+
+
+@pytest.fixture
+def run_processes():
+    """
+    Run ``target(barrier, results, *args)`` in one process per entry of
+    ``args_list``, released together by the barrier, and return everything
+    the processes put on ``results``.
+    """
+    def run(target, args_list: list[tuple]) -> list:
+        barrier = CONTEXT.Barrier(len(args_list))
+        results = CONTEXT.Queue()
+        processes = [CONTEXT.Process(target=target, args=(barrier, results, *args)) for args in args_list]
+        for process in processes:
+            process.start()
+        collected = []
+        for _ in processes:
+            collected.extend(results.get(timeout=PROCESS_TIMEOUT))
+        for process in processes:
+            process.join(PROCESS_TIMEOUT)
+            assert process.exitcode == 0, f"{process.name} exited with {process.exitcode}"
+        return collected
+
+    return run
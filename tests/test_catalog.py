@@ -0,0 +1,60 @@
+import logging
+from dataclasses import replace
+
+from app.config.settings import settings
+from app.storage.catalog import ContentCatalog, FAILED, GENERATED, RENDERED
+
+ITEMS_PER_PROCESS = 10
+
+
+def _config(db_file):
+    return replace(settings.catalog, db_file=db_file, channel="test")
+
+
+def _add(barrier, results, db_file, owner):
+    catalog = ContentCatalog(logging.getLogger("tests"), config=_config(db_file))
+    barrier.wait()
+    results.put([catalog.add_generated({"quotes": [f"{owner} {i}"]}) for i in range(ITEMS_PER_PROCESS)])
+
+
+def _finish(barrier, results, db_file, item_ids, video_path, outcome):
+    catalog = ContentCatalog(logging.getLogger("tests"), config=_config(db_file))
+    barrier.wait()
+    won = []
+    for item_id in item_ids:
+        if outcome == RENDERED:
+            moved = catalog.mark_rendered(item_id, video_path, expected_state=GENERATED)
+        else:
+            moved = catalog.mark_failed(item_id, "content generation failed")
+        if moved:
+            won.append((item_id, outcome))
+    results.put(won)
+
+
+def test_concurrent_processes_get_unique_ids(tmp_path, logger, run_processes):
+    db_file = tmp_path / "catalog.sqlite3"
+    ContentCatalog(logger, config=_config(db_file))
+
+    ids = run_processes(_add, [(db_file, f"generator-{i}") for i in range(4)])
+
+    assert len(set(ids)) == 4 * ITEMS_PER_PROCESS
+    assert ContentCatalog(logger, config=_config(db_file)).state_counts() == {GENERATED: len(ids)}
+
+
+def test_failed_item_is_never_marked_rendered(tmp_path, logger, run_processes):
+    db_file = tmp_path / "catalog.sqlite3"
+    catalog = ContentCatalog(logger, config=_config(db_file))
+    item_ids = [catalog.add_generated({"quotes": [str(i)]}) for i in range(20)]
+    video_path = tmp_path / "reel.mp4"
+    video_path.write_bytes(b"video")
+
+    # Renders finishing race the generator failing the same items
+    outcomes = run_processes(_finish, [
+        (db_file, item_ids, video_path, RENDERED),
+        (db_file, item_ids, video_path, FAILED),
+    ])
+
+    assert sum(outcome == FAILED for _, outcome in outcomes) == len(item_ids)
+    # Whichever came first, a failure is never overwritten by the render
+    assert catalog.state_counts() == {FAILED: len(item_ids)}
+    assert not catalog.mark_rendered(item_ids[0], video_path, expected_state=GENERATED)
@@ -0,0 +1,25 @@
+import importlib
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+# Listed from the files, as some packages (e.g. app.shorts_uploader) are namespace packages
+MODULES = sorted(
+    ".".join(path.relative_to(ROOT).with_suffix("").parts).removesuffix(".__init__")
+    for path in (ROOT / "app").rglob("*.py")
+)
+SCRIPTS = sorted(ROOT.glob("run_*.py"))
+
+
+@pytest.mark.parametrize("name", MODULES)
+def test_module_imports(name):
+    importlib.import_module(name)
+
+
+@pytest.mark.parametrize("script", SCRIPTS, ids=lambda path: path.name)
+def test_entry_point_imports(script):
+    # Loaded under its own name, so the ``__main__`` block does not run
+    spec = importlib.util.spec_from_file_location(script.stem, script)
+    spec.loader.exec_module(importlib.util.module_from_spec(spec))
@@ -0,0 +1,90 @@
+import logging
+import os
+import time
+from dataclasses import replace
+
+from app.config.settings import settings
+from app.media.job_queue import RenderJobQueue, DONE, FAILED, LEASED, PENDING
+
+JOBS = 12
+
+
+def _config(db_file, lease_seconds: float = 300.0):
+    return replace(settings.queue, db_file=db_file, lease_seconds=lease_seconds, max_attempts=2)
+
+
+def _drain(barrier, results, db_file, worker_id):
+    queue = RenderJobQueue(logging.getLogger("tests"), config=_config(db_file))
+    barrier.wait()
+    leased = []
+    while (job := queue.lease(worker_id)) is not None:
+        leased.append((job.id, worker_id))
+        assert queue.complete(job.id, worker_id, job.output_dir / f"{job.reel_id}.mp4")
+    results.put(leased)
+
+
+def _lease_and_crash(barrier, results, db_file, lease_seconds):
+    queue = RenderJobQueue(logging.getLogger("tests"), config=_config(db_file, lease_seconds))
+    barrier.wait()
+    job = queue.lease("crashed")
+    results.put([job.id])
+    results.close()
+    results.join_thread()
+    # Die holding the lease, without completing or failing the job
+    os._exit(0)
+
+
+def test_concurrent_workers_never_lease_a_job_twice(tmp_path, logger, run_processes):
+    db_file = tmp_path / "queue.sqlite3"
+    queue = RenderJobQueue(logger, config=_config(db_file))
+    job_ids = [queue.enqueue(reel_id, [f"quote {reel_id}"], tmp_path) for reel_id in range(JOBS)]
+
+    leased = run_processes(_drain, [(db_file, f"worker-{i}") for i in range(4)])
+
+    assert sorted(job_id for job_id, _ in leased) == sorted(job_ids)
+    assert queue.status_counts(job_ids) == {DONE: JOBS}
+
+
+def test_expired_lease_of_a_crashed_worker_is_reclaimed(tmp_path, logger, run_processes):
+    db_file = tmp_path / "queue.sqlite3"
+    queue = RenderJobQueue(logger, config=_config(db_file, lease_seconds=0.5))
+    job_id = queue.enqueue(1, ["quote"], tmp_path)
+
+    assert run_processes(_lease_and_crash, [(db_file, 0.5)]) == [job_id]
+    assert queue.status_counts([job_id]) == {LEASED: 1}
+    assert queue.lease("survivor") is None
+
+    time.sleep(0.6)
+    job = queue.lease("survivor")
+    assert job.id == job_id and job.attempts == 2
+    # The crashed worker no longer owns the job
+    assert not queue.heartbeat(job_id, "crashed")
+    assert not queue.complete(job_id, "crashed", tmp_path / "1.mp4")
+    assert queue.complete(job_id, "survivor", tmp_path / "1.mp4")
+
+
+def test_job_out_of_attempts_fails_instead_of_being_reclaimed(tmp_path, logger):
+    queue = RenderJobQueue(logger, config=_config(tmp_path / "queue.sqlite3", lease_seconds=0.1))
+    job_id = queue.enqueue(1, ["quote"], tmp_path)
+
+    for _ in range(2):
+        assert queue.lease("worker").id == job_id
+        time.sleep(0.2)
+    assert queue.lease("worker") is None
+    assert queue.status_counts([job_id]) == {FAILED: 1}
+
+
+def test_cancel_refuses_the_leaseholder(tmp_path, logger):
+    worker = RenderJobQueue(logger, config=_config(tmp_path / "queue.sqlite3"))
+    pipeline = RenderJobQueue(logger, config=_config(tmp_path / "queue.sqlite3"))
+    job_id = pipeline.enqueue(1, ["quote"], tmp_path)
+
+    assert worker.lease("worker").id == job_id
+    assert pipeline.cancel(1, tmp_path, "content generation failed")
+    assert not worker.heartbeat(job_id, "worker")
+    assert not worker.complete(job_id, "worker", tmp_path / "1.mp4")
+
+    # Queued again, the reel is retried from scratch
+    assert pipeline.enqueue(1, ["new quote"], tmp_path) == job_id
+    assert pipeline.status_counts([job_id]) == {PENDING: 1}
+    assert worker.lease("worker").quotes == ["new quote"]
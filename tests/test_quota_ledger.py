@@ -0,0 +1,117 @@
+import datetime
+import logging
+import os
+import sqlite3
+from dataclasses import replace
+
+from app.config.settings import settings
+from app.shorts_uploader.quota_ledger import QuotaLedger, RESERVED, SPENT, TIME_FORMAT
+
+COST = 1600
+BUDGET_UPLOADS = 5
+
+
+def _config(db_file):
+    return replace(
+        settings.youtube,
+        quota_ledger_file=db_file,
+        quota_daily_units=BUDGET_UPLOADS * COST,
+        quota_project="test",
+    )
+
+
+def _admit_all(barrier, results, db_file, owner, attempts):
+    ledger = QuotaLedger(logging.getLogger("tests"), config=_config(db_file))
+    barrier.wait()
+    admitted = []
+    for _ in range(attempts):
+        reservation = ledger.admit(COST, owner)
+        if reservation is not None:
+            ledger.spend(reservation)
+            admitted.append(reservation)
+    results.put(admitted)
+
+
+def _admit_and_crash(barrier, results, db_file):
+    ledger = QuotaLedger(logging.getLogger("tests"), config=_config(db_file))
+    barrier.wait()
+    results.put([ledger.admit(COST, "crashed")])
+    results.close()
+    results.join_thread()
+    # Die holding the reservation, without spending or releasing it
+    os._exit(0)
+
+
+def _statuses(db_file) -> list[str]:
+    with sqlite3.connect(db_file) as conn:
+        return [row[0] for row in conn.execute("SELECT status FROM quota_usage ORDER BY id")]
+
+
+def test_concurrent_processes_never_admit_past_the_budget(tmp_path, logger, run_processes):
+    db_file = tmp_path / "quota.sqlite3"
+    QuotaLedger(logger, config=_config(db_file))
+
+    admitted = run_processes(_admit_all, [(db_file, f"uploader-{i}", 4) for i in range(4)])
+
+    assert len(admitted) == BUDGET_UPLOADS
+    assert len(set(admitted)) == BUDGET_UPLOADS
+    ledger = QuotaLedger(logger, config=_config(db_file))
+    assert ledger.used() == BUDGET_UPLOADS * COST
+    assert ledger.admit(COST, "late") is None
+
+
+def test_released_units_are_admitted_again(tmp_path, logger):
+    first = QuotaLedger(logger, config=_config(tmp_path / "quota.sqlite3"))
+    second = QuotaLedger(logger, config=_config(tmp_path / "quota.sqlite3"))
+
+    reservations = [first.admit(COST, "first") for _ in range(BUDGET_UPLOADS)]
+    assert second.admit(COST, "second") is None
+
+    assert first.release(reservations[0])
+    assert not second.release(reservations[0])
+    assert second.admit(COST, "second") is not None
+
+
+def test_exhaust_blocks_every_process_until_the_reset(tmp_path, logger):
+    first = QuotaLedger(logger, config=_config(tmp_path / "quota.sqlite3"))
+    second = QuotaLedger(logger, config=_config(tmp_path / "quota.sqlite3"))
+
+    first.admit(COST, "first")
+    assert second.exhaust("second") == (BUDGET_UPLOADS - 1) * COST
+    assert first.admit(COST, "first") is None
+    assert second.remaining() == 0
+
+
+def test_crashed_holder_reservation_expires_as_spent(tmp_path, logger, run_processes):
+    db_file = tmp_path / "quota.sqlite3"
+    QuotaLedger(logger, config=_config(db_file))
+
+    [reservation] = run_processes(_admit_and_crash, [(db_file,)])
+    assert _statuses(db_file) == [RESERVED]
+
+    # Age the orphaned reservation past its TTL
+    created = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+        hours=settings.youtube.quota_reservation_ttl_hours + 1
+    )
+    with sqlite3.connect(db_file) as conn:
+        conn.execute("UPDATE quota_usage SET created_at = ? WHERE id = ?", (created.strftime(TIME_FORMAT), reservation))
+
+    ledger = QuotaLedger(logger, config=_config(db_file))
+    assert ledger.admit(COST, "next") is not None
+    # The crashed uploader may have reached the API, so its units stay counted
+    assert _statuses(db_file) == [SPENT, RESERVED]
+    assert ledger.used() == 2 * COST
+
+
+def test_deferrals_keep_their_earliest_priority_across_processes(tmp_path, logger):
+    first = QuotaLedger(logger, config=_config(tmp_path / "quota.sqlite3"))
+    second = QuotaLedger(logger, config=_config(tmp_path / "quota.sqlite3"))
+    base = datetime.datetime(2030, 1, 1, tzinfo=datetime.timezone.utc)
+
+    first.defer([(1, base + datetime.timedelta(hours=2)), (2, base + datetime.timedelta(hours=1))])
+    second.defer([(1, base), (2, base + datetime.timedelta(hours=5))])
+
+    assert second.deferred() == [1, 2]
+    assert first.clear_deferral(1)
+    assert not second.clear_deferral(1)
+    assert second.deferred() == [2]
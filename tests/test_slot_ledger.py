@@ -0,0 +1,84 @@
+import datetime
+import logging
+import os
+import sqlite3
+from dataclasses import replace
+
+from app.config.settings import settings
+from app.shorts_uploader.slot_ledger import PublishSlotLedger, PUBLISHED, RESERVED, SLOT_FORMAT
+
+SLOTS_PER_PROCESS = 6
+
+
+def _config(db_file):
+    return replace(settings.youtube, slot_ledger_file=db_file, channel="test")
+
+
+def _reserve(barrier, results, db_file, owner):
+    ledger = PublishSlotLedger(logging.getLogger("tests"), config=_config(db_file))
+    barrier.wait()
+    slots = []
+    for _ in range(SLOTS_PER_PROCESS):
+        slots.extend(slot.isoformat() for slot in ledger.reserve(1, owner))
+    results.put(slots)
+
+
+def _reserve_and_crash(barrier, results, db_file):
+    ledger = PublishSlotLedger(logging.getLogger("tests"), config=_config(db_file))
+    barrier.wait()
+    results.put([slot.isoformat() for slot in ledger.reserve(1, "crashed")])
+    results.close()
+    results.join_thread()
+    # Die holding the slot, without confirming or releasing it
+    os._exit(0)
+
+
+def test_concurrent_processes_never_book_the_same_slot(tmp_path, logger, run_processes):
+    db_file = tmp_path / "slots.sqlite3"
+    PublishSlotLedger(logger, config=_config(db_file))
+
+    slots = run_processes(_reserve, [(db_file, f"uploader-{i}") for i in range(4)])
+
+    assert len(slots) == 4 * SLOTS_PER_PROCESS
+    assert len(set(slots)) == len(slots)
+    # Together they took the earliest slots, with no gaps
+    ledger = PublishSlotLedger(logger, config=_config(db_file))
+    expected = ledger.next_free_slots(1, not_before=min(datetime.datetime.fromisoformat(s) for s in slots))
+    assert expected[0] > max(datetime.datetime.fromisoformat(s) for s in slots)
+
+
+def test_released_slot_is_backfilled_and_confirmed_slot_stays_taken(tmp_path, logger):
+    first = PublishSlotLedger(logger, config=_config(tmp_path / "slots.sqlite3"))
+    second = PublishSlotLedger(logger, config=_config(tmp_path / "slots.sqlite3"))
+
+    early, late = first.reserve(2, "first", item_ids=[1, 2])
+    assert first.confirm(late, 2)
+    assert not second.release(late)
+    assert second.release(early)
+
+    assert second.reserve(1, "second") == [early]
+
+
+def test_crashed_holder_slot_is_freed_after_the_ttl(tmp_path, logger, run_processes):
+    db_file = tmp_path / "slots.sqlite3"
+    PublishSlotLedger(logger, config=_config(db_file))
+
+    [slot] = run_processes(_reserve_and_crash, [(db_file,)])
+    slot = datetime.datetime.fromisoformat(slot)
+    ledger = PublishSlotLedger(logger, config=_config(db_file))
+    assert ledger.reserve(1, "next")[0] > slot
+
+    # Age the orphaned reservation past its TTL
+    reserved_at = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(
+        hours=settings.youtube.reservation_ttl_hours + 1
+    )
+    with sqlite3.connect(db_file) as conn:
+        conn.execute(
+            "UPDATE publish_slots SET reserved_at = ? WHERE owner = ?", (reserved_at.strftime(SLOT_FORMAT), "crashed")
+        )
+
+    assert ledger.reserve(1, "next") == [slot]
+    assert ledger.confirm(slot, 7)
+    with sqlite3.connect(db_file) as conn:
+        rows = conn.execute("SELECT owner, status, item_id FROM publish_slots ORDER BY slot_utc").fetchall()
+    assert rows == [("next", PUBLISHED, 7), ("next", RESERVED, None)]